@@ -1,39 +1,278 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.config.service_config import (
+    CV_SESSION_MAX_SESSIONS,
+    CV_SESSION_TTL_SECONDS,
+    PROFILING_SAMPLE_INTERVAL,
+    PROFILING_SAMPLER_ENABLED,
+    RESULT_CACHE_SIZE,
+    RESULT_CACHE_TTL_SECONDS,
+)
+from app.api.tenant_routes import tenant_skills
+from app.model.cv_session import CVSessionEdit
 from app.model.user_cv import UserCV
 from app.service.cv_service import CVService
+from app.service.cv_sessions import CVSession, CVSessionStore
+from app.service.tenant_skills import TenantSkillSet
 from app.model.generate_bio_request import GenerateBioRequest
+from app.service.text_analyzer import taxonomy_version
+from app.util.admission import abort_exception, analysis_runner, request_deadline
+from app.util.deadlines import Deadline, RequestAborted
+from app.util.embeddings import is_known_model
+from app.util.profiling import RequestProfile, profile_request
+from app.util.result_cache import MISS, ResultCache, cache_key
+from app.util.msgpack_transport import MsgpackRoute
+from app.util.stages import stage
+from typing import Optional
 
-router = APIRouter()
+router = APIRouter(route_class=MsgpackRoute)
 
 # Utwórz instancję analizatora CV (singleton pattern dla lepszej wydajności)
 cv_service = CVService()
 
+result_cache = (
+    ResultCache(
+        "analyze-cv",
+        max_entries=RESULT_CACHE_SIZE,
+        ttl_seconds=RESULT_CACHE_TTL_SECONDS,
+    )
+    if RESULT_CACHE_SIZE > 0
+    else None
+)
+
+cv_sessions = CVSessionStore(
+    max_sessions=CV_SESSION_MAX_SESSIONS, ttl_seconds=CV_SESSION_TTL_SECONDS
+)
+
 
 @router.post("/analyze-cv", response_model=UserCV)
 async def analyze_cv_endpoint(
     user_cv: UserCV,
+    request: Request,
+    response: Response,
     alpha: float = 1.0,
     top_k: int = 5,
     min_score: float = 0.1,
+    fast: bool = Query(
+        False,
+        description="Skip the deep copy and response re-validation and return "
+        "the CV serialized directly by pydantic-core",
+    ),
+    model: Optional[str] = Query(
+        None,
+        description="Encoder to use: a configured model name, or 'auto' to "
+        "choose by the detected language",
+    ),
+    profile: bool = Query(
+        False, description="Return a per-stage timing breakdown with the result"
+    ),
+    sample: bool = Query(
+        False, description="Attach a sampling-profiler summary to the profile"
+    ),
+    session: Optional[str] = Query(
+        None,
+        description="CV editing session token; only summaries changed since the "
+        "session's previous analysis are re-analyzed. An unknown or expired "
+        "token (e.g. 'new') starts a new session",
+    ),
+    tenant: Optional[TenantSkillSet] = Depends(tenant_skills),
+    deadline: Deadline = Depends(request_deadline),
 ):
+    if sample and not PROFILING_SAMPLER_ENABLED:
+        raise HTTPException(status_code=403, detail="Sampling profiler is disabled")
+    if not is_known_model(model):
+        raise HTTPException(status_code=400, detail=f"Unknown model {model}")
     try:
-        enhanced_cv = cv_service.analyze_cv(
-            user_cv, alpha=alpha, top_k=top_k, min_score=min_score
+        headers = {}
+        cv_session = None
+        if session is not None:
+            cv_session = cv_sessions.get(session) or cv_sessions.create()
+
+        def analyze():
+            if cv_session is not None:
+                return _analyze_in_session(
+                    cv_session, user_cv, alpha, top_k, min_score, model, tenant, headers
+                )
+            analyze_cv = (
+                cv_service.analyze_cv_copy_on_write if fast else cv_service.analyze_cv
+            )
+            return analyze_cv(
+                user_cv,
+                alpha=alpha,
+                top_k=top_k,
+                min_score=min_score,
+                model=model,
+                tenant=tenant,
+            )
+
+        def run():
+            with profile_request(
+                profile, sample=sample, interval=PROFILING_SAMPLE_INTERVAL
+            ) as request_profile:
+                # Profiled and session requests always run the pipeline;
+                # sessions already skip unchanged summaries
+                if (
+                    result_cache is None
+                    or request_profile is not None
+                    or cv_session is not None
+                ):
+                    return analyze(), MISS, request_profile
+                key = cache_key(
+                    "analyze-cv",
+                    user_cv.model_dump(mode="json"),
+                    alpha,
+                    top_k,
+                    min_score,
+                    model,
+                    taxonomy_version(),
+                    *((tenant.tenant, tenant.version) if tenant is not None else ()),
+                )
+                return (*result_cache.get_or_compute(key, analyze), request_profile)
+
+        enhanced_cv, outcome, request_profile = await analysis_runner.run(
+            request, deadline, run
         )
-        return enhanced_cv
+        headers["X-Cache"] = outcome
+        return _cv_response(response, enhanced_cv, headers, fast, request_profile)
+    except RequestAborted as e:
+        raise abort_exception(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing CV: {str(e)}")
 
 
+@router.patch("/sessions/{token}", response_model=UserCV)
+async def edit_cv_session_endpoint(
+    token: str,
+    edit: CVSessionEdit,
+    request: Request,
+    response: Response,
+    alpha: Optional[float] = Query(None, description="Defaults to the last request"),
+    top_k: Optional[int] = Query(None, description="Defaults to the last request"),
+    min_score: Optional[float] = Query(
+        None, description="Defaults to the last request"
+    ),
+    model: Optional[str] = Query(None, description="Defaults to the last request"),
+    fast: bool = Query(
+        False,
+        description="Return the CV serialized directly by pydantic-core",
+    ),
+    deadline: Deadline = Depends(request_deadline),
+):
+    if not is_known_model(model):
+        raise HTTPException(status_code=400, detail=f"Unknown model {model}")
+    cv_session = cv_sessions.get(token)
+    if cv_session is None or cv_session.cv is None:
+        raise HTTPException(status_code=404, detail=f"CV session {token} not found")
+    try:
+        with cv_session.lock:
+            params = dict(cv_session.params)
+            user_cv = cv_service.apply_summary_edits(cv_session.cv, edit.summaries)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # The tenant's current skills, which may have changed since the last request
+    tenant = tenant_skills(params.get("tenant"))
+    try:
+        headers = {}
+        enhanced_cv = await analysis_runner.run(
+            request,
+            deadline,
+            lambda: _analyze_in_session(
+                cv_session,
+                user_cv,
+                params["alpha"] if alpha is None else alpha,
+                params["top_k"] if top_k is None else top_k,
+                params["min_score"] if min_score is None else min_score,
+                model or params["model"],
+                tenant,
+                headers,
+            ),
+        )
+        return _cv_response(response, enhanced_cv, headers, fast, None)
+    except RequestAborted as e:
+        raise abort_exception(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing CV: {str(e)}")
+
+
+@router.delete("/sessions/{token}", status_code=204)
+async def delete_cv_session_endpoint(token: str):
+    if not cv_sessions.delete(token):
+        raise HTTPException(status_code=404, detail=f"CV session {token} not found")
+    return Response(status_code=204)
+
+
 @router.post("/generate-bio")
-async def generate_bio_endpoint(request: GenerateBioRequest):
+async def generate_bio_endpoint(
+    request: GenerateBioRequest,
+    http_request: Request,
+    deadline: Deadline = Depends(request_deadline),
+):
     try:
-        bio = cv_service.generate_bio(
-            request.user_cv,
-            request.skill_result,
-            request.job_offer,
-            language=request.language,
+        bio = await analysis_runner.run(
+            http_request,
+            deadline,
+            lambda: cv_service.generate_bio(
+                request.user_cv,
+                request.skill_result,
+                request.job_offer,
+                language=request.language,
+            ),
         )
         return {"bio": bio}
+    except RequestAborted as e:
+        raise abort_exception(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating bio: {str(e)}")
+
+
+def _analyze_in_session(
+    cv_session: CVSession,
+    user_cv: UserCV,
+    alpha: float,
+    top_k: int,
+    min_score: float,
+    model: Optional[str],
+    tenant: Optional[TenantSkillSet],
+    headers: dict,
+) -> UserCV:
+    with cv_session.lock:
+        enhanced_cv, analyzed = cv_service.analyze_cv_incremental(
+            user_cv,
+            cv_session,
+            alpha=alpha,
+            top_k=top_k,
+            min_score=min_score,
+            model=model,
+            tenant=tenant,
+        )
+    headers["X-CV-Session"] = cv_session.token
+    headers["X-Summaries-Analyzed"] = str(analyzed)
+    return enhanced_cv
+
+
+def _cv_response(
+    response: Response,
+    enhanced_cv: UserCV,
+    headers: dict,
+    fast: bool,
+    request_profile: Optional[RequestProfile],
+):
+    if request_profile is not None:
+        with stage("api", "serialization"):
+            return JSONResponse(
+                content={
+                    "result": jsonable_encoder(enhanced_cv),
+                    "profile": request_profile.to_dict(),
+                },
+                headers=headers,
+            )
+    if fast:
+        with stage("api", "serialization"):
+            return Response(
+                content=enhanced_cv.model_dump_json(),
+                media_type="application/json",
+                headers=headers,
+            )
+    response.headers.update(headers)
+    return enhanced_cv
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from app.model.match_request import CVToOffersMatchRequest, OfferToCVsMatchRequest
+from app.model.match_result import MatchResult
+from app.service.matching_service import MatchingService
+from app.util.admission import abort_exception, analysis_runner, request_deadline
+from app.util.deadlines import Deadline, RequestAborted
+from app.util.msgpack_transport import MsgpackRoute
+
+router = APIRouter(route_class=MsgpackRoute)
+
+matching_service = MatchingService()
+
+
+@router.post("/cv-to-offers", response_model=MatchResult)
+async def match_cv_to_offers_endpoint(
+    request: CVToOffersMatchRequest,
+    http_request: Request,
+    top_k: int = Query(10, ge=1, description="Number of best offers to return"),
+    deadline: Deadline = Depends(request_deadline),
+):
+    try:
+        return await analysis_runner.run(
+            http_request,
+            deadline,
+            lambda: matching_service.match_cv_to_offers(
+                request.user_cv, request.offers, top_k=top_k
+            ),
+        )
+    except RequestAborted as e:
+        raise abort_exception(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error matching CV: {str(e)}")
+
+
+@router.post("/offer-to-cvs", response_model=MatchResult)
+async def match_offer_to_cvs_endpoint(
+    request: OfferToCVsMatchRequest,
+    http_request: Request,
+    top_k: int = Query(10, ge=1, description="Number of best CVs to return"),
+    deadline: Deadline = Depends(request_deadline),
+):
+    try:
+        return await analysis_runner.run(
+            http_request,
+            deadline,
+            lambda: matching_service.match_offer_to_cvs(
+                request.skill_result, request.cvs, top_k=top_k
+            ),
+        )
+    except RequestAborted as e:
+        raise abort_exception(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error matching job offer: {str(e)}"
+        )
@@ -1,28 +1,240 @@
-from fastapi import APIRouter, HTTPException, Query
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.config.service_config import (
+    OFFER_STORE_DIR,
+    PROFILING_SAMPLE_INTERVAL,
+    PROFILING_SAMPLER_ENABLED,
+    RESULT_CACHE_SIZE,
+    RESULT_CACHE_TTL_SECONDS,
+    SKILL_STATS_FLUSH_SECONDS,
+    SKILL_STATS_PATH,
+    SKILL_STATS_RETENTION_DAYS,
+)
 from app.model.job_offer import JobOffer
+from app.model.similar_offers import SimilarOffer, SimilarOffersResult
+from app.model.skill_demand import SkillDemand, SkillDemandResult
 from app.model.skill_result import SkillResult
+from app.api.tenant_routes import tenant_skills
 from app.service.offer_analyzer import OfferAnalyzer
+from app.service.offer_store import OfferStore
+from app.service.skill_stats import CATEGORIES, SkillStats
+from app.service.tenant_skills import TenantSkillSet
+from app.service.text_analyzer import taxonomy_version
+from app.util.admission import abort_exception, analysis_runner, request_deadline
+from app.util.deadlines import Deadline, RequestAborted
+from app.util.embeddings import is_known_model
+from app.util.profiling import profile_request
+from app.util.result_cache import MISS, ResultCache, cache_key
+from app.util.msgpack_transport import MsgpackRoute
+from app.util.stages import stage
 from typing import Optional
 
-router = APIRouter()
+router = APIRouter(route_class=MsgpackRoute)
 
 offer_analyzer = OfferAnalyzer()
 
+offer_store = OfferStore(OFFER_STORE_DIR) if OFFER_STORE_DIR else None
+
+skill_stats = (
+    SkillStats(
+        SKILL_STATS_PATH,
+        retention_buckets=SKILL_STATS_RETENTION_DAYS,
+        flush_seconds=SKILL_STATS_FLUSH_SECONDS,
+    )
+    if SKILL_STATS_PATH
+    else None
+)
+
+result_cache = (
+    ResultCache(
+        "analyze-offer",
+        max_entries=RESULT_CACHE_SIZE,
+        ttl_seconds=RESULT_CACHE_TTL_SECONDS,
+    )
+    if RESULT_CACHE_SIZE > 0
+    else None
+)
+
 
 @router.post("/analyze-offer", response_model=SkillResult)
 async def analyze_job_offer_endpoint(
     job_offer: JobOffer,
+    request: Request,
+    response: Response,
     max_results_per_category: Optional[int] = Query(
         None, description="Maximum number of results per category"
     ),
+    offer_id: Optional[str] = Query(
+        None, description="Identifier under which the offer is stored"
+    ),
+    model: Optional[str] = Query(
+        None,
+        description="Encoder to use: a configured model name, or 'auto' to "
+        "choose by the detected language",
+    ),
+    profile: bool = Query(
+        False, description="Return a per-stage timing breakdown with the result"
+    ),
+    sample: bool = Query(
+        False, description="Attach a sampling-profiler summary to the profile"
+    ),
+    tenant: Optional[TenantSkillSet] = Depends(tenant_skills),
+    deadline: Deadline = Depends(request_deadline),
 ):
+    if sample and not PROFILING_SAMPLER_ENABLED:
+        raise HTTPException(status_code=403, detail="Sampling profiler is disabled")
+    if not is_known_model(model):
+        raise HTTPException(status_code=400, detail=f"Unknown model {model}")
     try:
         job_data = job_offer.to_dict()
-        result = offer_analyzer.analyze_job_offer(
-            job_data, max_results_per_category=max_results_per_category
+
+        # Runs once per distinct offer, so results served from the cache are not
+        # counted in the statistics again
+        def analyze():
+            options = dict(
+                max_results_per_category=max_results_per_category,
+                model=model,
+                tenant=tenant,
+            )
+            if offer_store is None:
+                analysis = offer_analyzer.analyze_job_offer(job_data, **options), None
+            else:
+                analysis = offer_analyzer.analyze_and_vectorize_job_offer(
+                    job_data, **options
+                )
+            if skill_stats is not None:
+                skill_stats.record(analysis[0])
+            return analysis
+
+        # The store is written on every request, cached or not: the offer id is
+        # not part of the cache key and the stored offer may have been deleted
+        def store(vectors) -> Optional[str]:
+            embedding, skill_vector = vectors
+            if not embedding.size:
+                return None
+            stored_id = offer_id or uuid.uuid4().hex
+            offer_store.add(stored_id, embedding, skill_vector)
+            return stored_id
+
+        tenant_key = (tenant.tenant, tenant.version) if tenant is not None else ()
+
+        def run():
+            with profile_request(
+                profile, sample=sample, interval=PROFILING_SAMPLE_INTERVAL
+            ) as request_profile:
+                # Profiled requests always run the pipeline, or there is nothing
+                # to time
+                if result_cache is None or request_profile is not None:
+                    analysis, outcome = analyze(), MISS
+                else:
+                    key = cache_key(
+                        "analyze-offer",
+                        job_data,
+                        max_results_per_category,
+                        model,
+                        taxonomy_version(),
+                        *tenant_key,
+                    )
+                    analysis, outcome = result_cache.get_or_compute(key, analyze)
+                result, vectors = analysis
+                stored_id = store(vectors) if vectors is not None else None
+                return result, stored_id, outcome, request_profile
+
+        result, stored_id, outcome, request_profile = await analysis_runner.run(
+            request, deadline, run
         )
+        headers = {"X-Cache": outcome}
+        if stored_id is not None:
+            headers["X-Offer-Id"] = stored_id
+        if request_profile is not None:
+            with stage("api", "serialization"):
+                return JSONResponse(
+                    content={
+                        "result": jsonable_encoder(result),
+                        "profile": request_profile.to_dict(),
+                    },
+                    headers=headers,
+                )
+        response.headers.update(headers)
         return result
+    except RequestAborted as e:
+        raise abort_exception(e)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error analyzing job offer: {str(e)}"
         )
+
+
+@router.get("/{offer_id}/similar", response_model=SimilarOffersResult)
+async def similar_offers_endpoint(
+    offer_id: str,
+    top_k: int = Query(10, ge=1, description="Number of similar offers to return"),
+    approximate: bool = Query(
+        False, description="Use approximate search instead of a full scan"
+    ),
+):
+    store = _require_offer_store()
+    try:
+        similar = store.similar(offer_id, top_k=top_k, approximate=approximate)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Offer {offer_id} not found")
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error searching similar offers: {str(e)}"
+        )
+    return SimilarOffersResult(
+        offers=[SimilarOffer(offer_id=id_, score=score) for id_, score in similar]
+    )
+
+
+@router.delete("/{offer_id}", status_code=204)
+async def delete_offer_endpoint(offer_id: str):
+    store = _require_offer_store()
+    if not store.delete(offer_id):
+        raise HTTPException(status_code=404, detail=f"Offer {offer_id} not found")
+    return Response(status_code=204)
+
+
+@router.post("/store/compact")
+async def compact_offer_store_endpoint():
+    store = _require_offer_store()
+    try:
+        return {"removed": store.compact()}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error compacting offer store: {str(e)}"
+        )
+
+
+@router.get("/stats/top-skills", response_model=SkillDemandResult)
+async def top_skills_endpoint(
+    days: int = Query(7, ge=1, description="Window length in days, up to today"),
+    limit: int = Query(10, ge=1, description="Number of skills to return"),
+    category: Optional[str] = Query(
+        None, description=f"Only skills of one category: {', '.join(CATEGORIES)}"
+    ),
+):
+    stats = _require_skill_stats()
+    try:
+        offers, skills = stats.top_skills(days, limit=limit, category=category)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return SkillDemandResult(
+        days=min(days, stats.retention_buckets),
+        offers=offers,
+        skills=[SkillDemand(**skill) for skill in skills],
+    )
+
+
+def _require_offer_store() -> OfferStore:
+    if offer_store is None:
+        raise HTTPException(status_code=404, detail="Offer store is not enabled")
+    return offer_store
+
+
+def _require_skill_stats() -> SkillStats:
+    if skill_stats is None:
+        raise HTTPException(status_code=404, detail="Skill statistics are not enabled")
+    return skill_stats
@@ -0,0 +1,109 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from app.model.skill_taxonomy import (
+    RelatedSkill,
+    RelatedSkills,
+    SkillTaxonomy,
+    TaxonomySkill,
+)
+from app.service.skill_stats import CATEGORIES
+from app.service.text_analyzer import (
+    TextAnalyzer,
+    select_text_analyzer,
+    taxonomy_table,
+    taxonomy_version,
+)
+from app.util.admission import abort_exception, analysis_runner, request_deadline
+from app.util.deadlines import Deadline, RequestAborted
+from app.util.embeddings import is_known_model
+from app.util.msgpack_transport import MsgpackRoute
+from typing import Optional
+
+router = APIRouter(route_class=MsgpackRoute)
+
+text_analyzer = TextAnalyzer()
+
+
+@router.get("", response_model=SkillTaxonomy)
+async def taxonomy_endpoint():
+    return SkillTaxonomy(
+        version=taxonomy_version(),
+        skills=[
+            TaxonomySkill(id=skill_id, name=name, category=category)
+            for skill_id, (name, category) in enumerate(taxonomy_table())
+        ],
+    )
+
+
+@router.get("/related", response_model=RelatedSkills)
+async def related_skills_endpoint(
+    request: Request,
+    skill: Optional[str] = Query(
+        None, description="Skill name, matched like structured skill lists"
+    ),
+    skill_id: Optional[int] = Query(
+        None, ge=0, description="Skill id, its position in the taxonomy"
+    ),
+    limit: int = Query(
+        10,
+        ge=1,
+        description="Number of related skills to return, capped at the "
+        "RELATED_SKILLS_TOP_N neighbours kept per skill",
+    ),
+    category: Optional[str] = Query(
+        None, description=f"Only skills of one category: {', '.join(CATEGORIES)}"
+    ),
+    min_score: float = Query(0.0, description="Minimum cosine similarity"),
+    model: Optional[str] = Query(
+        None, description="Encoder whose skill embeddings are compared"
+    ),
+    deadline: Deadline = Depends(request_deadline),
+):
+    if (skill is None) == (skill_id is None):
+        raise HTTPException(
+            status_code=400, detail="Exactly one of skill and skill_id is required"
+        )
+    if category is not None and category not in CATEGORIES:
+        raise HTTPException(status_code=400, detail=f"Unknown category {category}")
+    if not is_known_model(model):
+        raise HTTPException(status_code=400, detail=f"Unknown model {model}")
+
+    # Loading an encoder and building the neighbour table of a cold model or a
+    # changed taxonomy takes seconds, so lookups run off the event loop
+    def related_skills() -> Optional[RelatedSkills]:
+        analyzer = select_text_analyzer(text_analyzer, model, [])
+        neighbours = analyzer.get_skill_neighbours()
+        if skill_id is not None:
+            table = taxonomy_table()
+            name = table[skill_id][0] if skill_id < len(table) else None
+        else:
+            matched, _ = analyzer.match_skill_names([skill])
+            name = matched[0] if matched else None
+        position = neighbours.position(name) if name is not None else None
+        if position is None:
+            return None
+        return RelatedSkills(
+            skill=neighbours.names[position],
+            category=neighbours.categories[position],
+            related=[
+                RelatedSkill(**related)
+                for related in neighbours.related(
+                    position,
+                    limit=min(limit, neighbours.top_n),
+                    category=category,
+                    min_score=min_score,
+                )
+            ],
+        )
+
+    try:
+        result = await analysis_runner.run(request, deadline, related_skills)
+    except RequestAborted as e:
+        raise abort_exception(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error finding related skills: {str(e)}"
+        )
+    if result is None:
+        requested = skill if skill is not None else skill_id
+        raise HTTPException(status_code=404, detail=f"Skill {requested} not found")
+    return result
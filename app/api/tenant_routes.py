@@ -0,0 +1,85 @@
+from fastapi import APIRouter, HTTPException, Query, Response
+from app.config.service_config import TENANT_MAX_SKILLS
+from app.model.tenant_skills import TenantSkills, TenantSkillsResult
+from app.service.tenant_skills import (
+    TENANT_ID,
+    TenantSkillSet,
+    TenantSkillStore,
+    tenant_indexes,
+    tenant_skill_store,
+)
+from app.util.msgpack_transport import MsgpackRoute
+from typing import Optional
+
+router = APIRouter(route_class=MsgpackRoute)
+
+
+@router.put("/{tenant_id}/skills", response_model=TenantSkillsResult)
+async def put_tenant_skills_endpoint(tenant_id: str, skills: TenantSkills):
+    store = _require_tenant_skill_store()
+    _check_tenant_id(tenant_id)
+    skill_set = TenantSkillSet(tenant=tenant_id, **skills.model_dump())
+    if len(skill_set.skills()) > TENANT_MAX_SKILLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A tenant may define at most {TENANT_MAX_SKILLS} skills",
+        )
+    try:
+        store.put(skill_set)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error storing tenant skills: {str(e)}"
+        )
+    return _result(skill_set)
+
+
+@router.get("/{tenant_id}/skills", response_model=TenantSkillsResult)
+async def get_tenant_skills_endpoint(tenant_id: str):
+    return _result(tenant_skills(tenant_id))
+
+
+@router.delete("/{tenant_id}/skills", status_code=204)
+async def delete_tenant_skills_endpoint(tenant_id: str):
+    store = _require_tenant_skill_store()
+    _check_tenant_id(tenant_id)
+    if not store.delete(tenant_id):
+        raise HTTPException(status_code=404, detail=f"Tenant {tenant_id} not found")
+    tenant_indexes.discard(tenant_id)
+    return Response(status_code=204)
+
+
+def tenant_skills(
+    tenant: Optional[str] = Query(
+        None, description="Tenant whose own skills are detected besides the taxonomy"
+    ),
+) -> Optional[TenantSkillSet]:
+    """Resolves the tenant query parameter of analysis endpoints."""
+    if tenant is None:
+        return None
+    store = _require_tenant_skill_store()
+    _check_tenant_id(tenant)
+    skill_set = store.get(tenant)
+    if skill_set is None:
+        raise HTTPException(status_code=404, detail=f"Tenant {tenant} not found")
+    return skill_set
+
+
+def _result(skill_set: TenantSkillSet) -> TenantSkillsResult:
+    return TenantSkillsResult(
+        tenant=skill_set.tenant,
+        version=skill_set.version,
+        hard_skills=skill_set.hard_skills,
+        soft_skills=skill_set.soft_skills,
+        tools=skill_set.tools,
+    )
+
+
+def _check_tenant_id(tenant_id: str) -> None:
+    if not TENANT_ID.fullmatch(tenant_id):
+        raise HTTPException(status_code=400, detail=f"Invalid tenant id {tenant_id}")
+
+
+def _require_tenant_skill_store() -> TenantSkillStore:
+    if tenant_skill_store is None:
+        raise HTTPException(status_code=404, detail="Tenant skill sets are not enabled")
+    return tenant_skill_store
@@ -0,0 +1,112 @@
+import json
+import os
+
+# Directory of the persistent offer store; analyzed offers are not stored when unset
+OFFER_STORE_DIR = os.getenv("OFFER_STORE_DIR")
+
+# File holding skill-demand statistics of analyzed offers; not collected when unset
+SKILL_STATS_PATH = os.getenv("SKILL_STATS_PATH")
+SKILL_STATS_RETENTION_DAYS = int(os.getenv("SKILL_STATS_RETENTION_DAYS", "90"))
+SKILL_STATS_FLUSH_SECONDS = float(os.getenv("SKILL_STATS_FLUSH_SECONDS", "60"))
+
+# Analysis results cached per identical request; 0 disables the cache
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "1024"))
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "600"))
+
+# CV editing sessions (/analyze-cv?session=...) kept for incremental re-analysis
+CV_SESSION_MAX_SESSIONS = int(os.getenv("CV_SESSION_MAX_SESSIONS", "1000"))
+CV_SESSION_TTL_SECONDS = float(os.getenv("CV_SESSION_TTL_SECONDS", "1800"))
+
+# Analysis work runs on this many threads; requests wait for a free one
+ANALYSIS_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", "4"))
+# Deadline of requests without an X-Request-Timeout header (0 for none), and
+# the longest deadline a request can ask for (0 for no limit)
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "0"))
+REQUEST_MAX_TIMEOUT_SECONDS = float(os.getenv("REQUEST_MAX_TIMEOUT_SECONDS", "300"))
+# New requests are rejected with 503 once requests have waited longer than the
+# target for a whole interval. Load shedding is off by default (a target of 0);
+# set LOAD_SHED_TARGET_MS, e.g. to 100, to turn it on
+LOAD_SHED_TARGET_MS = float(os.getenv("LOAD_SHED_TARGET_MS", "0"))
+LOAD_SHED_INTERVAL_MS = float(os.getenv("LOAD_SHED_INTERVAL_MS", "1000"))
+
+# Ollama generate endpoint used by /generate-bio
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://ollama:11434/api/generate")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "gemma3:4b")
+
+# Allows requests to attach a sampling-profiler summary (?profile=true&sample=true)
+PROFILING_SAMPLER_ENABLED = (
+    os.getenv("PROFILING_SAMPLER_ENABLED", "false").lower() == "true"
+)
+PROFILING_SAMPLE_INTERVAL = float(os.getenv("PROFILING_SAMPLE_INTERVAL", "0.005"))
+
+# Encoders requests can choose from (?model=<name>); ENCODER_MODELS takes a JSON
+# object of name to model id
+ENCODER_MODELS = json.loads(os.getenv("ENCODER_MODELS", "null")) or {
+    "mpnet": "sentence-transformers/all-mpnet-base-v2",
+    "multilingual": "sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
+}
+DEFAULT_ENCODER_MODEL = os.getenv("DEFAULT_ENCODER_MODEL", "mpnet")
+# Encoder for each detected language (?model=auto); other languages use the default
+LANGUAGE_MODELS = json.loads(os.getenv("LANGUAGE_MODELS", "null")) or {
+    "pl": "multilingual"
+}
+# Pick the encoder by detected language when a request does not name one
+AUTO_SELECT_ENCODER = os.getenv("AUTO_SELECT_ENCODER", "false").lower() == "true"
+# Least recently used encoders are unloaded above this total size
+ENCODER_MEMORY_BUDGET_MB = float(os.getenv("ENCODER_MEMORY_BUDGET_MB", "2048"))
+# Torch intra-op and inter-op threads (0 keeps the torch defaults) and the
+# sentences per encoder forward pass; settings tuned for the host type in
+# ENCODER_AUTOTUNE_PATH take precedence, and with ENCODER_AUTOTUNE the service
+# tunes them at startup when there are none, see app.util.autotune
+ENCODER_THREADS = int(os.getenv("ENCODER_THREADS", "0"))
+ENCODER_INTEROP_THREADS = int(os.getenv("ENCODER_INTEROP_THREADS", "0"))
+ENCODER_FORWARD_BATCH_SIZE = int(os.getenv("ENCODER_FORWARD_BATCH_SIZE", "32"))
+ENCODER_AUTOTUNE = os.getenv("ENCODER_AUTOTUNE", "false").lower() == "true"
+ENCODER_AUTOTUNE_PATH = os.getenv("ENCODER_AUTOTUNE_PATH", "encoder_tuning.json")
+ENCODER_AUTOTUNE_LATENCY_MS = float(os.getenv("ENCODER_AUTOTUNE_LATENCY_MS", "250"))
+# Lexical filter dropping fragments that cannot match a skill before encoding.
+# It can drop fragments the model would have matched, so it is off unless
+# FRAGMENT_FILTER_ENABLED=true; FRAGMENT_FILTER_BOILERPLATE takes a JSON list of
+# regexes replacing the defaults
+FRAGMENT_FILTER_ENABLED = (
+    os.getenv("FRAGMENT_FILTER_ENABLED", "false").lower() == "true"
+)
+FRAGMENT_FILTER_MIN_CHARS = int(os.getenv("FRAGMENT_FILTER_MIN_CHARS", "3"))
+FRAGMENT_FILTER_BOILERPLATE = json.loads(
+    os.getenv("FRAGMENT_FILTER_BOILERPLATE", "null")
+)
+
+# Most similar skills precomputed per skill for /api/v1/taxonomy/related
+RELATED_SKILLS_TOP_N = int(os.getenv("RELATED_SKILLS_TOP_N", "20"))
+
+# Directory of the on-disk sentence embedding store shared by the workers of a
+# node; unset disables it. Each model's file holds at most MAX_ENTRIES vectors
+# (about 3 KB each for 768-dimensional encoders)
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR")
+EMBEDDING_STORE_MAX_ENTRIES = int(os.getenv("EMBEDDING_STORE_MAX_ENTRIES", "100000"))
+
+# Request tracing: the fraction of requests traced (0 disables tracing) and
+# where their spans go, a rotating JSONL file unless TRACING_EXPORTER names a
+# module:callable returning an exporter
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "0"))
+TRACING_PATH = os.getenv("TRACING_PATH", "traces/spans.jsonl")
+TRACING_MAX_BYTES = int(os.getenv("TRACING_MAX_BYTES", str(50 * 1024 * 1024)))
+TRACING_BACKUP_COUNT = int(os.getenv("TRACING_BACKUP_COUNT", "5"))
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER")
+
+# Per-tenant skill sets: the directory storing them (unset disables them), the
+# tenant skill indexes kept in memory and the skills a tenant may define
+TENANT_SKILLS_DIR = os.getenv("TENANT_SKILLS_DIR")
+TENANT_INDEX_CACHE_SIZE = int(os.getenv("TENANT_INDEX_CACHE_SIZE", "64"))
+TENANT_MAX_SKILLS = int(os.getenv("TENANT_MAX_SKILLS", "2000"))
+
+# Unix socket of the inference server (python -m app.inference.server); when
+# set, encoders run there instead of in each API process
+INFERENCE_SOCKET = os.getenv("INFERENCE_SOCKET")
+INFERENCE_SHM_BYTES = int(os.getenv("INFERENCE_SHM_BYTES", str(16 * 1024 * 1024)))
+INFERENCE_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "30"))
+INFERENCE_CONNECTIONS = int(os.getenv("INFERENCE_CONNECTIONS", "8"))
+# Inference server pool: worker processes and batching of concurrent requests
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "256"))
+INFERENCE_BATCH_WAIT_MS = float(os.getenv("INFERENCE_BATCH_WAIT_MS", "5"))
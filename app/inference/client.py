@@ -0,0 +1,184 @@
+import queue
+import socket
+import threading
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, List, Optional, Union
+import numpy as np
+import torch
+from app.inference.protocol import InferenceError, recv_message, send_message
+
+
+class _Connection:
+    """Socket to the server plus the shared-memory segment results land in."""
+
+    def __init__(self, socket_path: str, shm_bytes: int, timeout: float):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.shm: Optional[SharedMemory] = None
+        try:
+            self.sock.connect(socket_path)
+            if shm_bytes:
+                self.shm = SharedMemory(create=True, size=shm_bytes)
+                self.request({"op": "attach", "shm": self.shm.name, "size": shm_bytes})
+        except BaseException:
+            self.close()
+            raise
+
+    def request(self, header: dict):
+        send_message(self.sock, header)
+        reply, payload = recv_message(self.sock)
+        if not reply.get("ok"):
+            raise InferenceError(reply.get("error", "Inference server error"))
+        return reply, payload
+
+    def close(self) -> None:
+        self.sock.close()
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+class InferenceClient:
+    """
+    Thread-safe client of the inference server (app.inference.server).
+
+    Each pooled connection owns a shared-memory segment of shm_bytes the
+    server's workers write embeddings into, so results are not serialized;
+    they are copied once out of the segment before the connection is reused.
+
+    Args:
+        socket_path: Unix socket of the server
+        shm_bytes: Size of each connection's result segment; larger results
+            come back over the socket
+        timeout: Seconds to wait for a reply
+        max_connections: Maximum number of concurrent requests
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        shm_bytes: int = 16 * 1024 * 1024,
+        timeout: float = 30.0,
+        max_connections: int = 8,
+    ):
+        self.socket_path = socket_path
+        self.shm_bytes = shm_bytes
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[_Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    def encode(self, model_id: str, sentences: List[str]) -> np.ndarray:
+        """
+        Encodes sentences with a model of the server.
+
+        Args:
+            model_id: Model id as configured in ENCODER_MODELS
+            sentences: Sentences to encode
+
+        Returns:
+            float32 embeddings, one row per sentence
+        """
+        _, embeddings = self._request(
+            {"op": "encode", "model": model_id, "sentences": list(sentences)},
+            copy_rows=True,
+        )
+        return embeddings
+
+    def load(self, model_id: str) -> None:
+        """Waits until the server has loaded the model."""
+        self._request({"op": "load", "model": model_id})
+
+    def health(self) -> dict:
+        reply, _ = self._request({"op": "health"})
+        return reply
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def reset_after_fork(self) -> None:
+        """
+        Forgets the pooled connections without closing them, in a process
+        forked from the one owning them; closing would unlink their segments.
+        """
+        self._idle = queue.LifoQueue()
+
+    def _request(self, header: dict, copy_rows: bool = False):
+        with self._slots:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                try:
+                    connection = _Connection(
+                        self.socket_path, self.shm_bytes, self.timeout
+                    )
+                except OSError as e:
+                    raise InferenceError(
+                        f"Cannot connect to inference server at {self.socket_path}: {e}"
+                    )
+            try:
+                reply, payload = connection.request(header)
+                if copy_rows:
+                    payload = self._embeddings(connection, reply, payload)
+            except OSError as e:
+                # The stream may be out of sync; never reuse this connection
+                connection.close()
+                raise InferenceError(f"Inference request failed: {e}")
+            except BaseException:
+                connection.close()
+                raise
+            self._idle.put(connection)
+            return reply, payload
+
+    @staticmethod
+    def _embeddings(connection: _Connection, reply: dict, payload) -> np.ndarray:
+        shape = (reply["rows"], reply["dim"])
+        if reply["inline"]:
+            return np.frombuffer(payload, dtype=np.float32).reshape(shape)
+        # Copied out, as the segment is overwritten by the next request
+        return np.ndarray(shape, dtype=np.float32, buffer=connection.shm.buf).copy()
+
+
+class RemoteEncoder:
+    """
+    Stand-in for a SentenceTransformer whose encode() runs on the inference
+    server, so the model registry and TextAnalyzer work unchanged.
+
+    Args:
+        client: Connection pool to the server
+        model_id: Model id the server loads
+    """
+
+    def __init__(self, client: InferenceClient, model_id: str):
+        self.client = client
+        self.model_id = model_id
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        convert_to_tensor: bool = False,
+        **kwargs,
+    ):
+        single = isinstance(sentences, str)
+        embeddings = self.client.encode(
+            self.model_id, [sentences] if single else list(sentences)
+        )
+        if single:
+            embeddings = embeddings[0]
+        if convert_to_tensor:
+            return torch.from_numpy(embeddings)
+        return embeddings
+
+
+def remote_loader(client: InferenceClient) -> Callable[[str], RemoteEncoder]:
+    """Returns a model registry loader that loads models on the server."""
+
+    def load(model_id: str) -> RemoteEncoder:
+        client.load(model_id)
+        return RemoteEncoder(client, model_id)
+
+    return load
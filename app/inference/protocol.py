@@ -0,0 +1,61 @@
+import json
+import socket
+import struct
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Tuple
+
+# Length of the JSON header and of the raw payload that follows it
+_PREFIX = struct.Struct("!II")
+
+
+class InferenceError(RuntimeError):
+    """Raised when the inference server fails or cannot be reached."""
+
+
+def send_message(sock: socket.socket, header: dict, payload=b"") -> None:
+    """Sends a JSON header followed by an optional raw payload."""
+    encoded = json.dumps(header).encode("utf-8")
+    sock.sendall(_PREFIX.pack(len(encoded), len(payload)) + encoded)
+    if len(payload):
+        sock.sendall(payload)
+
+
+def recv_message(sock: socket.socket) -> Tuple[dict, bytearray]:
+    """
+    Receives one message sent by send_message.
+
+    Raises:
+        ConnectionError: If the peer closes the connection
+    """
+    header_size, payload_size = _PREFIX.unpack(_recv_exactly(sock, _PREFIX.size))
+    header = json.loads(_recv_exactly(sock, header_size))
+    return header, _recv_exactly(sock, payload_size)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytearray:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if not count:
+            raise ConnectionError("Connection closed by peer")
+        received += count
+    return buffer
+
+
+def attach_shared_memory(name: str) -> SharedMemory:
+    """
+    Attaches to a segment created by another process.
+
+    The attaching process must not unlink the segment when it exits, so it is
+    taken off this process's resource tracker (Python < 3.13 registers every
+    attachment).
+    """
+    shm = SharedMemory(name=name)
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
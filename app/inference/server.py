@@ -0,0 +1,412 @@
+"""
+Local inference server running the encoders in a pool of worker processes.
+
+API workers connect over a Unix socket (see app.inference.client) instead of
+loading the encoders themselves, so the number of API workers and the number
+of model replicas scale independently on one node. Sentences of concurrent
+requests for the same model are merged into batches of up to --max-batch
+sentences, waiting at most --batch-wait-ms for more to arrive. Each client
+connection owns a shared-memory segment the pool workers write embeddings
+into directly; only results that do not fit are sent over the socket.
+
+    python -m app.inference.server --socket /tmp/career-ai-inference.sock
+
+and start the API with INFERENCE_SOCKET pointing at the same path.
+"""
+
+import argparse
+import importlib
+import os
+import queue
+import socket
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from app.config.service_config import (
+    DEFAULT_ENCODER_MODEL,
+    ENCODER_MODELS,
+    INFERENCE_BATCH_WAIT_MS,
+    INFERENCE_MAX_BATCH,
+    INFERENCE_SOCKET,
+    INFERENCE_WORKERS,
+)
+from app.inference.protocol import attach_shared_memory, recv_message, send_message
+
+DEFAULT_LOADER = "app.util.model_registry:load_sentence_transformer"
+
+# State of a pool worker process
+_worker_loader: Optional[Callable[[str], Any]] = None
+_worker_models: Dict[str, Any] = {}
+# Attached client segments; released beyond this many so closed clients'
+# segments do not stay mapped
+_worker_segments: "OrderedDict[str, Any]" = OrderedDict()
+_MAX_ATTACHED_SEGMENTS = 64
+
+
+def _resolve(path: str) -> Callable:
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def _init_worker(loader: str, preload: Tuple[str, ...]) -> None:
+    global _worker_loader
+    _worker_loader = _resolve(loader)
+    for model_id in preload:
+        _worker_model(model_id)
+
+
+def _worker_model(model_id: str):
+    model = _worker_models.get(model_id)
+    if model is None:
+        model = _worker_models[model_id] = _worker_loader(model_id)
+    return model
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _load_model(model_id: str) -> int:
+    _worker_model(model_id)
+    return os.getpid()
+
+
+def _encode_batch(
+    model_id: str, jobs: List[Tuple[List[str], Optional[str], int]]
+) -> List[Tuple[int, int, Optional[bytes]]]:
+    """
+    Encodes the sentences of several requests in one call and writes each
+    request's embeddings into its client's shared-memory segment.
+
+    Returns:
+        Rows, dimension and, for results larger than the segment, the raw
+        float32 bytes, per job
+    """
+    sentences = [sentence for job_sentences, _, _ in jobs for sentence in job_sentences]
+    embeddings = np.asarray(
+        _worker_model(model_id).encode(sentences, convert_to_numpy=True),
+        dtype=np.float32,
+    ).reshape(len(sentences), -1)
+    dim = embeddings.shape[1]
+
+    results, offset = [], 0
+    for job_sentences, shm_name, shm_size in jobs:
+        rows = len(job_sentences)
+        block = embeddings[offset : offset + rows]
+        offset += rows
+        if shm_name is None or block.nbytes > shm_size:
+            results.append((rows, dim, block.tobytes()))
+            continue
+        segment = _attached_segment(shm_name)
+        np.ndarray(block.shape, dtype=np.float32, buffer=segment.buf)[:] = block
+        results.append((rows, dim, None))
+    return results
+
+
+def _attached_segment(name: str):
+    segment = _worker_segments.get(name)
+    if segment is None:
+        segment = _worker_segments[name] = attach_shared_memory(name)
+        while len(_worker_segments) > _MAX_ATTACHED_SEGMENTS:
+            _, released = _worker_segments.popitem(last=False)
+            released.close()
+    _worker_segments.move_to_end(name)
+    return segment
+
+
+class _Job:
+    def __init__(self, sentences: List[str], shm_name: Optional[str], shm_size: int):
+        self.sentences = sentences
+        self.shm_name = shm_name
+        self.shm_size = shm_size
+        self.done = threading.Event()
+        self.result: Optional[Tuple[int, int, Optional[bytes]]] = None
+        self.error: Optional[BaseException] = None
+
+
+class _Batcher:
+    """Collects the jobs of one model and submits them to the pool in batches."""
+
+    def __init__(self, server: "InferenceServer", model_id: str):
+        self.server = server
+        self.model_id = model_id
+        self.jobs: "queue.Queue[_Job]" = queue.Queue()
+        self._carry: Optional[_Job] = None
+        threading.Thread(
+            target=self._run, name=f"batcher-{model_id}", daemon=True
+        ).start()
+
+    def _run(self) -> None:
+        server = self.server
+        while not server.closed:
+            job = self._carry or self.jobs.get()
+            self._carry = None
+            batch, size = [job], len(job.sentences)
+            deadline = time.monotonic() + server.batch_wait
+            while size < server.max_batch:
+                try:
+                    job = self.jobs.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if size + len(job.sentences) > server.max_batch:
+                    self._carry = job
+                    break
+                batch.append(job)
+                size += len(job.sentences)
+            server.submit_batch(self.model_id, batch)
+
+
+class InferenceServer:
+    """
+    Serves encode requests from API processes with a pool of encoder workers.
+
+    Args:
+        socket_path: Unix socket to listen on
+        workers: Number of worker processes, each holding its own models
+        max_batch: Maximum number of sentences encoded in one call
+        batch_wait: Seconds a batch waits for more requests before it is sent
+        loader: "module:function" loading a model from its id in the workers
+        preload: Model ids every worker loads at startup
+        mp_context: Start method of the worker processes
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        workers: int = 2,
+        max_batch: int = 256,
+        batch_wait: float = 0.005,
+        loader: str = DEFAULT_LOADER,
+        preload: Iterable[str] = (),
+        mp_context: str = "spawn",
+    ):
+        self.socket_path = socket_path
+        self.workers = workers
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self.loader = loader
+        self.preload = tuple(preload)
+        self.mp_context = mp_context
+        self.closed = False
+        self.batches = 0
+        self.requests = 0
+        self.restarts = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        # At most one batch per worker in flight, so waiting jobs keep batching
+        self._slots = threading.BoundedSemaphore(workers)
+        self._batchers: Dict[str, _Batcher] = {}
+        self._batchers_lock = threading.Lock()
+        self._listener: Optional[socket.socket] = None
+
+    def start(self) -> None:
+        """Starts the worker pool and accepts connections in the background."""
+        self._executor = self._new_executor()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(self.socket_path)
+        self._listener.listen(128)
+        threading.Thread(target=self._accept, name="accept", daemon=True).start()
+
+    def serve_forever(self) -> None:
+        self.start()
+        try:
+            while not self.closed:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self.closed = True
+        if self._listener is not None:
+            self._listener.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def health(self, timeout: float = 5.0) -> dict:
+        """Checks that a pool worker answers and reports the server counters."""
+        status = "ok"
+        executor = self._executor
+        try:
+            executor.submit(_ping).result(timeout=timeout)
+        except BrokenProcessPool:
+            self._restart_executor(executor)
+            status = "restarting"
+        except Exception:
+            status = "unresponsive"
+        return {
+            "status": status,
+            "workers": self.workers,
+            "max_batch": self.max_batch,
+            "queued": sum(b.jobs.qsize() for b in list(self._batchers.values())),
+            "requests": self.requests,
+            "batches": self.batches,
+            "restarts": self.restarts,
+            "models": sorted(set(self.preload) | set(self._batchers)),
+        }
+
+    def encode(
+        self, model_id: str, sentences: List[str], shm_name=None, shm_size=0
+    ) -> Tuple[int, int, Optional[bytes]]:
+        """Queues sentences for the next batch of the model and waits for them."""
+        self.requests += 1
+        if not sentences:
+            return 0, 0, b""
+        job = _Job(sentences, shm_name, shm_size)
+        self._batcher(model_id).jobs.put(job)
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def load(self, model_id: str) -> None:
+        """Loads a model in a pool worker, the others load it on first use."""
+        self._executor.submit(_load_model, model_id).result()
+
+    def submit_batch(self, model_id: str, batch: List[_Job]) -> None:
+        self._slots.acquire()
+        self.batches += 1
+        jobs = [(job.sentences, job.shm_name, job.shm_size) for job in batch]
+        executor = self._executor
+        try:
+            future = executor.submit(_encode_batch, model_id, jobs)
+        except Exception as e:
+            future = Future()
+            future.set_exception(e)
+        future.add_done_callback(lambda f: self._finish(batch, f, executor))
+
+    def _finish(
+        self, batch: List[_Job], future: Future, executor: ProcessPoolExecutor
+    ) -> None:
+        self._slots.release()
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._restart_executor(executor)
+        for position, job in enumerate(batch):
+            if error is not None:
+                job.error = error
+            else:
+                job.result = future.result()[position]
+            job.done.set()
+
+    def _batcher(self, model_id: str) -> _Batcher:
+        with self._batchers_lock:
+            batcher = self._batchers.get(model_id)
+            if batcher is None:
+                batcher = self._batchers[model_id] = _Batcher(self, model_id)
+        return batcher
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.mp_context),
+            initializer=_init_worker,
+            initargs=(self.loader, self.preload),
+        )
+
+    def _restart_executor(self, broken: ProcessPoolExecutor) -> None:
+        # A crashed worker breaks the whole pool; replace it for later batches
+        with self._executor_lock:
+            if self.closed or self._executor is not broken:
+                return
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+            self.restarts += 1
+
+    def _accept(self) -> None:
+        while not self.closed:
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(
+                target=self._serve_connection, args=(conn,), daemon=True
+            ).start()
+
+    def _serve_connection(self, conn: socket.socket) -> None:
+        shm_name, shm_size = None, 0
+        with conn:
+            while True:
+                try:
+                    header, _ = recv_message(conn)
+                except (ConnectionError, OSError):
+                    return
+                payload = b""
+                try:
+                    op = header.get("op")
+                    if op == "attach":
+                        shm_name, shm_size = header["shm"], header["size"]
+                        reply = {"ok": True}
+                    elif op == "encode":
+                        rows, dim, inline = self.encode(
+                            header["model"], header["sentences"], shm_name, shm_size
+                        )
+                        reply = {
+                            "ok": True,
+                            "rows": rows,
+                            "dim": dim,
+                            "inline": inline is not None,
+                        }
+                        payload = inline or b""
+                    elif op == "load":
+                        self.load(header["model"])
+                        reply = {"ok": True}
+                    elif op == "health":
+                        reply = {"ok": True, **self.health()}
+                    else:
+                        reply = {"ok": False, "error": f"Unknown operation {op}"}
+                except Exception as e:
+                    reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                try:
+                    send_message(conn, reply, payload)
+                except OSError:
+                    return
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--socket",
+        default=INFERENCE_SOCKET or "/tmp/career-ai-inference.sock",
+        help="Unix socket to listen on",
+    )
+    parser.add_argument("--workers", type=int, default=INFERENCE_WORKERS)
+    parser.add_argument("--max-batch", type=int, default=INFERENCE_MAX_BATCH)
+    parser.add_argument("--batch-wait-ms", type=float, default=INFERENCE_BATCH_WAIT_MS)
+    parser.add_argument(
+        "--loader",
+        default=DEFAULT_LOADER,
+        help="module:function loading a model from its id",
+    )
+    parser.add_argument(
+        "--preload",
+        nargs="*",
+        default=[ENCODER_MODELS[DEFAULT_ENCODER_MODEL]],
+        help="Model ids loaded by every worker at startup",
+    )
+    args = parser.parse_args()
+
+    server = InferenceServer(
+        args.socket,
+        workers=args.workers,
+        max_batch=args.max_batch,
+        batch_wait=args.batch_wait_ms / 1000,
+        loader=args.loader,
+        preload=args.preload,
+    )
+    print(f"listening on {args.socket} with {args.workers} workers", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
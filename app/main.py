@@ -1,50 +1,69 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.offer_routes import router as offer_router
-from app.api.cv_routes import router as cv_router
-import yaml
-from pathlib import Path
-
-
-def auto_resolve_yaml():
-    try:
-        import subprocess
-
-        base_path = Path(__file__).parent.parent
-        resolve_script = base_path / "resolve_yaml.py"
-
-        if resolve_script.exists():
-            subprocess.run(["python3", str(resolve_script)], cwd=base_path, check=True)
-    except Exception as e:
-        print(f"Could not auto-resolve YAML: {e}")
-
-
-def load_openapi_spec():
-    base_path = Path(__file__).parent.parent
-    resolved_path = base_path / "resources" / "api" / "openapi-resolved.yaml"
-    openapi_path = base_path / "resources" / "api" / "openapi.yaml"
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
+from fastapi.responses import JSONResponse
+from app.api.offer_routes import router as offer_router, offer_analyzer, skill_stats
+from app.api.cv_routes import router as cv_router, cv_service
+from app.api.match_routes import router as match_router, matching_service
+from app.api.taxonomy_routes import router as taxonomy_router, text_analyzer
+from app.api.tenant_routes import router as tenant_router
+from app.service.warmup import ServiceWarmup
+from app.util.admission import analysis_runner
+from app.util.autotune import configure_encoder
+from app.util.embeddings import get_model, inference_client, model_id
+from app.util.metrics import (
+    CONTENT_TYPE,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    REGISTRY,
+)
+from app.util.openapi import encode_spec, load_spec
+from app.util.tracing import TracingMiddleware, tracer
+
+warmup = ServiceWarmup(
+    [
+        cv_service.text_analyzer,
+        offer_analyzer.text_analyzer,
+        matching_service.text_analyzer,
+        text_analyzer,
+    ],
+    # Remote encoders run with the inference server's settings
+    configure_encoder=(
+        (lambda: configure_encoder(get_model(), model_id()))
+        if inference_client is None
+        else None
+    ),
+)
 
-    # Auto-resolve if needed (resolved file doesn't exist or is older)
-    if not resolved_path.exists() or (
-        openapi_path.exists()
-        and resolved_path.stat().st_mtime < openapi_path.stat().st_mtime
-    ):
-        auto_resolve_yaml()
 
-    if resolved_path.exists():
-        with open(resolved_path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
-    return None
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the model in the background so the server binds immediately
+    warmup.start()
+    yield
+    if skill_stats is not None:
+        skill_stats.close()
+    if inference_client is not None:
+        inference_client.close()
+    analysis_runner.close()
 
 
 app = FastAPI(
     title="Career AI Service",
     description="API for analyzing job offers and extracting skill requirements",
     version="1.0.0",
+    lifespan=lifespan,
+    # Served below from the pre-encoded, pre-resolved spec
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None,
 )
 
-# Override with YAML spec if available
-openapi_spec = load_openapi_spec()
+# Override with the resolved YAML spec if available
+openapi_spec = load_spec()
 if openapi_spec:
 
     def custom_openapi():
@@ -52,6 +71,42 @@ if openapi_spec:
 
     app.openapi = custom_openapi
 
+# Encoded once; spec fetches only compare ETags and write these bytes
+encoded_openapi = encode_spec(app.openapi())
+
+
+@app.middleware("http")
+async def reject_until_ready(request: Request, call_next):
+    # Analysis routes need the model; fail fast instead of queueing behind warm-up
+    if request.url.path.startswith("/api/") and not warmup.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Service is not ready", **warmup.status()},
+            headers={"Retry-After": "5"},
+        )
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        # Label by route template so /offer/{offer_id} stays one series
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        HTTP_REQUESTS.labels(request.method, path, status).inc()
+        HTTP_REQUEST_DURATION.labels(request.method, path).observe(
+            time.perf_counter() - start
+        )
+
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -65,14 +120,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added last so the root span covers the other middlewares; not installed at
+# all when tracing is off
+if tracer is not None:
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+
+
 # Include routers
 app.include_router(offer_router, prefix="/api/v1/offer", tags=["Job Offer Analysis"])
 app.include_router(cv_router, prefix="/api/v1/cv", tags=["CV Analysis"])
+app.include_router(match_router, prefix="/api/v1/match", tags=["Matching"])
+app.include_router(taxonomy_router, prefix="/api/v1/taxonomy", tags=["Taxonomy"])
+app.include_router(tenant_router, prefix="/api/v1/tenants", tags=["Tenants"])
+
+
+@app.get("/openapi.json", include_in_schema=False)
+async def get_openapi(request: Request):
+    headers = {"ETag": encoded_openapi.etag, "Cache-Control": "no-cache"}
+    if encoded_openapi.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=encoded_openapi.body, media_type="application/json", headers=headers
+    )
 
 
-@app.get("/openapi.json")
-async def get_openapi():
-    return app.openapi()
+@app.get("/docs", include_in_schema=False)
+async def swagger_ui():
+    return get_swagger_ui_html(openapi_url="/openapi.json", title=app.title)
+
+
+@app.get("/redoc", include_in_schema=False)
+async def redoc():
+    return get_redoc_html(openapi_url="/openapi.json", title=app.title)
 
 
 @app.get("/health")
@@ -80,6 +159,19 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/ready")
+async def readiness_check():
+    status = warmup.status()
+    if not warmup.ready:
+        return JSONResponse(status_code=503, content=status)
+    return status
+
+
 if __name__ == "__main__":
     import uvicorn
 
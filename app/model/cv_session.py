@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+
+class SummaryEdit(BaseModel):
+    section: Literal["experience", "projects"]
+    entry: int = Field(ge=0)
+    index: int = Field(ge=0)
+    text: Optional[str] = None
+
+
+class CVSessionEdit(BaseModel):
+    summaries: List[SummaryEdit]
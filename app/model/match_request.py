@@ -0,0 +1,14 @@
+from app.model.user_cv import UserCV
+from app.model.skill_result import SkillResult
+from pydantic import BaseModel
+from typing import List
+
+
+class CVToOffersMatchRequest(BaseModel):
+    user_cv: UserCV
+    offers: List[SkillResult]
+
+
+class OfferToCVsMatchRequest(BaseModel):
+    skill_result: SkillResult
+    cvs: List[UserCV]
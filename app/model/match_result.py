@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass
+class MatchItem:
+    index: int
+    score: float
+
+
+@dataclass
+class MatchResult:
+    matches: List[MatchItem]
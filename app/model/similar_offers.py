@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass
+class SimilarOffer:
+    offer_id: str
+    score: float
+
+
+@dataclass
+class SimilarOffersResult:
+    offers: List[SimilarOffer]
@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass
+class SkillDemand:
+    name: str
+    category: str
+    count: int
+    score_sum: float
+    mean_score: float
+
+
+@dataclass
+class SkillDemandResult:
+    days: int
+    offers: int
+    skills: List[SkillDemand]
@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass
+class TaxonomySkill:
+    id: int
+    name: str
+    category: str
+
+
+@dataclass
+class SkillTaxonomy:
+    version: str
+    skills: List[TaxonomySkill]
+
+
+@dataclass
+class RelatedSkill:
+    name: str
+    category: str
+    score: float
+
+
+@dataclass
+class RelatedSkills:
+    skill: str
+    category: str
+    related: List[RelatedSkill]
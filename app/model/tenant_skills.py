@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class TenantSkills(BaseModel):
+    hard_skills: List[str] = []
+    soft_skills: List[str] = []
+    tools: List[str] = []
+
+
+class TenantSkillsResult(TenantSkills):
+    tenant: str
+    version: str
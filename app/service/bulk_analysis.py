@@ -0,0 +1,437 @@
+"""
+Offline bulk analysis of job offers and CVs read from JSONL.
+
+Backfills bypass HTTP: records stream from the input file through a pool of
+worker processes forked after the encoder and the skill index are loaded, so
+the workers share the model weights copy-on-write instead of each loading a
+copy. Results are written in input order, as JSONL or as Parquet part files
+(the latter needs pyarrow). After every durable write the progress is
+checkpointed next to the output; running the same command again resumes
+after the last checkpoint.
+
+    python run.py offers offers.jsonl offer-skills.jsonl --workers 8
+    python run.py cvs cvs.jsonl cv-skills --format parquet
+
+Each input line is a JSON object, an offer (see JobOffer) or a CV (see
+UserCV), with an optional "id" field copied to its result; lines without
+one are identified by their line number. Records that fail are written with
+an "error" field instead of a result, and the run goes on.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict
+from typing import IO, Iterator, List, Optional, Tuple
+import torch
+from app.model.job_offer import JobOffer
+from app.model.user_cv import UserCV
+from app.service.cv_service import CVService
+from app.service.offer_analyzer import OfferAnalyzer
+from app.service.warmup import FAILED, ServiceWarmup
+from app.util import embeddings
+
+OFFERS = "offers"
+CVS = "cvs"
+JSONL = "jsonl"
+PARQUET = "parquet"
+
+# Analyzer of a worker process, created before the pool forks
+_analyzer = None
+
+
+def create_analyzer(task: str):
+    """Returns the service analyzing records of a task."""
+    return OfferAnalyzer() if task == OFFERS else CVService()
+
+
+def analyze_record(task: str, analyzer, record: dict, options: dict) -> dict:
+    """
+    Analyzes one input record.
+
+    Args:
+        task: OFFERS or CVS
+        analyzer: Analyzer from create_analyzer
+        record: Offer or CV, without its id
+        options: Analysis parameters, see main
+
+    Returns:
+        The result fields written for the record
+    """
+    if task == OFFERS:
+        result = analyzer.analyze_job_offer(
+            JobOffer.model_validate(record).to_dict(),
+            max_results_per_category=options["max_results_per_category"],
+            model=options["model"],
+        )
+        return asdict(result)
+    cv = analyzer.analyze_cv(
+        UserCV.model_validate(record),
+        alpha=options["alpha"],
+        top_k=options["top_k"],
+        min_score=options["min_score"],
+        model=options["model"],
+    )
+    return {"cv": cv.model_dump(mode="json")}
+
+
+def analyze_chunk(
+    task: str, first_line: int, lines: List[bytes], options: dict
+) -> List[dict]:
+    """Analyzes consecutive input lines, the first being line first_line."""
+    results = []
+    for number, line in enumerate(lines, first_line):
+        if not line.strip():
+            continue
+        record_id = number
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Record is not a JSON object")
+            record_id = record.pop(options["id_field"], number)
+            result = analyze_record(task, _analyzer, record, options)
+            results.append({"id": record_id, **result})
+        except Exception as e:
+            results.append({"id": record_id, "error": str(e)})
+    return results
+
+
+def _init_worker(threads: int) -> None:
+    # Workers split the cores instead of each using all of them
+    torch.set_num_threads(threads)
+    if embeddings.inference_client is not None:
+        embeddings.inference_client.reset_after_fork()
+
+
+class JsonlWriter:
+    """Appends results to a JSONL file, one line per record."""
+
+    def __init__(self, path: str, state: Optional[dict] = None):
+        size = state["bytes"] if state else 0
+        if size and (not os.path.exists(path) or os.path.getsize(path) < size):
+            raise ValueError(f"{path} is shorter than its checkpoint")
+        self._file = open(path, "r+b" if size else "wb")
+        # Drops results written after the checkpoint
+        self._file.truncate(size)
+        self._file.seek(size)
+
+    def write(self, results: List[dict]) -> Optional[dict]:
+        """Writes results; returns the output state once they are durable."""
+        self._file.write(
+            "".join(json.dumps(result) + "\n" for result in results).encode("utf-8")
+        )
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return {"bytes": self._file.tell()}
+
+    def close(self) -> dict:
+        state = {"bytes": self._file.tell()}
+        self._file.close()
+        return state
+
+
+class ParquetWriter:
+    """
+    Writes results to a directory of Parquet files of at least part_rows rows
+    each; results are durable once their part file is written.
+    """
+
+    def __init__(self, directory: str, state: Optional[dict] = None, part_rows=10000):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ValueError("Parquet output requires pyarrow")
+        self._pyarrow = pyarrow
+        self.directory = directory
+        self.part_rows = part_rows
+        self._parts = state["parts"] if state else 0
+        self._rows: List[dict] = []
+        os.makedirs(directory, exist_ok=True)
+        # Drops parts written after the checkpoint
+        for name in os.listdir(directory):
+            if name.startswith("part-") and int(name[5:10]) >= self._parts:
+                os.remove(os.path.join(directory, name))
+
+    def write(self, results: List[dict]) -> Optional[dict]:
+        """Buffers results; returns the output state once they are durable."""
+        self._rows.extend(results)
+        if len(self._rows) < self.part_rows:
+            return None
+        return self._flush()
+
+    def close(self) -> dict:
+        return self._flush()
+
+    def _flush(self) -> dict:
+        if self._rows:
+            columns = {"id": [str(row["id"]) for row in self._rows]}
+            for row in self._rows:
+                for column in row:
+                    columns.setdefault(column, None)
+            for column in columns:
+                if column != "id":
+                    columns[column] = [row.get(column) for row in self._rows]
+            path = os.path.join(self.directory, f"part-{self._parts:05d}.parquet")
+            self._pyarrow.parquet.write_table(
+                self._pyarrow.table(columns), path + ".tmp"
+            )
+            os.replace(path + ".tmp", path)
+            self._parts += 1
+            self._rows = []
+        return {"parts": self._parts}
+
+
+def load_checkpoint(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, state: dict) -> None:
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+
+class Progress:
+    """
+    Reports records done, throughput and estimated time left at most every
+    interval seconds; the estimate extrapolates the bytes of input consumed.
+
+    Args:
+        total_bytes: Size of the input
+        start_bytes: Input position the run started at
+        interval: Seconds between reports
+        stream: Where reports are written
+        clock: Monotonic time source
+    """
+
+    def __init__(
+        self,
+        total_bytes: int,
+        start_bytes: int = 0,
+        interval: float = 10.0,
+        stream: IO = sys.stderr,
+        clock=time.monotonic,
+    ):
+        self.total_bytes = total_bytes
+        self.start_bytes = start_bytes
+        self.interval = interval
+        self.stream = stream
+        self.clock = clock
+        self.records = 0
+        self.errors = 0
+        self.position = start_bytes
+        self._started_at = clock()
+        self._reported_at = self._started_at
+
+    def update(self, results: List[dict], position: int) -> None:
+        self.records += len(results)
+        self.errors += sum("error" in result for result in results)
+        self.position = position
+        if self.clock() - self._reported_at >= self.interval:
+            self.report()
+
+    def report(self) -> None:
+        now = self._reported_at = self.clock()
+        elapsed = max(now - self._started_at, 1e-9)
+        done = self.position - self.start_bytes
+        line = (
+            f"{self.records} records ({self.errors} failed), "
+            f"{self.records / elapsed:.1f} records/s, "
+            f"{100 * self.position / max(self.total_bytes, 1):.1f}%"
+        )
+        if 0 < done and self.position < self.total_bytes:
+            left = elapsed * (self.total_bytes - self.position) / done
+            line += f", ETA {time.strftime('%H:%M:%S', time.gmtime(left))}"
+        print(line, file=self.stream, flush=True)
+
+
+def _chunks(
+    lines: IO[bytes], chunk_size: int, first_line: int
+) -> Iterator[Tuple[int, List[bytes], int]]:
+    chunk: List[bytes] = []
+    start = first_line
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            yield start, chunk, lines.tell()
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        yield start, chunk, lines.tell()
+
+
+def run(
+    task: str,
+    input_path: str,
+    output: str,
+    options: dict,
+    workers: int = 0,
+    chunk_size: int = 64,
+    output_format: str = JSONL,
+    part_rows: int = 10000,
+    restart: bool = False,
+    progress_seconds: float = 10.0,
+    stream: IO = sys.stderr,
+) -> Progress:
+    """
+    Analyzes every record of a JSONL file, resuming an interrupted run.
+
+    Args:
+        task: OFFERS or CVS
+        input_path: JSONL file of records
+        output: JSONL file, or directory of Parquet files, of results
+        options: Analysis parameters, see main
+        workers: Worker processes, 0 to analyze in this process
+        chunk_size: Records sent to a worker at once
+        output_format: JSONL or PARQUET
+        part_rows: Minimum rows per Parquet file
+        restart: Ignore the checkpoint of an earlier run
+        progress_seconds: Seconds between progress reports
+        stream: Where progress is reported
+
+    Returns:
+        Progress of the run, with its record and error counts
+    """
+    global _analyzer
+    checkpoint_path = output.rstrip(os.sep) + ".checkpoint"
+    run_key = {
+        "task": task,
+        "input": os.path.abspath(input_path),
+        "format": output_format,
+        "options": options,
+    }
+    checkpoint = None if restart else load_checkpoint(checkpoint_path)
+    if checkpoint is not None and checkpoint["run"] != run_key:
+        raise ValueError(
+            f"{checkpoint_path} belongs to a different run; pass --restart to "
+            "start over"
+        )
+    lines_done = checkpoint["lines"] if checkpoint else 0
+    output_state = checkpoint["output"] if checkpoint else None
+    if output_format == PARQUET:
+        writer = ParquetWriter(output, output_state, part_rows=part_rows)
+    else:
+        writer = JsonlWriter(output, output_state)
+
+    _analyzer = create_analyzer(task)
+    warmup = ServiceWarmup([_analyzer.text_analyzer])
+    warmup.run()
+    if warmup.stage == FAILED:
+        raise RuntimeError(f"Warm-up failed: {warmup.error}")
+
+    executor = None
+    if workers > 0:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_worker,
+            initargs=(max(1, (os.cpu_count() or 1) // workers),),
+        )
+    try:
+        with open(input_path, "rb") as lines:
+            for _ in range(lines_done):
+                lines.readline()
+            progress = Progress(
+                os.fstat(lines.fileno()).st_size,
+                start_bytes=lines.tell(),
+                interval=progress_seconds,
+                stream=stream,
+            )
+            # Bounds the results held in memory while keeping workers busy
+            pending: "deque[Tuple[Future, int, int]]" = deque()
+
+            def finish_oldest():
+                future, end_line, position = pending.popleft()
+                results = future.result()
+                state = writer.write(results)
+                if state is not None:
+                    save_checkpoint(
+                        checkpoint_path,
+                        {"run": run_key, "lines": end_line, "output": state},
+                    )
+                progress.update(results, position)
+
+            last_line = lines_done
+            for first_line, chunk, position in _chunks(
+                lines, chunk_size, lines_done + 1
+            ):
+                if executor is not None:
+                    future = executor.submit(
+                        analyze_chunk, task, first_line, chunk, options
+                    )
+                else:
+                    future = Future()
+                    future.set_result(analyze_chunk(task, first_line, chunk, options))
+                last_line = first_line + len(chunk) - 1
+                pending.append((future, last_line, position))
+                if len(pending) > 2 * workers:
+                    finish_oldest()
+            while pending:
+                finish_oldest()
+        save_checkpoint(
+            checkpoint_path,
+            {"run": run_key, "lines": last_line, "output": writer.close()},
+        )
+        progress.report()
+        return progress
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("task", choices=(OFFERS, CVS))
+    parser.add_argument("input", help="JSONL file of offers or CVs")
+    parser.add_argument(
+        "output", help="JSONL file, or directory for --format parquet, of results"
+    )
+    parser.add_argument("--format", choices=(JSONL, PARQUET), default=JSONL)
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="0 runs in-process"
+    )
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--part-rows", type=int, default=10000)
+    parser.add_argument("--progress-seconds", type=float, default=10.0)
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore an existing checkpoint"
+    )
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--model", help="Encoder name, or 'auto' to choose by language")
+    parser.add_argument("--max-results-per-category", type=int)
+    parser.add_argument("--alpha", type=float, default=1.0)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--min-score", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    options = {"id_field": args.id_field, "model": args.model}
+    if args.task == OFFERS:
+        options["max_results_per_category"] = args.max_results_per_category
+    else:
+        options.update(alpha=args.alpha, top_k=args.top_k, min_score=args.min_score)
+    try:
+        run(
+            args.task,
+            args.input,
+            args.output,
+            options,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            output_format=args.format,
+            part_rows=args.part_rows,
+            restart=args.restart,
+            progress_seconds=args.progress_seconds,
+        )
+    except ValueError as e:
+        sys.exit(str(e))
@@ -1,16 +1,29 @@
+from app.model.cv_session import SummaryEdit
 from app.model.user_cv import UserCV
-from app.service.text_analyzer import TextAnalyzer
-from app.model.skill_result import SkillResult
+from app.service.cv_sessions import CVSession
+from app.service.tenant_skills import TenantSkillSet
+from app.service.text_analyzer import (
+    TextAnalyzer,
+    select_text_analyzer,
+    taxonomy_version,
+)
+from app.model.skill_result import SkillItem, SkillResult
 from app.model.job_offer import JobOffer
 import json
+import time
+from typing import Dict, List, Optional, Tuple
 import requests
 import os
 from fastapi import HTTPException
+from app.config.service_config import OLLAMA_MODEL, OLLAMA_URL
+from app.util.deadlines import RequestAborted, check_deadline, time_left
+from app.util.embeddings import registry, select_model
+from app.util.metrics import OLLAMA_REQUEST_DURATION
+from app.util.profiling import record
+from app.util.stages import stage
+from app.util.tracing import set_attribute
 
 PROMPT_PATH = os.path.join(os.path.dirname(__file__), "..", "prompts", "prompt.json")
-OLLAMA_URL = "http://ollama:11434/api/generate"
-# OLLAMA_URL = "http://localhost:11434/api/generate"
-OLLAMA_MODEL = "gemma3:4b"
 
 
 class CVService:
@@ -23,6 +36,8 @@ class CVService:
         alpha: float,
         top_k: int,
         min_score: float,
+        model: Optional[str] = None,
+        tenant: Optional[TenantSkillSet] = None,
     ) -> UserCV:
         """
         Analyzes a user's CV and detects technologies in Summary.text,
@@ -33,28 +48,198 @@ class CVService:
             alpha: Boosting factor for exact matches
             top_k: Number of best matches to consider per sentence
             min_score: Minimum score for including technologies
+            model: Encoder name, "auto" to choose by language, None for the default
+            tenant: Tenant skills detected in addition to the taxonomy
 
         Returns:
             CV with detected technologies in Summary.technologies
         """
         enhanced_cv = cv.model_copy(deep=True)
 
-        # Analyze summaries in experiences
-        if enhanced_cv.experience:
-            for experience in enhanced_cv.experience:
-                if experience.summaries:
-                    for summary in experience.summaries:
-                        self._analyze_summary(summary, alpha, top_k, min_score)
-
-        # Analyze summaries in projects
-        if enhanced_cv.projects:
-            for project in enhanced_cv.projects:
-                if project.summaries:
-                    for summary in project.summaries:
-                        self._analyze_summary(summary, alpha, top_k, min_score)
+        summaries = [
+            summary for _, _, _, summary in self._collect_summaries(enhanced_cv)
+        ]
+        detected_skills = self._detect_skills(
+            [summary.text for summary in summaries], alpha, top_k, model, tenant
+        )
+        for summary, skills in zip(summaries, detected_skills):
+            self._add_technologies(summary, skills, min_score)
 
         return enhanced_cv
 
+    def analyze_cv_copy_on_write(
+        self,
+        cv: UserCV,
+        alpha: float,
+        top_k: int,
+        min_score: float,
+        model: Optional[str] = None,
+        tenant: Optional[TenantSkillSet] = None,
+    ) -> UserCV:
+        """
+        Same as analyze_cv, but without deep-copying the CV.
+
+        Only the summaries that gain technologies are copied, together with the
+        experience/project entries and lists containing them; everything else is
+        shared with the input, which is left unchanged.
+
+        Args:
+            cv: User's CV to analyze
+            alpha: Boosting factor for exact matches
+            top_k: Number of best matches to consider per sentence
+            min_score: Minimum score for including technologies
+            model: Encoder name, "auto" to choose by language, None for the default
+            tenant: Tenant skills detected in addition to the taxonomy
+
+        Returns:
+            CV with detected technologies in Summary.technologies
+        """
+        located = self._collect_summaries(cv)
+        detected_skills = self._detect_skills(
+            [summary.text for _, _, _, summary in located],
+            alpha,
+            top_k,
+            model,
+            tenant,
+        )
+        return self._apply_detected_skills(cv, located, detected_skills, min_score)
+
+    def analyze_cv_incremental(
+        self,
+        cv: UserCV,
+        session: CVSession,
+        alpha: float,
+        top_k: int,
+        min_score: float,
+        model: Optional[str] = None,
+        tenant: Optional[TenantSkillSet] = None,
+    ) -> Tuple[UserCV, int]:
+        """
+        Same as analyze_cv_copy_on_write, but re-analyzes only the summaries
+        whose text is new to the session; the others reuse the skills detected
+        by earlier calls. The caller must hold session.lock.
+
+        Args:
+            cv: User's CV to analyze
+            session: Editing session the CV belongs to, updated in place
+            alpha: Boosting factor for exact matches
+            top_k: Number of best matches to consider per sentence
+            min_score: Minimum score for including technologies
+            model: Encoder name, "auto" to choose by language, None for the default
+            tenant: Tenant skills detected in addition to the taxonomy
+
+        Returns:
+            CV with detected technologies in Summary.technologies and the
+            number of summaries analyzed
+        """
+        located = self._collect_summaries(cv)
+        texts = [summary.text for _, _, _, summary in located]
+        # Resolved against the whole CV, so "auto" does not flip between edits
+        model_name = select_model(model, texts) or registry.default
+        detected_skills, analyzed = session.detect(
+            texts,
+            (
+                model_name,
+                alpha,
+                top_k,
+                taxonomy_version(),
+                tenant.version if tenant is not None else None,
+            ),
+            lambda missing: self._detect_skills(
+                missing, alpha, top_k, model_name, tenant
+            ),
+        )
+        record("summaries_analyzed", analyzed)
+        record("summaries_reused", len(texts) - analyzed)
+
+        session.cv = cv
+        session.params = {
+            "alpha": alpha,
+            "top_k": top_k,
+            "min_score": min_score,
+            "model": model,
+            "tenant": tenant.tenant if tenant is not None else None,
+        }
+        return (
+            self._apply_detected_skills(cv, located, detected_skills, min_score),
+            analyzed,
+        )
+
+    @staticmethod
+    def apply_summary_edits(cv: UserCV, edits: List[SummaryEdit]) -> UserCV:
+        """
+        Returns a copy of the CV with the given summary texts replaced; only
+        the edited entries are copied.
+
+        Args:
+            cv: CV to edit, left unchanged
+            edits: New texts by section, entry index and summary index
+
+        Returns:
+            The edited CV
+
+        Raises:
+            ValueError: If an edit points outside the CV
+        """
+        sections: Dict[str, list] = {}
+        for edit in edits:
+            entries = sections.get(edit.section)
+            if entries is None:
+                entries = sections[edit.section] = list(getattr(cv, edit.section) or [])
+            if edit.entry >= len(entries):
+                raise ValueError(f"No {edit.section} entry {edit.entry}")
+            entry = entries[edit.entry]
+            summaries = list(entry.summaries or [])
+            if edit.index >= len(summaries):
+                raise ValueError(
+                    f"No summary {edit.index} in {edit.section} entry {edit.entry}"
+                )
+            summaries[edit.index] = summaries[edit.index].model_copy(
+                update={"text": edit.text}
+            )
+            entries[edit.entry] = entry.model_copy(update={"summaries": summaries})
+        return cv.model_copy(update=sections)
+
+    def _apply_detected_skills(
+        self,
+        cv: UserCV,
+        located: List[Tuple[str, int, int, UserCV.Summary]],
+        detected_skills: List[List[SkillItem]],
+        min_score: float,
+    ) -> UserCV:
+        """
+        Returns the CV with detected skills merged into the located summaries,
+        copying only what changes.
+        """
+        # section -> entry index -> summary index -> updated summary
+        updates: Dict[str, Dict[int, Dict[int, UserCV.Summary]]] = {}
+        for (section, entry_idx, summary_idx, summary), skills in zip(
+            located, detected_skills
+        ):
+            technologies = self._merge_technologies(
+                summary.technologies, skills, min_score
+            )
+            if technologies is not None:
+                updates.setdefault(section, {}).setdefault(entry_idx, {})[
+                    summary_idx
+                ] = summary.model_copy(update={"technologies": technologies})
+
+        if not updates:
+            return cv
+
+        section_updates = {}
+        for section, entry_updates in updates.items():
+            entries = list(getattr(cv, section))
+            for entry_idx, summary_updates in entry_updates.items():
+                entry = entries[entry_idx]
+                summaries = list(entry.summaries)
+                for summary_idx, summary in summary_updates.items():
+                    summaries[summary_idx] = summary
+                entries[entry_idx] = entry.model_copy(update={"summaries": summaries})
+            section_updates[section] = entries
+
+        return cv.model_copy(update=section_updates)
+
     def generate_bio(
         self,
         user_cv: UserCV,
@@ -78,68 +263,28 @@ class CVService:
             str: Generated bio text.
         """
         try:
-            # Load prompt template
-            with open(prompt_path, "r", encoding="utf-8") as f:
-                prompt_data = json.load(f)
-
-            # Prepare UserCV data for Llama
-            personal_info = user_cv.personal_info or {}
-            usercv_payload = {
-                "personal_info": {
-                    "first_name": getattr(personal_info, "first_name", ""),
-                    "last_name": getattr(personal_info, "last_name", ""),
-                },
-                "role": getattr(personal_info, "summary", "") or "",
-                "experience_years": 0,
-                "skills": [
-                    {"name": skill, "level": "", "years_of_experience": 0}
-                    for skill in (user_cv.skills or [])
-                ],
-            }
-
-            # Prepare JobOffer data for Llama
-            job_offer_payload = {
-                "description": job_offer.description or "",
-                "technologies": job_offer.technologies or [],
-                "requirements": job_offer.requirements or [],
-                "responsibilities": job_offer.responsibilities or [],
-            }
-
-            # Prepare SkillResult data for Llama
-            skill_result_payload = {
-                "hard_skills": [
-                    [skill.name, skill.score]
-                    for skill in (skill_result.hard_skills or [])
-                ],
-                "soft_skills": [
-                    [skill.name, skill.score]
-                    for skill in (skill_result.soft_skills or [])
-                ],
-                "tools": [
-                    [skill.name, skill.score] for skill in (skill_result.tools or [])
-                ],
-            }
-
-            llama_payload = {
-                "instructions": prompt_data.get("instructions", {}),
-                "UserCV": usercv_payload,
-                "JobOffer": job_offer_payload,
-                "SkillResult": skill_result_payload,
-            }
+            with stage("cv_service", "prompt_building"):
+                payload = self._build_bio_payload(
+                    user_cv, skill_result, job_offer, prompt_path
+                )
 
             # Send request to locally hosted Llama server
-            payload = {
-                "model": OLLAMA_MODEL,
-                "prompt": json.dumps(llama_payload),
-                "stream": False,
-            }
-
-            print(payload)
-            response = requests.post(llama_url, json=payload, timeout=300)
-            response.raise_for_status()
-            result = response.json()
-            print("response", response)
-            print("result", result)
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                with stage("cv_service", "ollama_request"):
+                    set_attribute("model", payload.get("model"))
+                    response = requests.post(
+                        llama_url, json=payload, timeout=time_left(300)
+                    )
+                    set_attribute("status", response.status_code)
+                    response.raise_for_status()
+                    result = response.json()
+                outcome = "success"
+            finally:
+                OLLAMA_REQUEST_DURATION.labels(outcome).observe(
+                    time.perf_counter() - start
+                )
             bio = result.get("response", "")
 
             if not bio:
@@ -147,6 +292,8 @@ class CVService:
 
             return bio
         except requests.Timeout:
+            # Timed out at the request's deadline rather than Ollama's limit
+            check_deadline()
             raise HTTPException(
                 status_code=504,
                 detail="Request to Ollama service timed out. Please try again later.",
@@ -156,44 +303,155 @@ class CVService:
                 status_code=503,
                 detail="Could not connect to Ollama service. Service might be unavailable.",
             )
+        except RequestAborted:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=500, detail=f"Error generating bio: {str(e)}"
             )
 
-    def _analyze_summary(
-        self, summary: UserCV.Summary, alpha: float, top_k: int, min_score: float
+    def _build_bio_payload(
+        self,
+        user_cv: UserCV,
+        skill_result: SkillResult,
+        job_offer: JobOffer,
+        prompt_path: str,
+    ) -> dict:
+        """
+        Builds the Ollama generate request for generate_bio.
+        """
+        # Load prompt template
+        with open(prompt_path, "r", encoding="utf-8") as f:
+            prompt_data = json.load(f)
+
+        # Prepare UserCV data for Llama
+        personal_info = user_cv.personalInfo
+        usercv_payload = {
+            "personal_info": {
+                "first_name": personal_info.firstName,
+                "last_name": personal_info.lastName,
+            },
+            "role": personal_info.summary or "",
+            "experience_years": 0,
+            "skills": [
+                {"name": skill, "level": "", "years_of_experience": 0}
+                for skill in (user_cv.skills or [])
+            ],
+        }
+
+        # Prepare JobOffer data for Llama
+        job_offer_payload = {
+            "description": job_offer.description or "",
+            "technologies": job_offer.technologies or [],
+            "requirements": job_offer.requirements or [],
+            "responsibilities": job_offer.responsibilities or [],
+        }
+
+        # Prepare SkillResult data for Llama
+        skill_result_payload = {
+            "hard_skills": [
+                [skill.name, skill.score] for skill in (skill_result.hard_skills or [])
+            ],
+            "soft_skills": [
+                [skill.name, skill.score] for skill in (skill_result.soft_skills or [])
+            ],
+            "tools": [
+                [skill.name, skill.score] for skill in (skill_result.tools or [])
+            ],
+        }
+
+        llama_payload = {
+            "instructions": prompt_data.get("instructions", {}),
+            "UserCV": usercv_payload,
+            "JobOffer": job_offer_payload,
+            "SkillResult": skill_result_payload,
+        }
+
+        return {
+            "model": OLLAMA_MODEL,
+            "prompt": json.dumps(llama_payload),
+            "stream": False,
+        }
+
+    @staticmethod
+    def _collect_summaries(
+        cv: UserCV,
+    ) -> List[Tuple[str, int, int, UserCV.Summary]]:
+        """
+        Collects non-empty summaries from experiences and projects together
+        with their location (section, entry index, summary index).
+        """
+        located = []
+        for section in ("experience", "projects"):
+            for entry_idx, entry in enumerate(getattr(cv, section) or []):
+                for summary_idx, summary in enumerate(entry.summaries or []):
+                    if summary.text and summary.text.strip():
+                        located.append((section, entry_idx, summary_idx, summary))
+        return located
+
+    def _detect_skills(
+        self,
+        texts: List[str],
+        alpha: float,
+        top_k: int,
+        model: Optional[str] = None,
+        tenant: Optional[TenantSkillSet] = None,
+    ) -> List[List[SkillItem]]:
+        if not texts:
+            return []
+        text_analyzer = select_text_analyzer(self.text_analyzer, model, texts)
+        tenant_index = (
+            text_analyzer.get_tenant_index(tenant) if tenant is not None else None
+        )
+        # Analyze all summaries in one batch
+        return text_analyzer.extract_skills_from_texts(
+            texts, alpha, top_k, tenant_index=tenant_index
+        )
+
+    def _add_technologies(
+        self,
+        summary: UserCV.Summary,
+        detected_skills: List[SkillItem],
+        min_score: float,
     ) -> None:
         """
-        Analyzes a single Summary.text and adds detected technologies to Summary.technologies.
+        Adds detected technologies to Summary.technologies.
 
         Args:
-            summary: Summary to analyze (modified in-place)
-            alpha: Boosting factor for exact matches
-            top_k: Number of best matches to consider per sentence
+            summary: Summary to update (modified in-place)
+            detected_skills: Skills detected in Summary.text
             min_score: Minimum score for including technologies
         """
-        if not summary.text or not summary.text.strip():
-            return
-
-        # Detect technologies from text
-        detected_skills = self.text_analyzer.extract_skills_from_text(
-            summary.text, alpha, top_k
+        technologies = self._merge_technologies(
+            summary.technologies, detected_skills, min_score
         )
+        if technologies is not None:
+            summary.technologies = technologies
 
+    @staticmethod
+    def _merge_technologies(
+        technologies: Optional[List[str]],
+        detected_skills: List[SkillItem],
+        min_score: float,
+    ) -> Optional[List[str]]:
+        """
+        Returns the technologies extended with detected skills scoring at least
+        min_score, or None if nothing new was detected.
+        """
         # Filter by minimum score and take only names (without score)
         detected_tech_names = [
             skill.name for skill in detected_skills if skill.score >= min_score
         ]
+        if not detected_tech_names:
+            return None
+
+        if not technologies:
+            # Create a new list of technologies
+            return detected_tech_names
 
-        if detected_tech_names:
-            if summary.technologies:
-                # Add new technologies, avoiding duplicates and preserving order
-                existing_tech = set(summary.technologies)
-                new_tech = [
-                    tech for tech in detected_tech_names if tech not in existing_tech
-                ]
-                summary.technologies.extend(new_tech)
-            else:
-                # Create a new list of technologies
-                summary.technologies = detected_tech_names
+        # Add new technologies, avoiding duplicates and preserving order
+        existing_tech = set(technologies)
+        new_tech = [tech for tech in detected_tech_names if tech not in existing_tech]
+        if not new_tech:
+            return None
+        return technologies + new_tech
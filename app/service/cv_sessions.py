@@ -0,0 +1,126 @@
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.model.skill_result import SkillItem
+from app.model.user_cv import UserCV
+
+
+def summary_fingerprint(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CVSession:
+    """
+    State of one CV editing session: the last analyzed CV, the parameters it
+    was analyzed with and the skills detected in each summary text.
+
+    Detections are keyed by a fingerprint of the summary text, so a summary
+    is re-encoded only when its text changes, wherever it moves in the CV.
+    Callers hold `lock` while reading or updating the session.
+
+    Args:
+        token: Identifier handed to the client
+    """
+
+    def __init__(self, token: str):
+        self.token = token
+        self.lock = threading.Lock()
+        self.cv: Optional[UserCV] = None
+        self.params: Dict[str, Any] = {}
+        self._settings: Optional[Tuple] = None
+        self._detections: Dict[str, List[SkillItem]] = {}
+
+    def detect(
+        self,
+        texts: List[str],
+        settings: Tuple,
+        detect: Callable[[List[str]], List[List[SkillItem]]],
+    ) -> Tuple[List[List[SkillItem]], int]:
+        """
+        Returns the skills detected in each text, analyzing only new texts.
+
+        Args:
+            texts: Summary texts of the current CV
+            settings: Everything detections depend on besides the text (model,
+                alpha, top_k, taxonomy); earlier detections are dropped when
+                it changes
+            detect: Analyzes a batch of texts
+
+        Returns:
+            Detected skills per text and the number of texts analyzed
+        """
+        if settings != self._settings:
+            self._settings = settings
+            self._detections = {}
+
+        fingerprints = [summary_fingerprint(text) for text in texts]
+        missing: Dict[str, str] = {}
+        for fingerprint, text in zip(fingerprints, texts):
+            if fingerprint not in self._detections:
+                missing.setdefault(fingerprint, text)
+        if missing:
+            detected = detect(list(missing.values()))
+            self._detections.update(zip(missing, detected))
+
+        # Forget summaries that were edited away
+        self._detections = {
+            fingerprint: self._detections[fingerprint] for fingerprint in fingerprints
+        }
+        return [self._detections[fp] for fp in fingerprints], len(missing)
+
+
+class CVSessionStore:
+    """
+    Bounded set of CV sessions; the least recently used session is dropped
+    when full and sessions idle for longer than ttl_seconds expire.
+
+    Args:
+        max_sessions: Maximum number of live sessions
+        ttl_seconds: Idle time after which a session expires
+        clock: Monotonic time source
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        ttl_seconds: float = 1800.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._sessions: "OrderedDict[str, Tuple[float, CVSession]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self) -> CVSession:
+        session = CVSession(secrets.token_urlsafe(16))
+        with self._lock:
+            self._sessions[session.token] = (self.clock(), session)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get(self, token: str) -> Optional[CVSession]:
+        """Returns the live session with the token, None if unknown or expired."""
+        with self._lock:
+            entry = self._sessions.get(token)
+            if entry is None:
+                return None
+            last_used, session = entry
+            now = self.clock()
+            if now - last_used >= self.ttl_seconds:
+                del self._sessions[token]
+                return None
+            self._sessions[token] = (now, session)
+            self._sessions.move_to_end(token)
+            return session
+
+    def delete(self, token: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(token, None) is not None
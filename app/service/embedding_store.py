@@ -0,0 +1,225 @@
+import fcntl
+import hashlib
+import os
+import re
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from app.util.metrics import EMBEDDING_STORE_LOOKUPS
+
+_MAGIC = b"EMBSTOR1"
+# Magic, vector dimension, slot count
+_HEADER = struct.Struct("<8sIQ")
+# Slots start on a page boundary
+_HEADER_BYTES = 4096
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sentence(sentence: str) -> str:
+    """Collapses whitespace, so re-wrapped text finds the same embedding."""
+    return _WHITESPACE.sub(" ", sentence).strip()
+
+
+def _record_type(dim: int) -> np.dtype:
+    return np.dtype(
+        [
+            ("key", "<u8", (2,)),
+            ("stamp", "<u4"),
+            ("pad", "<u4"),
+            ("vector", "<f4", (dim,)),
+        ]
+    )
+
+
+class _Table:
+    """The memory-mapped slot file of one model."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            magic, dim, capacity = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not an embedding store file")
+        self.dim = dim
+        self.capacity = capacity
+        self.records = np.memmap(
+            path,
+            dtype=_record_type(dim),
+            mode="r+",
+            offset=_HEADER_BYTES,
+            shape=(capacity,),
+        )
+
+    @staticmethod
+    def create(path: str, dim: int, capacity: int) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, dim, capacity).ljust(_HEADER_BYTES, b"\0"))
+            # Sparse until slots are written; all-zero keys are empty slots
+            f.truncate(_HEADER_BYTES + capacity * _record_type(dim).itemsize)
+        os.replace(tmp_path, path)
+
+
+class EmbeddingStore:
+    """
+    On-disk store of sentence embeddings shared by all workers of a node.
+
+    Each model has one file of fixed-size slots (16-byte key of the normalized
+    sentence, last-use stamp, float32 vector) forming an open-addressing hash
+    table of max_entries slots, memory-mapped by every process. A sentence
+    lives in one of probe consecutive slots after its hash; storing it into a
+    full window evicts the least recently used slot of the window, which keeps
+    the file at a fixed size. Lookups take no lock: a slot being overwritten
+    clears its key first and sets it last, and a lookup re-checks the key
+    after copying the vector. Writers serialize on a file lock.
+
+    Args:
+        directory: Directory of the store files, created if missing
+        max_entries: Slots per model file; an existing file keeps its size
+        probe: Slots a sentence may occupy, bounding lookups and eviction
+        clock: Wall-clock time source for the last-use stamps
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_entries: int = 100_000,
+        probe: int = 8,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.probe = probe
+        self.clock = clock
+        os.makedirs(directory, exist_ok=True)
+        self._tables: Dict[str, _Table] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, model_id: str, sentences: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Looks up the embeddings of sentences.
+
+        Args:
+            model_id: Encoder the embeddings were computed with
+            sentences: Sentences to look up
+
+        Returns:
+            The stored embedding of each sentence, None when it is not stored
+        """
+        table = self._table(model_id)
+        if table is None:
+            EMBEDDING_STORE_LOOKUPS.labels("miss").inc(len(sentences))
+            return [None] * len(sentences)
+
+        keys = table.records["key"]
+        stamps = table.records["stamp"]
+        stored_vectors = table.records["vector"]
+        stamp = self._stamp()
+        found = []
+        for sentence in sentences:
+            key = self._key(model_id, sentence)
+            vector = None
+            for slot in self._window(key, table.capacity):
+                first, second = keys[slot]
+                if not first and not second:
+                    break
+                if first == key[0] and second == key[1]:
+                    vector = np.array(stored_vectors[slot])
+                    first, second = keys[slot]
+                    if first != key[0] or second != key[1]:
+                        # Evicted while being read
+                        vector = None
+                    elif stamps[slot] != stamp:
+                        stamps[slot] = stamp
+                    break
+            found.append(vector)
+        hits = sum(vector is not None for vector in found)
+        EMBEDDING_STORE_LOOKUPS.labels("hit").inc(hits)
+        EMBEDDING_STORE_LOOKUPS.labels("miss").inc(len(sentences) - hits)
+        return found
+
+    def store(self, model_id: str, sentences: List[str], vectors: np.ndarray) -> None:
+        """
+        Stores the embeddings of sentences, evicting old ones as needed.
+
+        Args:
+            model_id: Encoder the embeddings were computed with
+            sentences: Encoded sentences
+            vectors: Their embeddings, one row per sentence
+        """
+        if not sentences:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock, self._file_lock(model_id):
+            table = self._table(model_id)
+            if table is None:
+                _Table.create(self._path(model_id), vectors.shape[1], self.max_entries)
+                table = self._table(model_id)
+            if vectors.shape[1] != table.dim:
+                raise ValueError("Embedding dimension does not match the store")
+
+            keys = table.records["key"]
+            stamps = table.records["stamp"]
+            stored_vectors = table.records["vector"]
+            stamp = self._stamp()
+            for sentence, vector in zip(sentences, vectors):
+                key = self._key(model_id, sentence)
+                window = self._window(key, table.capacity)
+                slot = next(
+                    (
+                        slot
+                        for slot in window
+                        if not keys[slot].any() or (keys[slot] == key).all()
+                    ),
+                    None,
+                )
+                if slot is None:
+                    slot = min(window, key=lambda slot: stamps[slot])
+                keys[slot] = 0
+                stored_vectors[slot] = vector
+                stamps[slot] = stamp
+                keys[slot] = key
+
+    def _table(self, model_id: str) -> Optional[_Table]:
+        table = self._tables.get(model_id)
+        if table is None:
+            path = self._path(model_id)
+            if not os.path.exists(path):
+                return None
+            table = self._tables[model_id] = _Table(path)
+        return table
+
+    def _path(self, model_id: str) -> str:
+        digest = hashlib.blake2b(model_id.encode("utf-8"), digest_size=8).hexdigest()
+        return os.path.join(self.directory, f"{digest}.emb")
+
+    @staticmethod
+    def _key(model_id: str, sentence: str) -> np.ndarray:
+        digest = hashlib.blake2b(
+            normalize_sentence(sentence).encode("utf-8"),
+            digest_size=16,
+            key=model_id.encode("utf-8")[:64],
+        ).digest()
+        key = np.frombuffer(digest, dtype="<u8").copy()
+        # All-zero keys mark empty slots
+        key[0] |= 1
+        return key
+
+    def _window(self, key: np.ndarray, capacity: int) -> List[int]:
+        start = int(key[1] % capacity)
+        return [(start + i) % capacity for i in range(min(self.probe, capacity))]
+
+    def _stamp(self) -> int:
+        return int(self.clock()) & 0xFFFFFFFF
+
+    @contextmanager
+    def _file_lock(self, model_id: str):
+        with open(self._path(model_id) + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
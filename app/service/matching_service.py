@@ -0,0 +1,146 @@
+import numpy as np
+from typing import Iterable, List, Optional
+from app.model.match_result import MatchItem, MatchResult
+from app.model.skill_result import SkillResult
+from app.model.user_cv import UserCV
+from app.service.text_analyzer import TextAnalyzer
+from app.util.embeddings import normalize_rows
+
+
+class MatchingService:
+    """
+    Scores CVs against job offers (and vice versa) in a single matrix operation.
+
+    Every document is turned into a weighted vector over the skill taxonomy,
+    projected onto the skill embeddings already held by TextAnalyzer and
+    compared by cosine similarity, so related skills (e.g. "Spring" and
+    "Spring Boot") contribute to the score even without an exact overlap.
+    """
+
+    def __init__(self, text_analyzer: Optional[TextAnalyzer] = None):
+        self.text_analyzer = text_analyzer or TextAnalyzer()
+
+    def match_cv_to_offers(
+        self, cv: UserCV, offers: List[SkillResult], top_k: int = 10
+    ) -> MatchResult:
+        """
+        Ranks analyzed job offers by how well they fit a CV.
+
+        Args:
+            cv: CV whose Summary.technologies and skills describe the candidate
+            offers: Analysis results of the offers to rank
+            top_k: Number of best offers to return
+
+        Returns:
+            MatchResult with offer indices ordered by descending score
+        """
+        query = self.cv_skill_weights([cv])
+        candidates = self.offer_skill_weights(offers)
+        return self._rank(query, candidates, top_k)
+
+    def match_offer_to_cvs(
+        self, skill_result: SkillResult, cvs: List[UserCV], top_k: int = 10
+    ) -> MatchResult:
+        """
+        Ranks CVs by how well they fit an analyzed job offer.
+
+        Args:
+            skill_result: Analysis result of the offer
+            cvs: CVs to rank
+            top_k: Number of best CVs to return
+
+        Returns:
+            MatchResult with CV indices ordered by descending score
+        """
+        query = self.offer_skill_weights([skill_result])
+        candidates = self.cv_skill_weights(cvs)
+        return self._rank(query, candidates, top_k)
+
+    def cv_skill_weights(self, cvs: List[UserCV]) -> np.ndarray:
+        """
+        Builds a (len(cvs), num_skills) matrix counting how often each
+        taxonomy skill is listed in a CV's summaries and skills.
+        """
+        rows, cols, values = [], [], []
+        for row, cv in enumerate(cvs):
+            for name in self._cv_skill_names(cv):
+                rows.append(row)
+                cols.append(name)
+                values.append(1.0)
+        return self._build_weights(len(cvs), rows, cols, values)
+
+    def offer_skill_weights(self, offers: List[SkillResult]) -> np.ndarray:
+        """
+        Builds a (len(offers), num_skills) matrix holding the score of every
+        skill detected in each offer.
+        """
+        rows, cols, values = [], [], []
+        for row, offer in enumerate(offers):
+            for category in (offer.hard_skills, offer.soft_skills, offer.tools):
+                for item in category or []:
+                    rows.append(row)
+                    cols.append(item.name)
+                    values.append(item.score)
+        return self._build_weights(len(offers), rows, cols, values)
+
+    def embed_skill_weights(self, weights: np.ndarray) -> np.ndarray:
+        """
+        Projects skill weight vectors onto the skill embeddings and normalizes
+        them, so that a dot product of two rows is their cosine similarity.
+        """
+        _, skill_matrix = self.text_analyzer.get_skill_matrix()
+        return normalize_rows(weights @ skill_matrix)
+
+    def _rank(
+        self, query: np.ndarray, candidates: np.ndarray, top_k: int
+    ) -> MatchResult:
+        if candidates.shape[0] == 0 or top_k <= 0:
+            return MatchResult(matches=[])
+
+        query_emb = self.embed_skill_weights(query)[0]
+        candidate_embs = self.embed_skill_weights(candidates)
+        scores = candidate_embs @ query_emb
+
+        top_idx = self._top_k_indices(scores, top_k)
+        return MatchResult(
+            matches=[MatchItem(index=int(i), score=float(scores[i])) for i in top_idx]
+        )
+
+    @staticmethod
+    def _top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+        if top_k < scores.shape[0]:
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(scores.shape[0])
+        # Stable sort keeps the input order for equal scores
+        order = np.argsort(-scores[candidates], kind="stable")
+        return candidates[order]
+
+    def _build_weights(
+        self,
+        num_rows: int,
+        rows: List[int],
+        names: List[str],
+        values: List[float],
+    ) -> np.ndarray:
+        _, skill_matrix = self.text_analyzer.get_skill_matrix()
+        positions = self.text_analyzer.get_skill_positions()
+        weights = np.zeros((num_rows, skill_matrix.shape[0]), dtype=np.float32)
+
+        known = [
+            (row, positions[name.casefold()], value)
+            for row, name, value in zip(rows, names, values)
+            if name and name.casefold() in positions
+        ]
+        if known:
+            row_idx, col_idx, vals = zip(*known)
+            np.add.at(weights, (list(row_idx), list(col_idx)), vals)
+        return weights
+
+    @staticmethod
+    def _cv_skill_names(cv: UserCV) -> Iterable[str]:
+        for section in (cv.experience, cv.projects):
+            for entry in section or []:
+                for summary in entry.summaries or []:
+                    yield from summary.technologies or []
+        yield from cv.skills or []
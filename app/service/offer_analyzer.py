@@ -1,6 +1,10 @@
-from typing import Optional
+import numpy as np
+from typing import List, Optional, Tuple
 from app.model.skill_result import SkillResult
-from app.service.text_analyzer import TextAnalyzer
+from app.service.tenant_skills import TenantSkillSet
+from app.service.text_analyzer import TextAnalyzer, select_text_analyzer
+from app.util.stages import stage
+from app.util.tracing import set_attribute
 
 
 class OfferAnalyzer:
@@ -8,6 +12,10 @@ class OfferAnalyzer:
     Serwis do analizowania ofert pracy i wyekstraktowania umiejętności.
     """
 
+    # Sections holding clean lists of skill names, resolved by direct lookup
+    # in the skill taxonomy before falling back to the encoder
+    STRUCTURED_SECTIONS = ("technologies",)
+
     def __init__(self):
         self.text_analyzer = TextAnalyzer()
 
@@ -17,6 +25,8 @@ class OfferAnalyzer:
         alpha: float = 1.0,
         top_k: int = 5,
         max_results_per_category: Optional[int] = None,
+        model: Optional[str] = None,
+        tenant: Optional[TenantSkillSet] = None,
     ) -> SkillResult:
         """
         Analyzes a job offer and extracts skills.
@@ -26,10 +36,154 @@ class OfferAnalyzer:
             alpha: Boosting factor for exact matches
             top_k: Number of best matches to consider per sentence
             max_results_per_category: Maximum number of results per category
+            model: Encoder name, "auto" to choose by language, None for the default
+            tenant: Tenant skills detected in addition to the taxonomy
 
         Returns:
             SkillResult with detected skills grouped by category
         """
+        return self._analyze_job_offer(
+            job_description,
+            alpha,
+            top_k,
+            max_results_per_category,
+            model,
+            tenant,
+        )[0]
+
+    def analyze_and_vectorize_job_offer(
+        self,
+        job_description: dict,
+        alpha: float = 1.0,
+        top_k: int = 5,
+        max_results_per_category: Optional[int] = None,
+        model: Optional[str] = None,
+        tenant: Optional[TenantSkillSet] = None,
+    ) -> Tuple[SkillResult, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Same as analyze_job_offer, also building the vectors under which the
+        offer is stored, equal to those of vectorize_job_offer. The pooled
+        embedding reuses the sentence embeddings of the analysis and encodes
+        only the sentences it skipped (structured skill names and fragments
+        dropped by the fragment filter).
+
+        Returns:
+            SkillResult with detected skills grouped by category, and the
+            pooled embedding and skill weights of the offer
+        """
+        result, embedding = self._analyze_job_offer(
+            job_description,
+            alpha,
+            top_k,
+            max_results_per_category,
+            model,
+            tenant,
+            vectorize=True,
+        )
+        if embedding is None:
+            return result, self.vectorize_job_offer(job_description, result)
+        return result, (embedding, self._skill_vector(result))
+
+    def _analyze_job_offer(
+        self,
+        job_description: dict,
+        alpha: float,
+        top_k: int,
+        max_results_per_category: Optional[int],
+        model: Optional[str],
+        tenant: Optional[TenantSkillSet],
+        vectorize: bool = False,
+    ) -> Tuple[SkillResult, Optional[np.ndarray]]:
+        text_analyzer = select_text_analyzer(
+            self.text_analyzer, model, self._extract_texts(job_description)
+        )
+        # Stored embeddings come from the default encoder; offers analyzed with
+        # another one are embedded separately
+        vectorize = vectorize and text_analyzer is self.text_analyzer
+        tenant_index = (
+            text_analyzer.get_tenant_index(tenant) if tenant is not None else None
+        )
+
+        with stage("offer_analyzer", "lexical_lookup"):
+            exact_matches = []
+            unstructured = {}
+            for section, section_content in job_description.items():
+                if section in self.STRUCTURED_SECTIONS and isinstance(
+                    section_content, list
+                ):
+                    matched, unmatched = text_analyzer.match_skill_names(
+                        section_content, tenant_index
+                    )
+                    exact_matches.extend(matched)
+                    # Only items missing from the taxonomy go through the encoder
+                    section_content = unmatched or None
+                unstructured[section] = section_content
+
+        with stage("offer_analyzer", "section_extraction"):
+            texts = self._extract_texts(unstructured)
+            set_attribute("texts", len(texts))
+
+        # Analyze extracted texts
+        options = dict(
+            exact_matches=list(dict.fromkeys(exact_matches)),
+            tenant_index=tenant_index,
+        )
+        if vectorize:
+            categorized_scores, embedding = text_analyzer.analyze_and_embed_texts(
+                texts,
+                alpha,
+                top_k,
+                max_results_per_category,
+                pooled_texts=self._extract_texts(job_description),
+                **options,
+            )
+        else:
+            embedding = None
+            categorized_scores = text_analyzer.analyze_multiple_texts(
+                texts, alpha, top_k, max_results_per_category, **options
+            )
+
+        result = SkillResult(
+            hard_skills=categorized_scores["hard_skills"],
+            soft_skills=categorized_scores["soft_skills"],
+            tools=categorized_scores["tools"],
+        )
+        return result, embedding
+
+    def vectorize_job_offer(
+        self, job_description: dict, skill_result: SkillResult
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Builds the vectors under which an analyzed offer is stored.
+
+        Args:
+            job_description: Dictionary with job offer description
+            skill_result: Analysis result of the offer
+
+        Returns:
+            Pooled embedding of the offer texts and skill weights in taxonomy order
+        """
+        embedding = self.text_analyzer.embed_texts(self._extract_texts(job_description))
+        return embedding, self._skill_vector(skill_result)
+
+    def _skill_vector(self, skill_result: SkillResult) -> np.ndarray:
+        names, _ = self.text_analyzer.get_skill_matrix()
+        positions = self.text_analyzer.get_skill_positions()
+        skill_vector = np.zeros(len(names), dtype=np.float32)
+        for category in (
+            skill_result.hard_skills,
+            skill_result.soft_skills,
+            skill_result.tools,
+        ):
+            for item in category or []:
+                position = positions.get(item.name.casefold())
+                if position is not None:
+                    skill_vector[position] += item.score
+
+        return skill_vector
+
+    @staticmethod
+    def _extract_texts(job_description: dict) -> List[str]:
         # Extract texts from structured job description content
         texts = []
         for section, section_content in job_description.items():
@@ -44,14 +198,4 @@ class OfferAnalyzer:
 
             if text.strip():
                 texts.append(text)
-
-        # Analyze extracted texts
-        categorized_scores = self.text_analyzer.analyze_multiple_texts(
-            texts, alpha, top_k, max_results_per_category
-        )
-
-        return SkillResult(
-            hard_skills=categorized_scores["hard_skills"],
-            soft_skills=categorized_scores["soft_skills"],
-            tools=categorized_scores["tools"],
-        )
+        return texts
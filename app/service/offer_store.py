@@ -0,0 +1,348 @@
+import fcntl
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from app.util.embeddings import normalize_rows
+
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = ".lock"
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.f32"
+SIGNATURES_FILE = "signatures.u8"
+IDS_FILE = "ids.log"
+
+# Rows scored per block during exact search, bounds the temporary memory
+SCAN_BLOCK_ROWS = 65536
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+
+class OfferStore:
+    """
+    Local, append-only store of analyzed offers for similar-offer retrieval.
+
+    Every offer is kept as one float32 record holding its pooled text embedding
+    followed by its skill vector, both L2-normalized, in a memory-mapped file.
+    Offer ids map to rows through an append-only log: re-adding an id or deleting
+    it only appends a log entry and leaves a dead row behind, which compact()
+    removes. Files of one layout live in a generation directory named by the
+    CURRENT pointer, so compaction swaps them atomically and other processes
+    sharing the directory pick up appends and compactions on their next call.
+    """
+
+    def __init__(self, directory: str, signature_bits: int = 64):
+        self.directory = directory
+        self.signature_bits = signature_bits
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._generation: Optional[int] = None
+        self._reset(0)
+
+    def add(self, offer_id: str, embedding: np.ndarray, skill_vector: np.ndarray):
+        """
+        Appends an offer, replacing any earlier record stored under the same id.
+
+        Args:
+            offer_id: Identifier of the offer
+            embedding: Pooled text embedding of the offer
+            skill_vector: Skill weights of the offer in taxonomy order
+        """
+        embedding = np.asarray(embedding, dtype=np.float32)
+        skill_vector = np.asarray(skill_vector, dtype=np.float32)
+
+        with self._lock, self._file_lock():
+            self._refresh()
+            if self._meta is None:
+                self._create_meta(embedding.shape[0], skill_vector.shape[0])
+            if (embedding.shape[0], skill_vector.shape[0]) != (
+                self._meta["embedding_dim"],
+                self._meta["skill_dim"],
+            ):
+                raise ValueError("Offer vector dimensions do not match the store")
+
+            record = np.concatenate(
+                [normalize_rows(embedding), normalize_rows(skill_vector)]
+            )
+            signature = np.packbits(
+                self._hyperplanes @ record[: embedding.shape[0]] > 0
+            )
+
+            row = len(self._row_ids)
+            self._append(VECTORS_FILE, record.tobytes(), row * record.nbytes)
+            self._append(SIGNATURES_FILE, signature.tobytes(), row * signature.nbytes)
+            self._write_log({"op": "add", "id": offer_id})
+
+    def delete(self, offer_id: str) -> bool:
+        """
+        Marks an offer as deleted.
+
+        Returns:
+            False if the offer is not in the store
+        """
+        with self._lock, self._file_lock():
+            self._refresh()
+            if offer_id not in self._id_to_row:
+                return False
+            self._write_log({"op": "delete", "id": offer_id})
+            return True
+
+    def similar(
+        self, offer_id: str, top_k: int = 10, approximate: bool = False
+    ) -> List[Tuple[str, float]]:
+        """
+        Finds the offers most similar to a stored offer.
+
+        The score is the mean of the cosine similarities of the pooled embeddings
+        and of the skill vectors. Exact search scans all records; approximate
+        search first shortlists candidates by Hamming distance between
+        random-hyperplane signatures of the embeddings and rescores only those.
+
+        Args:
+            offer_id: Identifier of the stored query offer
+            top_k: Number of offers to return
+            approximate: Use signature shortlisting instead of a full scan
+
+        Returns:
+            (offer_id, score) pairs ordered by descending score
+
+        Raises:
+            KeyError: If the offer is not in the store
+        """
+        with self._lock:
+            self._refresh()
+            if offer_id not in self._id_to_row:
+                raise KeyError(offer_id)
+
+            query_row = self._id_to_row[offer_id]
+            vectors = self._map(VECTORS_FILE, np.float32, self._record_dim())
+            query = np.array(vectors[query_row])
+            live = np.frombuffer(bytes(self._live), dtype=np.bool_).copy()
+            live[query_row] = False
+            row_ids = self._row_ids
+            # Mapped with the vectors, so that both come from one generation even
+            # if compact() switches to the next one before the search is done
+            signatures = (
+                self._map(SIGNATURES_FILE, np.uint8, self._signature_bytes())
+                if approximate
+                else None
+            )
+
+        if approximate:
+            rows = self._shortlist(signatures, live, query_row, top_k)
+            scores = (vectors[rows] @ query) / 2
+        else:
+            rows = np.flatnonzero(live)
+            scores = np.concatenate(
+                [
+                    (vectors[rows[start : start + SCAN_BLOCK_ROWS]] @ query) / 2
+                    for start in range(0, len(rows), SCAN_BLOCK_ROWS)
+                ]
+                or [np.zeros(0, dtype=np.float32)]
+            )
+
+        if top_k < len(rows):
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(len(rows))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(row_ids[rows[i]], float(scores[i])) for i in best]
+
+    def compact(self) -> int:
+        """
+        Rewrites the store without deleted and replaced records.
+
+        Returns:
+            Number of removed records
+        """
+        with self._lock, self._file_lock():
+            self._refresh()
+            total = len(self._row_ids)
+            live_rows = sorted(self._id_to_row.values())
+            removed = total - len(live_rows)
+            if removed == 0:
+                return 0
+
+            old_dir = self._generation_dir(self._generation)
+            new_generation = self._generation + 1
+            new_dir = self._generation_dir(new_generation)
+            os.makedirs(new_dir, exist_ok=True)
+            shutil.copyfile(
+                os.path.join(old_dir, META_FILE), os.path.join(new_dir, META_FILE)
+            )
+
+            for name, dtype, width in (
+                (VECTORS_FILE, np.float32, self._record_dim()),
+                (SIGNATURES_FILE, np.uint8, self._signature_bytes()),
+            ):
+                source = self._map(name, dtype, width)
+                with open(os.path.join(new_dir, name), "wb") as f:
+                    for start in range(0, len(live_rows), SCAN_BLOCK_ROWS):
+                        block = live_rows[start : start + SCAN_BLOCK_ROWS]
+                        f.write(np.ascontiguousarray(source[block]).tobytes())
+
+            with open(os.path.join(new_dir, IDS_FILE), "w", encoding="utf-8") as f:
+                for row in live_rows:
+                    f.write(json.dumps({"op": "add", "id": self._row_ids[row]}) + "\n")
+
+            tmp_current = os.path.join(self.directory, CURRENT_FILE + ".tmp")
+            with open(tmp_current, "w", encoding="utf-8") as f:
+                f.write(str(new_generation))
+            os.replace(tmp_current, os.path.join(self.directory, CURRENT_FILE))
+
+            self._reset(new_generation)
+            self._refresh()
+            shutil.rmtree(old_dir, ignore_errors=True)
+            return removed
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._id_to_row)
+
+    def __contains__(self, offer_id: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return offer_id in self._id_to_row
+
+    def _shortlist(
+        self, signatures: np.ndarray, live: np.ndarray, query_row: int, top_k: int
+    ) -> np.ndarray:
+        rows = np.flatnonzero(live)
+        candidates = max(top_k * 20, 200)
+        if candidates >= len(rows):
+            return rows
+        distances = _POPCOUNT[signatures[rows] ^ signatures[query_row]].sum(axis=1)
+        return rows[np.argpartition(distances, candidates - 1)[:candidates]]
+
+    def _refresh(self):
+        generation = self._read_generation()
+        if generation != self._generation:
+            self._reset(generation)
+
+        log_path = os.path.join(self._generation_dir(generation), IDS_FILE)
+        if not os.path.exists(log_path):
+            return
+        with open(log_path, "rb") as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        # Ignore a trailing line that is still being written by another process
+        complete = data[: data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            self._apply(json.loads(line))
+        self._log_offset += len(complete)
+
+        if self._meta is None:
+            self._set_meta(self._read_meta())
+
+    def _apply(self, entry: dict):
+        offer_id = entry["id"]
+        previous = self._id_to_row.pop(offer_id, None)
+        if previous is not None:
+            self._live[previous] = 0
+        if entry["op"] == "add":
+            self._id_to_row[offer_id] = len(self._row_ids)
+            self._row_ids.append(offer_id)
+            self._live.append(1)
+
+    def _reset(self, generation: int):
+        self._generation = generation
+        self._meta: Optional[dict] = None
+        self._hyperplanes: Optional[np.ndarray] = None
+        self._id_to_row: Dict[str, int] = {}
+        self._row_ids: List[str] = []
+        self._live = bytearray()
+        self._log_offset = 0
+        self._maps: Dict[str, np.ndarray] = {}
+
+    def _create_meta(self, embedding_dim: int, skill_dim: int):
+        meta = {
+            "embedding_dim": embedding_dim,
+            "skill_dim": skill_dim,
+            "signature_bits": self.signature_bits,
+        }
+        os.makedirs(self._generation_dir(self._generation), exist_ok=True)
+        with open(
+            os.path.join(self._generation_dir(self._generation), META_FILE),
+            "w",
+            encoding="utf-8",
+        ) as f:
+            json.dump(meta, f)
+        self._set_meta(meta)
+
+    def _read_meta(self) -> Optional[dict]:
+        path = os.path.join(self._generation_dir(self._generation), META_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _set_meta(self, meta: Optional[dict]):
+        self._meta = meta
+        self._hyperplanes = None
+        if meta is not None:
+            # Fixed seed so that every process derives the same hyperplanes
+            rng = np.random.default_rng(0)
+            self._hyperplanes = rng.standard_normal(
+                (meta["signature_bits"], meta["embedding_dim"])
+            ).astype(np.float32)
+
+    def _record_dim(self) -> int:
+        return self._meta["embedding_dim"] + self._meta["skill_dim"]
+
+    def _signature_bytes(self) -> int:
+        return (self._meta["signature_bits"] + 7) // 8
+
+    def _map(self, name: str, dtype, width: int) -> np.ndarray:
+        rows = len(self._row_ids)
+        mapped = self._maps.get(name)
+        if mapped is None or mapped.shape[0] != rows:
+            if rows == 0:
+                mapped = np.zeros((0, width), dtype=dtype)
+            else:
+                mapped = np.memmap(
+                    os.path.join(self._generation_dir(self._generation), name),
+                    dtype=dtype,
+                    mode="r",
+                    shape=(rows, width),
+                )
+            self._maps[name] = mapped
+        return mapped
+
+    def _append(self, name: str, data: bytes, offset: int):
+        path = os.path.join(self._generation_dir(self._generation), name)
+        with open(path, "ab") as f:
+            # Drop a partial record left behind by an interrupted append
+            if f.tell() != offset:
+                f.truncate(offset)
+            f.write(data)
+
+    def _write_log(self, entry: dict):
+        path = os.path.join(self._generation_dir(self._generation), IDS_FILE)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._refresh()
+
+    def _read_generation(self) -> int:
+        try:
+            with open(
+                os.path.join(self.directory, CURRENT_FILE), "r", encoding="utf-8"
+            ) as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _generation_dir(self, generation: int) -> str:
+        return os.path.join(self.directory, f"gen-{generation}")
+
+    @contextmanager
+    def _file_lock(self):
+        with open(os.path.join(self.directory, LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
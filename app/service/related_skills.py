@@ -0,0 +1,101 @@
+from typing import Dict, List, Optional
+import numpy as np
+
+# Rows of the similarity matrix computed at once, bounding the memory used
+_BLOCK_ROWS = 1024
+
+
+class SkillNeighbours:
+    """
+    The most similar skills of every taxonomy skill, precomputed.
+
+    Holds the top_n neighbours per skill as two (num_skills, top_n) arrays,
+    neighbour positions and cosine similarities, sorted by descending
+    similarity; answering a lookup is a dictionary lookup and a row slice.
+
+    Args:
+        names: Skill names in taxonomy order
+        categories: Category of each skill
+        matrix: L2-normalized skill embeddings, one row per skill
+        top_n: Neighbours kept per skill
+        version: Taxonomy version the table was built for
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        categories: List[str],
+        matrix: np.ndarray,
+        top_n: int = 20,
+        version: Optional[str] = None,
+    ):
+        self.names = names
+        self.categories = categories
+        self.version = version
+        self.top_n = min(top_n, max(len(names) - 1, 0))
+        self.indices, self.scores = self._build(matrix, self.top_n)
+        self._positions: Dict[str, int] = {
+            name.casefold(): position for position, name in enumerate(names)
+        }
+
+    @staticmethod
+    def _build(matrix: np.ndarray, top_n: int):
+        count = len(matrix)
+        # Positions fit 16 bits for any realistic taxonomy
+        index_type = np.uint16 if count <= np.iinfo(np.uint16).max else np.int32
+        indices = np.zeros((count, top_n), dtype=index_type)
+        scores = np.zeros((count, top_n), dtype=np.float32)
+        if top_n == 0:
+            return indices, scores
+        matrix = matrix.astype(np.float32, copy=False)
+        for start in range(0, count, _BLOCK_ROWS):
+            block = matrix[start : start + _BLOCK_ROWS] @ matrix.T
+            rows = np.arange(len(block))
+            # A skill is not its own neighbour
+            block[rows, rows + start] = -np.inf
+            top = np.argpartition(-block, top_n - 1, axis=1)[:, :top_n]
+            top_scores = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            indices[start : start + len(block)] = np.take_along_axis(top, order, 1)
+            scores[start : start + len(block)] = np.take_along_axis(
+                top_scores, order, 1
+            )
+        return indices, scores
+
+    def position(self, name: str) -> Optional[int]:
+        """Returns the position of a skill, matched case-insensitively."""
+        return self._positions.get(name.strip().casefold())
+
+    def related(
+        self,
+        position: int,
+        limit: int = 10,
+        category: Optional[str] = None,
+        min_score: float = 0.0,
+    ) -> List[dict]:
+        """
+        Returns the most similar skills of the skill at a position.
+
+        Args:
+            position: Position of the skill, see position
+            limit: Maximum number of skills returned
+            category: Only skills of this category
+            min_score: Minimum cosine similarity
+
+        Returns:
+            Dicts of name, category and score, by descending score
+        """
+        related = []
+        for neighbour, score in zip(self.indices[position], self.scores[position]):
+            if score < min_score or len(related) >= limit:
+                break
+            if category is not None and self.categories[neighbour] != category:
+                continue
+            related.append(
+                {
+                    "name": self.names[neighbour],
+                    "category": self.categories[neighbour],
+                    "score": float(score),
+                }
+            )
+        return related
@@ -0,0 +1,317 @@
+import fcntl
+import os
+import threading
+import time
+import numpy as np
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from app.config.skill_config import hard_skills, soft_skills, tools
+from app.model.skill_result import SkillResult
+
+CATEGORIES = ("hard_skills", "soft_skills", "tools")
+
+
+class _Buckets:
+    """Counters of a ring of time buckets, one column per taxonomy skill."""
+
+    def __init__(self, retention_buckets: int, num_skills: int):
+        shape = (retention_buckets, num_skills)
+        self.counts = np.zeros(shape, dtype=np.int64)
+        self.score_sums = np.zeros(shape, dtype=np.float64)
+        self.offers = np.zeros(retention_buckets, dtype=np.int64)
+        # Absolute bucket number held by each ring slot, -1 when unused
+        self.bucket_ids = np.full(retention_buckets, -1, dtype=np.int64)
+
+    def slot(self, bucket: int) -> Optional[int]:
+        slot = bucket % len(self.bucket_ids)
+        held = self.bucket_ids[slot]
+        if held == bucket:
+            return slot
+        if held > bucket:
+            # Older than the retention window
+            return None
+        self.counts[slot] = 0
+        self.score_sums[slot] = 0
+        self.offers[slot] = 0
+        self.bucket_ids[slot] = bucket
+        return slot
+
+    def merge(self, other: "_Buckets", columns=slice(None), targets=slice(None)):
+        """Adds the counters of other, whose columns map onto targets."""
+        for row, bucket in enumerate(other.bucket_ids):
+            if bucket < 0:
+                continue
+            slot = self.slot(int(bucket))
+            if slot is None:
+                continue
+            self.offers[slot] += other.offers[row]
+            self.counts[slot, targets] += other.counts[row, columns]
+            self.score_sums[slot, targets] += other.score_sums[row, columns]
+
+
+class SkillStats:
+    """
+    Skill-demand counters updated incrementally as offers are analyzed.
+
+    Counts and score sums are kept per taxonomy skill in a ring of time
+    buckets backed by fixed-size numpy arrays, so recording an offer and
+    querying a window cost the same however many offers were seen.
+
+    With a path, a background thread writes the counters to disk every
+    flush_seconds, and close() writes them once more. Worker processes
+    sharing the path each add the offers they recorded since their last
+    write to the file under a file lock, then pick up the totals of all
+    workers from it, so queries see every worker's offers with at most
+    flush_seconds of delay.
+
+    Args:
+        path: File the counters are persisted to, None to keep them in memory
+        bucket_seconds: Length of one time bucket
+        retention_buckets: Number of buckets kept; older ones are overwritten
+        flush_seconds: Time between two writes to disk
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        bucket_seconds: int = 86400,
+        retention_buckets: int = 90,
+        flush_seconds: float = 60.0,
+    ):
+        self.path = path
+        self.bucket_seconds = bucket_seconds
+        self.retention_buckets = retention_buckets
+        self.flush_seconds = flush_seconds
+
+        self.skills: List[str] = []
+        categories = []
+        for category, names in enumerate((hard_skills, soft_skills, tools)):
+            self.skills.extend(names)
+            categories.extend([category] * len(names))
+        self.categories = np.array(categories, dtype=np.int8)
+        self._positions = {name: i for i, name in enumerate(self.skills)}
+
+        # Totals queried by top_skills, and the part not yet written to disk
+        self._totals = self._empty()
+        self._pending = self._empty()
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty = False
+        self._stopped = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        # Modification time and size of the file when last read or written
+        self._file_version = None
+        if path:
+            self._totals = self._read(path)
+            self._file_version = self._stat()
+
+    def record(self, skill_result: SkillResult, timestamp: Optional[float] = None):
+        """
+        Adds the skills of one analyzed offer to the counters.
+
+        Args:
+            skill_result: Skills detected in the offer
+            timestamp: Time of the offer in seconds since the epoch, now if None
+        """
+        positions, scores = [], []
+        for category in CATEGORIES:
+            for item in getattr(skill_result, category) or []:
+                position = self._positions.get(item.name)
+                if position is not None:
+                    positions.append(position)
+                    scores.append(item.score)
+
+        bucket = int((time.time() if timestamp is None else timestamp)) // (
+            self.bucket_seconds
+        )
+        with self._lock:
+            slots = [
+                (buckets, buckets.slot(bucket))
+                for buckets in (self._totals, self._pending)
+            ]
+            if any(slot is None for _, slot in slots):
+                return
+            for buckets, slot in slots:
+                buckets.offers[slot] += 1
+                if positions:
+                    np.add.at(buckets.counts[slot], positions, 1)
+                    np.add.at(buckets.score_sums[slot], positions, scores)
+            self._dirty = True
+        self._start_flusher()
+
+    def top_skills(
+        self,
+        buckets: int,
+        limit: int = 10,
+        category: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> Tuple[int, List[Dict]]:
+        """
+        Returns the most demanded skills over the last `buckets` time buckets.
+
+        Args:
+            buckets: Window length in buckets, including the current one
+            limit: Maximum number of skills returned
+            category: Only skills of this category (e.g. "hard_skills")
+            now: End of the window in seconds since the epoch, now if None
+
+        Returns:
+            Number of offers in the window and the skills ordered by descending
+            offer count, then by score sum
+        """
+        if category is not None and category not in CATEGORIES:
+            raise ValueError(f"Unknown category {category}")
+
+        self._start_flusher()
+        last = int(time.time() if now is None else now) // self.bucket_seconds
+        first = last - min(buckets, self.retention_buckets) + 1
+        with self._lock:
+            totals = self._totals
+            in_window = (totals.bucket_ids >= first) & (totals.bucket_ids <= last)
+            offers = int(totals.offers[in_window].sum())
+            counts = totals.counts[in_window].sum(axis=0)
+            score_sums = totals.score_sums[in_window].sum(axis=0)
+
+        candidates = np.flatnonzero(counts)
+        if category is not None:
+            candidates = candidates[
+                self.categories[candidates] == CATEGORIES.index(category)
+            ]
+        # Highest count first, ties broken by score sum, then taxonomy order
+        order = np.lexsort((candidates, -score_sums[candidates], -counts[candidates]))
+        skills = []
+        for position in candidates[order][:limit]:
+            count = int(counts[position])
+            skills.append(
+                {
+                    "name": self.skills[position],
+                    "category": CATEGORIES[self.categories[position]],
+                    "count": count,
+                    "score_sum": float(score_sums[position]),
+                    "mean_score": float(score_sums[position]) / count,
+                }
+            )
+        return offers, skills
+
+    def flush(self) -> None:
+        """
+        Adds the offers recorded since the last write to the file and reloads
+        the totals of all workers from it.
+        """
+        if not self.path:
+            return
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, self._empty()
+                dirty, self._dirty = self._dirty, False
+
+            if dirty:
+                try:
+                    with self._file_lock():
+                        merged = self._read(self.path)
+                        merged.merge(pending)
+                        self._write(merged)
+                        self._file_version = self._stat()
+                except Exception:
+                    # Kept for the next write
+                    with self._lock:
+                        pending.merge(self._pending)
+                        self._pending = pending
+                        self._dirty = True
+                    raise
+            elif self._stat() != self._file_version:
+                # Written by another worker
+                with self._file_lock():
+                    merged = self._read(self.path)
+                    self._file_version = self._stat()
+            else:
+                return
+
+            with self._lock:
+                # Offers recorded meanwhile are not in the file yet
+                merged.merge(self._pending)
+                self._totals = merged
+
+    def close(self) -> None:
+        self._stopped.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+    def _empty(self) -> _Buckets:
+        return _Buckets(self.retention_buckets, len(self.skills))
+
+    def _start_flusher(self) -> None:
+        # Started on first use rather than on import, so forked processes
+        # that never touch the statistics run no thread
+        if self.path and self._flusher is None:
+            with self._lock:
+                if self._flusher is None and not self._stopped.is_set():
+                    self._flusher = threading.Thread(
+                        target=self._run_flusher, name="skill-stats-flush", daemon=True
+                    )
+                    self._flusher.start()
+
+    def _run_flusher(self) -> None:
+        while not self._stopped.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except OSError:
+                # Retried on the next interval
+                pass
+
+    @contextmanager
+    def _file_lock(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, buckets: _Buckets) -> None:
+        # Written aside and renamed, so readers never see a partial file
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                skills=np.array(self.skills),
+                counts=buckets.counts,
+                score_sums=buckets.score_sums,
+                offers=buckets.offers,
+                bucket_ids=buckets.bucket_ids,
+                bucket_seconds=np.array(self.bucket_seconds),
+            )
+        os.replace(tmp_path, self.path)
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self, path: str) -> _Buckets:
+        buckets = self._empty()
+        if not os.path.exists(path):
+            return buckets
+        with np.load(path) as data:
+            if int(data["bucket_seconds"]) != self.bucket_seconds:
+                raise ValueError(
+                    f"{path} was written with {int(data['bucket_seconds'])}s buckets"
+                )
+            stored = _Buckets(len(data["bucket_ids"]), len(data["skills"]))
+            stored.counts = data["counts"]
+            stored.score_sums = data["score_sums"]
+            stored.offers = data["offers"]
+            stored.bucket_ids = data["bucket_ids"]
+            # Map stored skills onto the current taxonomy, dropping removed ones
+            positions = [self._positions.get(str(name)) for name in data["skills"]]
+            columns = [
+                i for i, position in enumerate(positions) if position is not None
+            ]
+            buckets.merge(stored, columns, [positions[i] for i in columns])
+        return buckets
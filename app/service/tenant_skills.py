@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+import numpy as np
+from app.config.service_config import TENANT_INDEX_CACHE_SIZE, TENANT_SKILLS_DIR
+from app.util.metrics import TENANT_INDEX_REQUESTS
+
+CATEGORIES = ("hard_skills", "soft_skills", "tools")
+
+# Tenant ids name files, so they are restricted to a safe alphabet
+TENANT_ID = re.compile(r"[A-Za-z0-9_.-]{1,64}")
+
+
+@dataclass
+class TenantSkillSet:
+    """Extra skills of one tenant, layered on the global taxonomy."""
+
+    tenant: str
+    hard_skills: List[str] = field(default_factory=list)
+    soft_skills: List[str] = field(default_factory=list)
+    tools: List[str] = field(default_factory=list)
+
+    @property
+    def version(self) -> str:
+        """Content hash of the skill set, changing whenever a skill does."""
+        skills = [getattr(self, category) for category in CATEGORIES]
+        return hashlib.sha256(json.dumps(skills).encode("utf-8")).hexdigest()[:16]
+
+    def skills(self) -> List[Tuple[str, str]]:
+        """Returns (name, category) of every skill, in category order."""
+        return [
+            (name, category)
+            for category in CATEGORIES
+            for name in getattr(self, category)
+        ]
+
+
+class TenantSkillStore:
+    """
+    Tenant skill sets stored as one JSON file each in a directory. Reads
+    compare the file's modification time with the cached copy, so a set
+    written by one worker is seen by the others.
+
+    Args:
+        directory: Directory of the files, created if missing
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._cache: Dict[str, Tuple[int, TenantSkillSet]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, tenant: str) -> Optional[TenantSkillSet]:
+        """Returns the skill set of a tenant, None if it has none."""
+        path = self._path(tenant)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = self._cache.get(tenant)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path) as f:
+            skill_set = TenantSkillSet(tenant=tenant, **json.load(f))
+        with self._lock:
+            self._cache[tenant] = (mtime, skill_set)
+        return skill_set
+
+    def put(self, skill_set: TenantSkillSet) -> None:
+        """Stores a tenant's skill set, replacing any previous one."""
+        path = self._path(skill_set.tenant)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {category: getattr(skill_set, category) for category in CATEGORIES},
+                f,
+            )
+        os.replace(tmp_path, path)
+
+    def delete(self, tenant: str) -> bool:
+        """Deletes a tenant's skill set; returns whether it existed."""
+        with self._lock:
+            self._cache.pop(tenant, None)
+        try:
+            os.remove(self._path(tenant))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _path(self, tenant: str) -> str:
+        if not TENANT_ID.fullmatch(tenant):
+            raise ValueError(f"Invalid tenant id {tenant}")
+        return os.path.join(self.directory, f"{tenant}.json")
+
+
+@dataclass
+class TenantSkillIndex:
+    """
+    Embeddings of a tenant's skills for one encoder, searched next to the
+    global skill matrix. Skills already in the global taxonomy are left out.
+    """
+
+    version: str
+    names: List[str]
+    categories: Dict[str, str]
+    # L2-normalized, one row per name
+    matrix: np.ndarray
+    # Normalized name to skill name, for structured skill lists
+    lookup: Dict[str, str]
+    # Words protecting fragments from the fragment filter
+    protected_words: FrozenSet[str]
+
+    def rows(self) -> Dict[str, np.ndarray]:
+        return dict(zip(self.names, self.matrix))
+
+
+class TenantIndexCache:
+    """
+    Tenant skill indexes of the most recently used tenants and encoders.
+
+    An index is rebuilt when its version changes; the builder gets the
+    outdated index, so embeddings of skills that did not change are reused
+    rather than encoded again.
+
+    Args:
+        max_entries: Indexes kept; the least recently used are evicted
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], TenantSkillIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    def get(
+        self,
+        key: Tuple[str, str],
+        version: str,
+        build: Callable[[Optional[TenantSkillIndex]], TenantSkillIndex],
+    ) -> TenantSkillIndex:
+        """
+        Returns the index of a (model id, tenant) key at a version.
+
+        Args:
+            key: Encoder model id and tenant
+            version: Version the index must have
+            build: Builds the index from the outdated one, if any
+        """
+        with self._lock:
+            index = self._entries.get(key)
+            if index is not None and index.version == version:
+                self._entries.move_to_end(key)
+                TENANT_INDEX_REQUESTS.labels("hit").inc()
+                return index
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        # Concurrent requests of a tenant wait for one build
+        with build_lock:
+            with self._lock:
+                index = self._entries.get(key)
+            if index is None or index.version != version:
+                TENANT_INDEX_REQUESTS.labels(
+                    "build" if index is None else "update"
+                ).inc()
+                index = build(index)
+            with self._lock:
+                self._entries[key] = index
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._build_locks.pop(evicted, None)
+        return index
+
+    def discard(self, tenant: str) -> None:
+        """Drops the indexes of a tenant for every encoder."""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == tenant]:
+                del self._entries[key]
+
+
+# Stored tenant skill sets; None when TENANT_SKILLS_DIR is unset
+tenant_skill_store = TenantSkillStore(TENANT_SKILLS_DIR) if TENANT_SKILLS_DIR else None
+
+tenant_indexes = TenantIndexCache(max_entries=TENANT_INDEX_CACHE_SIZE)
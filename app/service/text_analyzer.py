@@ -1,33 +1,406 @@
 from sentence_transformers import util
+import hashlib
+import json
 import numpy as np
+import re
+import threading
+import weakref
 from collections import defaultdict
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from app.model.skill_result import SkillItem
+from app.config import skill_config
+from app.config.service_config import (
+    EMBEDDING_STORE_DIR,
+    EMBEDDING_STORE_MAX_ENTRIES,
+    FRAGMENT_FILTER_BOILERPLATE,
+    FRAGMENT_FILTER_ENABLED,
+    FRAGMENT_FILTER_MIN_CHARS,
+    RELATED_SKILLS_TOP_N,
+)
 from app.config.skill_config import hard_skills, soft_skills, tools
-from app.util.embeddings import get_model
+from app.service.embedding_store import EmbeddingStore
+from app.service.related_skills import SkillNeighbours
+from app.service.tenant_skills import TenantSkillIndex, TenantSkillSet, tenant_indexes
+from app.util.autotune import encoder_settings
+from app.util.embeddings import (
+    get_model,
+    model_id,
+    normalize_rows,
+    select_model,
+    to_numpy,
+)
+from app.util.fragment_filter import DEFAULT_BOILERPLATE, FragmentFilter, skill_words
+from app.util.metrics import ENCODER_BATCH_SIZE, SENTENCES_ENCODED
+from app.util.profiling import record
+from app.util.stages import stage
+from app.util.tracing import span
+
+# Characters ignored when comparing skill names ("Spring-Boot" == "spring boot")
+_SKILL_NAME_SEPARATORS = re.compile(r"[\s\-_.]+")
+
+# Score of a skill listed verbatim: a sentence matching only that skill with
+# similarity 1.0, boosted as an exact match
+EXACT_MATCH_SIMILARITY = 1.0
+
+
+def normalize_skill_name(name: str) -> str:
+    return _SKILL_NAME_SEPARATORS.sub("", name.casefold())
+
+
+def taxonomy_table() -> List[Tuple[str, str]]:
+    """Taxonomy skills with their category; a skill's position is its id."""
+    return [
+        (name, category)
+        for category in ("hard_skills", "soft_skills", "tools")
+        for name in getattr(skill_config, category)
+    ]
+
+
+def taxonomy_version() -> str:
+    """Fingerprint of the skill taxonomy, changing with any edit or reload."""
+    taxonomy = [skill_config.hard_skills, skill_config.soft_skills, skill_config.tools]
+    return hashlib.sha256(json.dumps(taxonomy).encode("utf-8")).hexdigest()[:16]
+
+
+# Applied to sentence fragments before encoding; None encodes every fragment
+fragment_filter = (
+    FragmentFilter(
+        hard_skills + soft_skills + tools,
+        min_chars=FRAGMENT_FILTER_MIN_CHARS,
+        boilerplate=(
+            DEFAULT_BOILERPLATE
+            if FRAGMENT_FILTER_BOILERPLATE is None
+            else FRAGMENT_FILTER_BOILERPLATE
+        ),
+    )
+    if FRAGMENT_FILTER_ENABLED
+    else None
+)
+
+# Sentence embeddings persisted across requests, workers and restarts; None
+# encodes every sentence
+embedding_store = (
+    EmbeddingStore(EMBEDDING_STORE_DIR, max_entries=EMBEDDING_STORE_MAX_ENTRIES)
+    if EMBEDDING_STORE_DIR
+    else None
+)
+
+# Skill embeddings are shared by all analyzers using the same model
+_skill_embeddings_cache: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_skill_embeddings_lock = threading.Lock()
+
+# Analyzers of non-default models, created on first request for the model
+_analyzers: Dict[Optional[str], "TextAnalyzer"] = {}
+_analyzers_lock = threading.Lock()
+
+
+def select_text_analyzer(
+    default: "TextAnalyzer", requested: Optional[str], texts: List[str]
+) -> "TextAnalyzer":
+    """
+    Returns the analyzer for the encoder a request asks for.
+
+    Args:
+        default: Analyzer of the default model
+        requested: Model name, "auto" to choose by detected language, or None
+        texts: Texts of the request, used for language detection
+
+    Returns:
+        The default analyzer, or the shared analyzer of the selected model
+    """
+    model_name = select_model(requested, texts)
+    if model_name is None:
+        return default
+    return TextAnalyzer.for_model(model_name)
+
+
+def _build_lookup(skills) -> Dict[str, str]:
+    lookup = {}
+    for skill in skills:
+        lookup[normalize_skill_name(skill)] = skill
+        # "React" and "Vue" are common spellings of "React.js" and "Vue.js"
+        if skill.lower().endswith(".js"):
+            lookup.setdefault(normalize_skill_name(skill[:-3]), skill)
+    return lookup
 
 
 class TextAnalyzer:
-    def __init__(self):
-        self.model = get_model()
-        self.skill_embeddings = self._prepare_skill_embeddings()
+    """
+    Detects skills from the taxonomy in free text.
+
+    The encoder and the skill embeddings are loaded on first use (or by the
+    startup warm-up), so constructing an analyzer is cheap. The encoder is
+    looked up in the model registry on every use rather than kept here, so
+    the registry can evict it. The skill embeddings and everything derived
+    from them are rebuilt when the taxonomy changes; the skill index accessors
+    (get_skill_matrix and the like) check for changes.
+
+    Args:
+        model_name: Encoder from the model registry, None for the default one
+    """
+
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name
+        self._taxonomy_version = None
+        self._reset_skill_index()
+
+    def _reset_skill_index(self) -> None:
+        self._skill_embeddings = None
+        self._skill_matrix = None
+        self._skill_positions = None
+        self._skill_lookup = None
+        self._skill_neighbours = None
+
+    def _check_taxonomy(self) -> None:
+        version = taxonomy_version()
+        if version != self._taxonomy_version:
+            self._reset_skill_index()
+            self._taxonomy_version = version
 
-    def _prepare_skill_embeddings(self) -> Dict[str, Dict[str, Any]]:
+    @classmethod
+    def for_model(cls, model_name: Optional[str]) -> "TextAnalyzer":
+        """Returns the shared analyzer of a model from the registry."""
+        with _analyzers_lock:
+            analyzer = _analyzers.get(model_name)
+            if analyzer is None:
+                analyzer = _analyzers[model_name] = cls(model_name)
+        return analyzer
+
+    @property
+    def model(self):
+        return get_model(self.model_name)
+
+    @property
+    def skill_embeddings(self) -> Dict[str, Dict[str, Any]]:
+        if self._skill_embeddings is None:
+            self._skill_embeddings = self.prepare_skill_embeddings()
+        return self._skill_embeddings
+
+    def prepare_skill_embeddings(
+        self, progress: Optional[Callable[[float], None]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the embeddings of all taxonomy skills, encoding them once per
+        model, one batch per category.
+
+        Args:
+            progress: Called with the fraction of encoded categories
+
+        Returns:
+            Mapping of skill name to its embedding and category
+        """
+        model = self.model
+        version = taxonomy_version()
+        with _skill_embeddings_lock:
+            cached = _skill_embeddings_cache.get(model)
+            if cached is None or cached[0] != version:
+                cached = _skill_embeddings_cache[model] = (
+                    version,
+                    self._encode_skills(model, progress),
+                )
+        if progress is not None:
+            progress(1.0)
+        return cached[1]
+
+    @staticmethod
+    def _encode_skills(
+        model, progress: Optional[Callable[[float], None]] = None
+    ) -> Dict[str, Dict[str, Any]]:
         all_skills = {
-            "hard_skills": hard_skills,
-            "soft_skills": soft_skills,
-            "tools": tools,
+            category: getattr(skill_config, category)
+            for category in ("hard_skills", "soft_skills", "tools")
         }
 
         skill_embeddings = {}
-        for category_name, skills_list in all_skills.items():
-            for skill in skills_list:
+        for done, (category_name, skills_list) in enumerate(all_skills.items()):
+            ENCODER_BATCH_SIZE.labels("skills").observe(len(skills_list))
+            embeddings = model.encode(
+                skills_list,
+                convert_to_tensor=True,
+                batch_size=encoder_settings.batch_size,
+            )
+            for skill, embedding in zip(skills_list, embeddings):
                 skill_embeddings[skill] = {
-                    "embedding": self.model.encode(skill, convert_to_tensor=True),
+                    "embedding": embedding,
                     "category": category_name,
                 }
+            if progress is not None:
+                progress((done + 1) / len(all_skills))
         return skill_embeddings
 
+    def get_skill_matrix(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Returns the skill names and their L2-normalized embeddings stacked
+        into a (num_skills, dim) matrix, both in taxonomy order.
+
+        The matrix is built on first use and reused afterwards.
+        """
+        self._check_taxonomy()
+        if self._skill_matrix is None:
+            names = list(self.skill_embeddings.keys())
+            matrix = np.stack(
+                [to_numpy(self.skill_embeddings[name]["embedding"]) for name in names]
+            )
+            self._skill_matrix = (names, normalize_rows(matrix))
+        return self._skill_matrix
+
+    def get_skill_positions(self) -> Dict[str, int]:
+        """
+        Returns a mapping from case-folded skill name to its row in the skill matrix.
+        """
+        self._check_taxonomy()
+        if self._skill_positions is None:
+            names, _ = self.get_skill_matrix()
+            self._skill_positions = {
+                name.casefold(): position for position, name in enumerate(names)
+            }
+        return self._skill_positions
+
+    def match_skill_names(
+        self, items: List[str], tenant_index: Optional[TenantSkillIndex] = None
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Resolves items of a structured list (e.g. ["Java", "spring boot"]) by
+        direct lookup of their normalized names in the skill taxonomy.
+
+        Args:
+            items: Skill names to resolve
+            tenant_index: Tenant skills looked up after the taxonomy
+
+        Returns:
+            Matched taxonomy skill names and the items that did not match
+        """
+        lookup = self._get_skill_lookup()
+        tenant_lookup = tenant_index.lookup if tenant_index is not None else {}
+        matched, unmatched = [], []
+        for item in items:
+            name = normalize_skill_name(str(item))
+            skill = lookup.get(name) or tenant_lookup.get(name)
+            if skill is not None:
+                matched.append(skill)
+            elif str(item).strip():
+                unmatched.append(str(item))
+        return matched, unmatched
+
+    def get_skill_neighbours(self) -> SkillNeighbours:
+        """
+        Returns the precomputed most similar skills of every taxonomy skill
+        (RELATED_SKILLS_TOP_N each), built from the skill matrix on first use.
+        """
+        names, matrix = self.get_skill_matrix()
+        if self._skill_neighbours is None:
+            self._skill_neighbours = SkillNeighbours(
+                names,
+                [self.skill_embeddings[name]["category"] for name in names],
+                matrix,
+                top_n=RELATED_SKILLS_TOP_N,
+                version=self._taxonomy_version,
+            )
+        return self._skill_neighbours
+
+    def _get_skill_lookup(self) -> Dict[str, str]:
+        self._check_taxonomy()
+        if self._skill_lookup is None:
+            self._skill_lookup = _build_lookup(self.skill_embeddings)
+        return self._skill_lookup
+
+    def get_tenant_index(self, skill_set: TenantSkillSet) -> TenantSkillIndex:
+        """
+        Returns the index of a tenant's skills for this analyzer's encoder,
+        searched next to the taxonomy by the extraction methods.
+
+        Indexes are cached across requests (TENANT_INDEX_CACHE_SIZE of them,
+        least recently used evicted). When the skill set or the taxonomy
+        changes, only skills without an embedding in the outdated index are
+        encoded. Skills already in the taxonomy are left to the taxonomy.
+
+        Args:
+            skill_set: The tenant's skills
+
+        Returns:
+            The tenant skill index
+        """
+        version = f"{skill_set.version}:{taxonomy_version()}"
+
+        def build(previous: Optional[TenantSkillIndex]) -> TenantSkillIndex:
+            lookup = self._get_skill_lookup()
+            categories = {}
+            for name, category in skill_set.skills():
+                name = name.strip()
+                if name and normalize_skill_name(name) not in lookup:
+                    categories.setdefault(name, category)
+            names = list(categories)
+
+            rows = previous.rows() if previous is not None else {}
+            missing = [name for name in names if name not in rows]
+            record("tenant_skills_encoded", len(missing))
+            if missing:
+                ENCODER_BATCH_SIZE.labels("skills").observe(len(missing))
+                with span("encoder.batch", model=self.model_name, skills=len(missing)):
+                    encoded = to_numpy(
+                        self.model.encode(
+                            missing,
+                            convert_to_tensor=True,
+                            batch_size=encoder_settings.batch_size,
+                        )
+                    )
+                rows.update(
+                    zip(missing, normalize_rows(encoded.reshape(len(missing), -1)))
+                )
+
+            if names:
+                matrix = np.stack([rows[name] for name in names])
+            else:
+                _, skill_matrix = self.get_skill_matrix()
+                matrix = np.zeros((0, skill_matrix.shape[1]), dtype=np.float32)
+            return TenantSkillIndex(
+                version=version,
+                names=names,
+                categories=categories,
+                matrix=matrix,
+                lookup=_build_lookup(names),
+                protected_words=skill_words(names),
+            )
+
+        with stage("text_analyzer", "tenant_index"):
+            return tenant_indexes.get(
+                (model_id(self.model_name), skill_set.tenant), version, build
+            )
+
+    def embed_texts(
+        self, texts: List[str], encoded: Optional[Dict[str, np.ndarray]] = None
+    ) -> np.ndarray:
+        """
+        Encodes all sentences of the given texts in one batch and mean-pools
+        their normalized embeddings into a single normalized vector.
+
+        Args:
+            texts: Texts to embed
+            encoded: Embeddings of sentences already encoded, by sentence; only
+                the other sentences are encoded
+
+        Returns:
+            Pooled embedding, or an empty array when there is nothing to encode
+        """
+        sentences = [s for text in texts for s in self._split_sentences(text)]
+        if not sentences:
+            return np.zeros(0, dtype=np.float32)
+        encoded = dict(encoded or {})
+        missing = list(dict.fromkeys(s for s in sentences if s not in encoded))
+        if missing:
+            embeddings = to_numpy(self._encode_sentences(missing, "pooling"))
+            encoded.update(zip(missing, embeddings))
+        return self.pool_embeddings(np.stack([encoded[s] for s in sentences]))
+
+    @staticmethod
+    def pool_embeddings(sentence_embs) -> np.ndarray:
+        """Mean-pools normalized sentence embeddings into a normalized vector."""
+        embeddings = to_numpy(sentence_embs)
+        if not len(embeddings):
+            return np.zeros(0, dtype=np.float32)
+        pooled = normalize_rows(embeddings.reshape(len(embeddings), -1)).mean(axis=0)
+        return normalize_rows(pooled)
+
     def extract_skills_from_text(
         self,
         text: str,
@@ -47,30 +420,167 @@ class TextAnalyzer:
         Returns:
             List of SkillItem with detected skills
         """
+        return self.extract_skills_from_texts(
+            [text], alpha, top_k, similarity_threshold
+        )[0]
+
+    def extract_skills_from_texts(
+        self,
+        texts: List[str],
+        alpha: float = 1.0,
+        top_k: int = 5,
+        similarity_threshold: float = 0.3,
+        tenant_index: Optional[TenantSkillIndex] = None,
+    ) -> List[List[SkillItem]]:
+        """
+        Extracts skills from several texts at once.
+
+        Sentences of all texts are encoded in one batched call and scored against
+        the skill taxonomy in one pass; the matches are then aggregated per text,
+        giving the same result as calling extract_skills_from_text on each text.
+
+        Args:
+            texts: Texts to analyze
+            alpha: Boosting factor for exact matches
+            top_k: Number of best matches to consider per sentence
+            similarity_threshold: Minimum similarity threshold for including a skill
+            tenant_index: Tenant skills scored together with the taxonomy
+
+        Returns:
+            List of detected skills for each text, in input order
+        """
+        return self._extract_skills(
+            texts, alpha, top_k, similarity_threshold, tenant_index
+        )[0]
+
+    def _extract_skills(
+        self,
+        texts: List[str],
+        alpha: float,
+        top_k: int,
+        similarity_threshold: float,
+        tenant_index: Optional[TenantSkillIndex],
+    ) -> Tuple[List[List[SkillItem]], Dict[str, np.ndarray]]:
+        """Same as extract_skills_from_texts, also returning the embeddings of
+        the encoded sentences by sentence."""
+        with stage("text_analyzer", "segmentation"):
+            sentences_per_text = [self._split_sentences(text) for text in texts]
+        if fragment_filter is not None:
+            protected_words = (
+                tenant_index.protected_words if tenant_index is not None else None
+            )
+            with stage("text_analyzer", "fragment_filter"):
+                dropped = 0
+                for i, text_sentences in enumerate(sentences_per_text):
+                    sentences_per_text[i], reasons = fragment_filter.filter(
+                        text_sentences, protected_words
+                    )
+                    dropped += sum(reasons.values())
+            record("fragments_dropped", dropped)
+        sentences = [s for text_sentences in sentences_per_text for s in text_sentences]
+        record("sentences_found", len(sentences))
+        if not sentences:
+            return [[] for _ in texts], {}
+
+        SENTENCES_ENCODED.observe(len(sentences))
+        with stage("text_analyzer", "encoding"):
+            sentence_embs = self._encode_sentences(sentences)
+        with stage("text_analyzer", "similarity"):
+            sentence_matches = self._match_sentences(
+                sentence_embs, top_k, similarity_threshold, tenant_index
+            )
+
+        with stage("text_analyzer", "aggregation"):
+            results = []
+            offset = 0
+            for text_sentences in sentences_per_text:
+                text_matches = sentence_matches[offset : offset + len(text_sentences)]
+                offset += len(text_sentences)
+                results.append(self._aggregate_matches(text_matches, alpha))
+        return results, dict(zip(sentences, to_numpy(sentence_embs)))
+
+    @staticmethod
+    def _split_sentences(text: str) -> List[str]:
         if not text or not text.strip():
             return []
+        return [sentence.strip() for sentence in text.split(".") if sentence.strip()]
 
-        final_scores = defaultdict(float)
-        sentences = text.split(".")
+    def _encode_sentences(self, sentences: List[str], purpose: str = "sentences"):
+        if embedding_store is None:
+            ENCODER_BATCH_SIZE.labels(purpose).observe(len(sentences))
+            record("sentences_encoded", len(sentences))
+            with span("encoder.batch", model=self.model_name, sentences=len(sentences)):
+                return self.model.encode(
+                    sentences,
+                    convert_to_tensor=True,
+                    batch_size=encoder_settings.batch_size,
+                )
 
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
+        # Only sentences missing from the store reach the encoder
+        encoder = model_id(self.model_name)
+        embeddings = embedding_store.lookup(encoder, sentences)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        record("sentences_stored", len(sentences) - len(missing))
+        record("sentences_encoded", len(missing))
+        if missing:
+            missing_sentences = [sentences[i] for i in missing]
+            ENCODER_BATCH_SIZE.labels(purpose).observe(len(missing))
+            with span("encoder.batch", model=self.model_name, sentences=len(missing)):
+                encoded = to_numpy(
+                    self.model.encode(
+                        missing_sentences,
+                        convert_to_tensor=True,
+                        batch_size=encoder_settings.batch_size,
+                    )
+                )
+            embedding_store.store(encoder, missing_sentences, encoded)
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = embedding
+        return np.stack(embeddings)
+
+    def _match_sentences(
+        self,
+        sentence_embs,
+        top_k: int,
+        similarity_threshold: float,
+        tenant_index: Optional[TenantSkillIndex] = None,
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Scores every sentence against every skill and keeps, per sentence,
+        the top_k skills whose similarity reaches the threshold. Tenant skills
+        rank after taxonomy skills of equal similarity.
+        """
+        names, skill_matrix = self.get_skill_matrix()
+        sims = to_numpy(util.cos_sim(sentence_embs, skill_matrix))
+        if tenant_index is not None and tenant_index.names:
+            tenant_sims = to_numpy(util.cos_sim(sentence_embs, tenant_index.matrix))
+            sims = np.hstack([sims, tenant_sims])
+            names = names + tenant_index.names
 
-            sentence_emb = self.model.encode(sentence, convert_to_tensor=True)
+        # Stable sort keeps taxonomy order for equal similarities
+        order = np.argsort(-sims, axis=1, kind="stable")[:, :top_k]
+        top_sims = np.take_along_axis(sims, order, axis=1)
 
-            sims = []
-            for skill, skill_data in self.skill_embeddings.items():
-                similarity = util.cos_sim(sentence_emb, skill_data["embedding"]).item()
-                if similarity >= similarity_threshold:
-                    sims.append((skill, similarity))
+        matches = []
+        for row_order, row_sims in zip(order.tolist(), top_sims.tolist()):
+            matches.append(
+                [
+                    (names[skill], similarity)
+                    for skill, similarity in zip(row_order, row_sims)
+                    if similarity >= similarity_threshold
+                ]
+            )
+        return matches
 
-            if not sims:
-                continue
+    @staticmethod
+    def _aggregate_matches(
+        sentence_matches: List[List[Tuple[str, float]]], alpha: float
+    ) -> List[SkillItem]:
+        final_scores = defaultdict(float)
 
-            sims.sort(key=lambda x: x[1], reverse=True)
-            top_sims = sims[:top_k]
+        for top_sims in sentence_matches:
+            if not top_sims:
+                continue
 
             sentence_weight = np.mean([s for _, s in top_sims])
 
@@ -95,6 +605,8 @@ class TextAnalyzer:
         alpha: float = 1.0,
         top_k: int = 5,
         max_results_per_category: Optional[int] = None,
+        exact_matches: Optional[List[str]] = None,
+        tenant_index: Optional[TenantSkillIndex] = None,
     ) -> Dict[str, List[SkillItem]]:
         """
         Analyzes multiple texts and aggregates skill scores.
@@ -104,32 +616,91 @@ class TextAnalyzer:
             alpha: Boosting factor for exact matches
             top_k: Number of best matches to consider per sentence
             max_results_per_category: Maximum number of results per category
+            exact_matches: Taxonomy skills resolved without the encoder (see
+                match_skill_names); each one scores like a sentence matching
+                only that skill exactly
+            tenant_index: Tenant skills detected and categorized together
+                with the taxonomy
 
         Returns:
             Dictionary with skills grouped by category
         """
+        return self._analyze_texts(
+            texts, alpha, top_k, max_results_per_category, exact_matches, tenant_index
+        )[0]
+
+    def analyze_and_embed_texts(
+        self,
+        texts: List[str],
+        alpha: float = 1.0,
+        top_k: int = 5,
+        max_results_per_category: Optional[int] = None,
+        exact_matches: Optional[List[str]] = None,
+        tenant_index: Optional[TenantSkillIndex] = None,
+        pooled_texts: Optional[List[str]] = None,
+    ) -> Tuple[Dict[str, List[SkillItem]], np.ndarray]:
+        """
+        Same as analyze_multiple_texts, also giving the pooled embedding of
+        pooled_texts as embed_texts does. Sentences encoded by the analysis are
+        not encoded again; only the others, such as fragments dropped by the
+        fragment filter, reach the encoder.
+
+        Args:
+            pooled_texts: Texts to embed, the analyzed texts when None
+
+        Returns:
+            Skills grouped by category and the pooled embedding, empty when
+            there is nothing to encode
+        """
+        categorized_scores, encoded = self._analyze_texts(
+            texts, alpha, top_k, max_results_per_category, exact_matches, tenant_index
+        )
+        embedding = self.embed_texts(
+            texts if pooled_texts is None else pooled_texts, encoded
+        )
+        return categorized_scores, embedding
+
+    def _analyze_texts(
+        self,
+        texts: List[str],
+        alpha: float,
+        top_k: int,
+        max_results_per_category: Optional[int],
+        exact_matches: Optional[List[str]],
+        tenant_index: Optional[TenantSkillIndex],
+    ) -> Tuple[Dict[str, List[SkillItem]], Dict[str, np.ndarray]]:
         final_scores = defaultdict(float)
 
-        for text in texts:
-            if not text or not text.strip():
-                continue
+        for skill in exact_matches or []:
+            final_scores[skill] += EXACT_MATCH_SIMILARITY * (1 + alpha)
 
-            skills = self.extract_skills_from_text(text, alpha, top_k)
-            for skill in skills:
-                final_scores[skill.name] += skill.score
+        skills_per_text, encoded = self._extract_skills(
+            texts, alpha, top_k, similarity_threshold=0.3, tenant_index=tenant_index
+        )
+        tenant_categories = tenant_index.categories if tenant_index is not None else {}
 
-        categorized_scores = {"hard_skills": [], "soft_skills": [], "tools": []}
+        with stage("text_analyzer", "categorization"):
+            for skills in skills_per_text:
+                for skill in skills:
+                    final_scores[skill.name] += skill.score
 
-        for skill, score in final_scores.items():
-            if skill in self.skill_embeddings:
-                category = self.skill_embeddings[skill]["category"]
-                categorized_scores[category].append(SkillItem(name=skill, score=score))
-
-        for category in categorized_scores:
-            categorized_scores[category].sort(key=lambda x: x.score, reverse=True)
-            if max_results_per_category is not None:
-                categorized_scores[category] = categorized_scores[category][
-                    :max_results_per_category
-                ]
+            categorized_scores = {"hard_skills": [], "soft_skills": [], "tools": []}
+
+            for skill, score in final_scores.items():
+                if skill in self.skill_embeddings:
+                    category = self.skill_embeddings[skill]["category"]
+                else:
+                    category = tenant_categories.get(skill)
+                if category is not None:
+                    categorized_scores[category].append(
+                        SkillItem(name=skill, score=score)
+                    )
+
+            for category in categorized_scores:
+                categorized_scores[category].sort(key=lambda x: x.score, reverse=True)
+                if max_results_per_category is not None:
+                    categorized_scores[category] = categorized_scores[category][
+                        :max_results_per_category
+                    ]
 
-        return categorized_scores
+        return categorized_scores, encoded
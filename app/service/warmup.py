@@ -0,0 +1,96 @@
+import threading
+import time
+from typing import Callable, List, Optional
+from app.service.text_analyzer import TextAnalyzer
+
+STARTING = "starting"
+LOADING_MODEL = "loading_model"
+TUNING_ENCODER = "tuning_encoder"
+INDEXING_SKILLS = "indexing_skills"
+READY = "ready"
+FAILED = "failed"
+
+
+class ServiceWarmup:
+    """
+    Loads the encoder and builds the skill indexes in a background thread,
+    so the server can accept connections (and answer probes) immediately.
+    When given, configure_encoder runs once the encoders are loaded and
+    before the skills are encoded, e.g. to tune the encoder settings.
+    """
+
+    def __init__(
+        self,
+        text_analyzers: List[TextAnalyzer],
+        configure_encoder: Optional[Callable[[], None]] = None,
+    ):
+        self.text_analyzers = text_analyzers
+        self.configure_encoder = configure_encoder
+        self.stage = STARTING
+        self.progress = 0.0
+        self.error: Optional[str] = None
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.stage == READY
+
+    def start(self) -> None:
+        """Starts the warm-up in a daemon thread, unless it is already running."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self.run, name="service-warmup", daemon=True
+        )
+        self._thread.start()
+
+    def run(self) -> None:
+        """Runs all warm-up stages in the calling thread."""
+        self._started_at = time.monotonic()
+        try:
+            self.stage = LOADING_MODEL
+            for analyzer in self.text_analyzers:
+                analyzer.model
+
+            if self.configure_encoder is not None:
+                self.stage = TUNING_ENCODER
+                self.configure_encoder()
+
+            self.stage = INDEXING_SKILLS
+            for position, analyzer in enumerate(self.text_analyzers):
+                analyzer.prepare_skill_embeddings(
+                    progress=lambda fraction, position=position: self._set_progress(
+                        (position + fraction) / len(self.text_analyzers)
+                    )
+                )
+                # Build the derived lookup structures before the first request
+                analyzer.get_skill_matrix()
+                analyzer.get_skill_positions()
+                analyzer.get_skill_neighbours()
+                analyzer.match_skill_names([])
+
+            self.stage = READY
+            self.progress = 1.0
+        except Exception as e:
+            self.stage = FAILED
+            self.error = str(e)
+        finally:
+            self._finished_at = time.monotonic()
+
+    def status(self) -> dict:
+        """Returns the warm-up stage, progress and elapsed time."""
+        status = {
+            "status": self.stage,
+            "progress": round(self.progress, 3),
+        }
+        if self._started_at is not None:
+            end = self._finished_at or time.monotonic()
+            status["elapsed_seconds"] = round(end - self._started_at, 3)
+        if self.error:
+            status["error"] = self.error
+        return status
+
+    def _set_progress(self, fraction: float) -> None:
+        self.progress = fraction
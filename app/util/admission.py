@@ -0,0 +1,151 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+from fastapi import Header, HTTPException, Request
+from app.config.service_config import (
+    ANALYSIS_CONCURRENCY,
+    LOAD_SHED_INTERVAL_MS,
+    LOAD_SHED_TARGET_MS,
+    REQUEST_MAX_TIMEOUT_SECONDS,
+    REQUEST_TIMEOUT_SECONDS,
+)
+from app.util.deadlines import (
+    Deadline,
+    DeadlineExceeded,
+    RequestAborted,
+    RequestCancelled,
+    bind_deadline,
+)
+from app.util.load_shedding import LoadShedder
+from app.util.metrics import ANALYSIS_QUEUE_DELAY, ANALYSIS_REQUESTS_ABORTED
+from app.util.tracing import span
+
+T = TypeVar("T")
+
+
+class Overloaded(RequestAborted):
+    status_code = 503
+    headers = {"Retry-After": "1"}
+
+
+_REASONS = {
+    Overloaded: "overloaded",
+    DeadlineExceeded: "deadline",
+    RequestCancelled: "cancelled",
+}
+
+
+class AnalysisRunner:
+    """
+    Runs the blocking work of analysis requests on a bounded pool of threads,
+    so the event loop stays free to accept requests, shed them and notice
+    disconnected clients.
+
+    The work runs with the request's Deadline bound; pipeline stages check it
+    and stop once the deadline has passed or the client has disconnected.
+    While the shedder reports a standing queue, new requests are rejected
+    before any work is done.
+
+    Args:
+        concurrency: Number of requests worked on at once
+        shedder: Admission control on the queueing delay of the pool
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        shedder: Optional[LoadShedder] = None,
+    ):
+        self.shedder = shedder or LoadShedder(target_seconds=0)
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="analysis"
+        )
+
+    async def run(
+        self, request: Request, deadline: Deadline, work: Callable[[], T]
+    ) -> T:
+        """
+        Runs work for a request and returns its result.
+
+        Args:
+            request: Request whose client is watched for disconnects
+            deadline: Deadline of the request, see request_deadline
+            work: Blocking function doing the request's work
+
+        Raises:
+            RequestAborted: If the request was shed, its deadline passed or
+                its client disconnected before the work was done
+        """
+        try:
+            if self.shedder.overloaded():
+                raise Overloaded("Service is overloaded")
+            return await self._run(request, deadline, work)
+        except RequestAborted as e:
+            ANALYSIS_REQUESTS_ABORTED.labels(_REASONS.get(type(e), "other")).inc()
+            raise
+
+    async def _run(self, request: Request, deadline: Deadline, work: Callable[[], T]):
+        enqueued_at = time.monotonic()
+        self.shedder.enqueued()
+
+        def run_work():
+            delay = time.monotonic() - enqueued_at
+            self.shedder.started(delay)
+            ANALYSIS_QUEUE_DELAY.observe(delay)
+            with span("analysis", queue_delay_ms=round(delay * 1000, 3)):
+                with bind_deadline(deadline):
+                    deadline.check()
+                    return work()
+
+        context = contextvars.copy_context()
+        future = self._executor.submit(context.run, run_work)
+        watcher = asyncio.ensure_future(self._watch(request, deadline))
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            watcher.cancel()
+            if future.cancel():
+                # Never started; it leaves the queue all the same
+                self.shedder.started(time.monotonic() - enqueued_at)
+
+    async def _watch(self, request: Request, deadline: Deadline) -> None:
+        # The body has been read, so the next message is the client going away
+        while (await request.receive())["type"] != "http.disconnect":
+            pass
+        deadline.cancel()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def request_deadline(
+    x_request_timeout: Optional[float] = Header(
+        None,
+        gt=0,
+        description="Seconds the client waits for the response; work stops "
+        "once they have passed",
+    ),
+) -> Deadline:
+    """Dependency giving the Deadline of a request from its timeout header."""
+    timeout = x_request_timeout or REQUEST_TIMEOUT_SECONDS or None
+    if timeout is not None and REQUEST_MAX_TIMEOUT_SECONDS > 0:
+        timeout = min(timeout, REQUEST_MAX_TIMEOUT_SECONDS)
+    return Deadline(timeout)
+
+
+def abort_exception(error: RequestAborted) -> HTTPException:
+    """Returns the HTTP error reporting an aborted request."""
+    return HTTPException(
+        status_code=error.status_code, detail=str(error), headers=error.headers
+    )
+
+
+analysis_runner = AnalysisRunner(
+    concurrency=ANALYSIS_CONCURRENCY,
+    shedder=LoadShedder(
+        target_seconds=LOAD_SHED_TARGET_MS / 1000,
+        interval_seconds=LOAD_SHED_INTERVAL_MS / 1000,
+    ),
+)
@@ -0,0 +1,333 @@
+"""
+Encoder tuning: torch threads and the forward-pass batch size.
+
+Encoding throughput depends on the intra-op thread count and the batch size
+in ways that differ between node types, and the torch defaults let the
+analysis threads oversubscribe the cores. The autotuner encodes a synthetic
+workload of skill-laden sentences with every candidate configuration, from
+as many concurrent callers as the service runs analysis threads, and keeps
+the configuration with the highest throughput whose 95th percentile request
+latency meets the target. Choices are persisted per host type (CPU model,
+usable cores and encoder) in a JSON file, so nodes of one type tune once.
+
+    python -m app.util.autotune --latency-ms 250
+
+Inter-op threads are fixed to one rather than tuned: torch allows setting
+them once per process, and the encoder's forward pass does not use them.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Tuple
+import numpy as np
+import torch
+from app.config.service_config import (
+    ANALYSIS_CONCURRENCY,
+    ENCODER_AUTOTUNE,
+    ENCODER_AUTOTUNE_LATENCY_MS,
+    ENCODER_AUTOTUNE_PATH,
+    ENCODER_FORWARD_BATCH_SIZE,
+    ENCODER_INTEROP_THREADS,
+    ENCODER_THREADS,
+)
+from app.config.skill_config import hard_skills, tools
+from app.util.embeddings import get_model, model_id
+
+BATCH_SIZES = (16, 32, 64)
+
+
+@dataclass
+class EncoderSettings:
+    """Torch threads (0 leaves the torch default) and forward-pass batch size."""
+
+    threads: int = 0
+    interop_threads: int = 0
+    batch_size: int = 32
+
+
+@dataclass
+class Measurement:
+    settings: EncoderSettings
+    sentences_per_second: float
+    p95_ms: float
+
+    def to_dict(self) -> dict:
+        return {
+            **asdict(self.settings),
+            "sentences_per_second": round(self.sentences_per_second, 1),
+            "p95_ms": round(self.p95_ms, 1),
+        }
+
+
+# Settings in effect; encoder callers read batch_size from here
+encoder_settings = EncoderSettings(
+    threads=ENCODER_THREADS,
+    interop_threads=ENCODER_INTEROP_THREADS,
+    batch_size=ENCODER_FORWARD_BATCH_SIZE,
+)
+
+
+def apply_settings(settings: EncoderSettings) -> None:
+    """Makes settings the ones in effect for this process."""
+    if settings.threads > 0:
+        torch.set_num_threads(settings.threads)
+    if settings.interop_threads > 0:
+        try:
+            torch.set_num_interop_threads(settings.interop_threads)
+        except RuntimeError:
+            # Already set, or inter-op work has started; it stays as it is
+            pass
+    encoder_settings.threads = settings.threads
+    encoder_settings.interop_threads = settings.interop_threads
+    encoder_settings.batch_size = settings.batch_size
+
+
+def usable_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def host_key(encoder_id: str) -> str:
+    """Identifies the node type and encoder a tuning applies to."""
+    cpu = platform.processor() or platform.machine()
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu = line.partition(":")[2].strip()
+                    break
+    except OSError:
+        pass
+    return f"{cpu}|{usable_cpus()} cpus|{encoder_id}"
+
+
+def load_settings(path: str, key: str) -> Optional[EncoderSettings]:
+    """Returns the settings persisted for a host key, if any."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        entry = json.load(f).get(key)
+    if entry is None:
+        return None
+    return EncoderSettings(
+        threads=entry["threads"],
+        interop_threads=entry["interop_threads"],
+        batch_size=entry["batch_size"],
+    )
+
+
+def save_settings(path: str, key: str, measurement: Measurement, **details) -> None:
+    """Persists the chosen settings of a host key, keeping other keys."""
+    tunings = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            tunings = json.load(f)
+    tunings[key] = {
+        **measurement.to_dict(),
+        **details,
+        "tuned_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(tunings, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def synthetic_requests(
+    count: int, sentences_per_request: int, seed: int = 0
+) -> List[List[str]]:
+    """Requests of job-offer-like sentences mentioning taxonomy skills."""
+    rng = random.Random(seed)
+    skills = hard_skills + tools
+    templates = (
+        "Experience with {} and {} in production systems",
+        "You will design services using {}",
+        "Nice to have: {}, {} or similar technologies",
+        "We offer a friendly team and flexible working hours",
+        "Strong knowledge of {} is required for this role",
+    )
+    return [
+        [
+            template.format(*rng.sample(skills, template.count("{}")))
+            for template in rng.choices(templates, k=sentences_per_request)
+        ]
+        for _ in range(count)
+    ]
+
+
+def measure(
+    model, settings: EncoderSettings, requests: List[List[str]], concurrency: int
+) -> Measurement:
+    """Encodes requests from concurrent callers with settings applied."""
+    apply_settings(settings)
+    model.encode(requests[0], batch_size=settings.batch_size)
+
+    def encode(sentences: List[str]) -> float:
+        start = time.perf_counter()
+        model.encode(sentences, batch_size=settings.batch_size)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(encode, requests))
+    elapsed = time.perf_counter() - start
+    return Measurement(
+        settings,
+        sentences_per_second=sum(map(len, requests)) / elapsed,
+        p95_ms=float(np.percentile(latencies, 95)) * 1000,
+    )
+
+
+def candidates(cpus: int) -> List[EncoderSettings]:
+    threads = {cpus}
+    count = 1
+    while count < cpus:
+        threads.add(count)
+        count *= 2
+    return [
+        EncoderSettings(threads=count, interop_threads=1, batch_size=batch_size)
+        for count in sorted(threads)
+        for batch_size in BATCH_SIZES
+    ]
+
+
+def choose(measurements: List[Measurement], latency_target_ms: float) -> Measurement:
+    """
+    Returns the highest-throughput measurement within the latency target, or
+    the lowest-latency one when none meets it.
+    """
+    within = [m for m in measurements if m.p95_ms <= latency_target_ms]
+    if within:
+        return max(within, key=lambda m: m.sentences_per_second)
+    return min(measurements, key=lambda m: m.p95_ms)
+
+
+def autotune(
+    model,
+    latency_target_ms: float = 250.0,
+    concurrency: int = 4,
+    requests: int = 16,
+    sentences_per_request: int = 24,
+    settings: Optional[List[EncoderSettings]] = None,
+) -> Tuple[Measurement, List[Measurement]]:
+    """
+    Benchmarks encoder settings and applies the best one.
+
+    Args:
+        model: Encoder to tune
+        latency_target_ms: 95th percentile latency a request may take
+        concurrency: Concurrent callers, as many as the analysis threads
+        requests: Requests encoded per configuration
+        sentences_per_request: Sentences per request
+        settings: Configurations tried, candidates() by default
+
+    Returns:
+        The chosen measurement and all measurements
+    """
+    workload = synthetic_requests(requests, sentences_per_request)
+    measurements = [
+        measure(model, candidate, workload, concurrency)
+        for candidate in settings or candidates(usable_cpus())
+    ]
+    best = choose(measurements, latency_target_ms)
+    apply_settings(best.settings)
+    return best, measurements
+
+
+def configure_encoder(
+    model,
+    encoder_id: str,
+    tune: bool = ENCODER_AUTOTUNE,
+    path: str = ENCODER_AUTOTUNE_PATH,
+    latency_target_ms: float = ENCODER_AUTOTUNE_LATENCY_MS,
+    concurrency: int = ANALYSIS_CONCURRENCY,
+) -> EncoderSettings:
+    """
+    Applies the settings persisted for this host type and encoder. Without
+    any, tunes and persists them when tune is set, and applies the configured
+    ENCODER_* settings otherwise.
+
+    Args:
+        model: Loaded encoder
+        encoder_id: Its model id
+        tune: Whether to run the autotuner when nothing is persisted
+        path: JSON file of the persisted settings
+        latency_target_ms: Latency target of the autotuner
+        concurrency: Concurrent callers of the autotuner
+
+    Returns:
+        The settings applied
+    """
+    key = host_key(encoder_id)
+    settings = load_settings(path, key)
+    if settings is None and tune:
+        best, _ = autotune(model, latency_target_ms, concurrency)
+        save_settings(
+            path,
+            key,
+            best,
+            latency_target_ms=latency_target_ms,
+            concurrency=concurrency,
+        )
+        settings = best.settings
+    if settings is None:
+        settings = EncoderSettings(
+            threads=ENCODER_THREADS,
+            interop_threads=ENCODER_INTEROP_THREADS,
+            batch_size=ENCODER_FORWARD_BATCH_SIZE,
+        )
+    apply_settings(settings)
+    return settings
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", help="Encoder name, the default one if omitted")
+    parser.add_argument("--latency-ms", type=float, default=ENCODER_AUTOTUNE_LATENCY_MS)
+    parser.add_argument("--concurrency", type=int, default=ANALYSIS_CONCURRENCY)
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--sentences", type=int, default=24)
+    parser.add_argument("--path", default=ENCODER_AUTOTUNE_PATH)
+    parser.add_argument(
+        "--no-save", action="store_true", help="Only print the measurements"
+    )
+    args = parser.parse_args(argv)
+
+    best, measurements = autotune(
+        get_model(args.model),
+        args.latency_ms,
+        args.concurrency,
+        requests=args.requests,
+        sentences_per_request=args.sentences,
+    )
+    print(f"{'threads':>7} {'batch':>5} {'sentences/s':>11} {'p95 ms':>8}")
+    for m in measurements:
+        marker = "  <- chosen" if m is best else ""
+        print(
+            f"{m.settings.threads:>7} {m.settings.batch_size:>5} "
+            f"{m.sentences_per_second:>11.1f} {m.p95_ms:>8.1f}{marker}"
+        )
+    if not args.no_save:
+        key = host_key(model_id(args.model))
+        save_settings(
+            args.path,
+            key,
+            best,
+            latency_target_ms=args.latency_ms,
+            concurrency=args.concurrency,
+        )
+        print(f"saved for {key} to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Request deadlines and cancellation.
+
+A Deadline is bound to the current context for the duration of one request,
+like a RequestProfile; pipeline stages check it on entry (app.util.stages)
+so work stops between stages once the request's deadline has passed or its
+client has disconnected.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+_current_deadline: ContextVar[Optional["Deadline"]] = ContextVar(
+    "request_deadline", default=None
+)
+
+
+class RequestAborted(Exception):
+    """Raised when a request stops before its work is done."""
+
+    status_code = 503
+    headers: Optional[Dict[str, str]] = None
+
+
+class DeadlineExceeded(RequestAborted):
+    status_code = 504
+
+
+class RequestCancelled(RequestAborted):
+    # Client closed request; nobody receives the response
+    status_code = 499
+
+
+class Deadline:
+    """
+    Point in time by which a request must finish, and whether it was cancelled.
+
+    Args:
+        timeout: Seconds from now, or None for no deadline
+        clock: Monotonic time source
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.clock = clock
+        self.expires_at = None if timeout is None else clock() + timeout
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def remaining(self) -> Optional[float]:
+        """Returns the seconds left, None when there is no deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - self.clock())
+
+    def check(self) -> None:
+        """
+        Raises:
+            RequestCancelled: If the request was cancelled
+            DeadlineExceeded: If the deadline has passed
+        """
+        if self.cancelled:
+            raise RequestCancelled("Client disconnected")
+        if self.expires_at is not None and self.clock() >= self.expires_at:
+            raise DeadlineExceeded("Request deadline exceeded")
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Returns the deadline of the request being served, if any."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def bind_deadline(deadline: Optional[Deadline]):
+    """Makes the deadline current for the code run inside the block."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def check_deadline() -> None:
+    """Checks the current deadline, if any; see Deadline.check."""
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.check()
+
+
+def time_left(default: float) -> float:
+    """
+    Returns the timeout to use for a blocking call: the default, capped by
+    the time left until the current deadline.
+    """
+    deadline = _current_deadline.get()
+    remaining = deadline.remaining() if deadline is not None else None
+    return default if remaining is None else min(default, remaining)
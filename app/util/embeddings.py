@@ -1,10 +1,93 @@
-from sentence_transformers import SentenceTransformer, util
+import numpy as np
+from typing import List, Optional
+from app.config.service_config import (
+    AUTO_SELECT_ENCODER,
+    DEFAULT_ENCODER_MODEL,
+    ENCODER_MEMORY_BUDGET_MB,
+    ENCODER_MODELS,
+    INFERENCE_CONNECTIONS,
+    INFERENCE_SHM_BYTES,
+    INFERENCE_SOCKET,
+    INFERENCE_TIMEOUT_SECONDS,
+    LANGUAGE_MODELS,
+)
+from app.inference.client import InferenceClient, remote_loader
+from app.util.language import detect_language
+from app.util.model_registry import ModelRegistry, load_sentence_transformer
 
-_model = None
+AUTO_MODEL = "auto"
 
+# Encoders run out of process when an inference server is configured
+inference_client = (
+    InferenceClient(
+        INFERENCE_SOCKET,
+        shm_bytes=INFERENCE_SHM_BYTES,
+        timeout=INFERENCE_TIMEOUT_SECONDS,
+        max_connections=INFERENCE_CONNECTIONS,
+    )
+    if INFERENCE_SOCKET
+    else None
+)
 
-def get_model():
-    global _model
-    if _model is None:
-        _model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
-    return _model
+registry = ModelRegistry(
+    ENCODER_MODELS,
+    DEFAULT_ENCODER_MODEL,
+    memory_budget_mb=ENCODER_MEMORY_BUDGET_MB,
+    loader=(
+        remote_loader(inference_client)
+        if inference_client is not None
+        else load_sentence_transformer
+    ),
+)
+
+
+def get_model(name: Optional[str] = None):
+    """Returns the named encoder (the default one when None), loading it lazily."""
+    return registry.get(name)
+
+
+def model_id(name: Optional[str] = None) -> str:
+    """Returns the id of the named encoder (the default one when None)."""
+    return registry.models[name or registry.default]
+
+
+def is_known_model(name: Optional[str]) -> bool:
+    """Checks a requested model name: a configured model, "auto" or None."""
+    return name is None or name == AUTO_MODEL or name in registry
+
+
+def select_model(requested: Optional[str], texts: List[str]) -> Optional[str]:
+    """
+    Resolves the encoder for a request.
+
+    Args:
+        requested: Model name from the request, "auto" to choose by language,
+            or None for the service default
+        texts: Texts of the request, used for language detection
+
+    Returns:
+        Model name, or None when the default model applies
+    """
+    if requested is None:
+        requested = AUTO_MODEL if AUTO_SELECT_ENCODER else None
+    if requested == AUTO_MODEL:
+        requested = LANGUAGE_MODELS.get(detect_language(texts))
+    if requested is None or requested == registry.default:
+        return None
+    if requested not in registry:
+        raise ValueError(f"Unknown model {requested}")
+    return requested
+
+
+def to_numpy(embedding) -> np.ndarray:
+    """Converts a tensor or array-like embedding to a float32 numpy array."""
+    if hasattr(embedding, "detach"):
+        embedding = embedding.detach().cpu().numpy()
+    return np.asarray(embedding, dtype=np.float32)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalizes the rows of a matrix, leaving all-zero rows untouched."""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
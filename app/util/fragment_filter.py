@@ -0,0 +1,130 @@
+import re
+from typing import AbstractSet, Dict, Iterable, List, Optional, Tuple
+from app.util.metrics import FRAGMENTS_DROPPED
+
+TOO_SHORT = "too_short"
+STOPWORDS_ONLY = "stopwords_only"
+NUMERIC = "numeric"
+BOILERPLATE = "boilerplate"
+
+# Keeps "c++", "c#" and "node" / "js" of "Node.js" as words
+_WORD = re.compile(r"[\w#+]+")
+
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in is it its new of on or our the
+    to we will with you your this that these those all any more very per
+    i w z na do się jest oraz dla nie jak lub od po przy ze za co
+    """.split())
+
+# Matched at the start of a fragment; fragments naming a skill are kept anyway
+DEFAULT_BOILERPLATE = (
+    r"apply( now| today| here)?\b",
+    r"(what )?we offer\b",
+    r"(salary|pay|compensation|wynagrodzenie)\b",
+    r"(remote|hybrid|on-?site)( work)?( is)? (possible|available|option)",
+    r"(send|submit) (us )?your (cv|resume|application)",
+    r"(benefits|perks|oferujemy|aplikuj)\b",
+    r"(full|part)[- ]time\b",
+    r"(b2b|uop|umowa o pracę)\b",
+    r"equal opportunit",
+)
+
+
+def skill_words(skills: Iterable[str]) -> frozenset:
+    """Returns the words of skill names that protect a fragment, less stopwords."""
+    return frozenset(
+        word
+        for skill in skills
+        for word in _WORD.findall(skill.lower())
+        if word not in STOPWORDS
+    )
+
+
+class FragmentFilter:
+    """
+    Lexical gate dropping sentence fragments that cannot match a skill before
+    they reach the encoder: fragments that are very short, consist only of
+    stopwords and numbers, or start with recruiting boilerplate.
+
+    A fragment containing a word of any taxonomy skill name (e.g. "go", "js",
+    "c++") is always kept, so short skill lists split on "." survive. Stopwords
+    of skill names ("to" of "Attention to detail") protect nothing.
+
+    Args:
+        skills: Taxonomy skill names whose words protect a fragment
+        min_chars: Fragments shorter than this are dropped
+        boilerplate: Regular expressions matched case-insensitively at the
+            start of a fragment
+    """
+
+    def __init__(
+        self,
+        skills: Iterable[str],
+        min_chars: int = 3,
+        boilerplate: Iterable[str] = DEFAULT_BOILERPLATE,
+    ):
+        self.min_chars = min_chars
+        self.protected_words = skill_words(skills)
+        patterns = list(boilerplate)
+        self._boilerplate = (
+            re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+            if patterns
+            else None
+        )
+
+    def reason(
+        self, fragment: str, protected_words: Optional[AbstractSet[str]] = None
+    ) -> Optional[str]:
+        """
+        Returns why the fragment would be dropped, None to keep it.
+
+        Args:
+            fragment: Sentence fragment
+            protected_words: Further words keeping a fragment (e.g. of a
+                tenant's own skills)
+        """
+        words = _WORD.findall(fragment.lower())
+        if any(
+            word in self.protected_words
+            or (protected_words is not None and word in protected_words)
+            for word in words
+        ):
+            return None
+        if len(fragment) < self.min_chars:
+            return TOO_SHORT
+        if self._boilerplate is not None and self._boilerplate.match(fragment):
+            return BOILERPLATE
+        content = [
+            word
+            for word in words
+            if word not in STOPWORDS and not any(c.isdigit() for c in word)
+        ]
+        if not content:
+            return NUMERIC if any(c.isdigit() for c in fragment) else STOPWORDS_ONLY
+        return None
+
+    def filter(
+        self,
+        fragments: List[str],
+        protected_words: Optional[AbstractSet[str]] = None,
+    ) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Drops the fragments that cannot match a skill.
+
+        Args:
+            fragments: Sentence fragments of a text
+            protected_words: Further words keeping a fragment
+
+        Returns:
+            The kept fragments in order and the number dropped per reason
+        """
+        kept, dropped = [], {}
+        for fragment in fragments:
+            reason = self.reason(fragment, protected_words)
+            if reason is None:
+                kept.append(fragment)
+            else:
+                dropped[reason] = dropped.get(reason, 0) + 1
+        for reason, count in dropped.items():
+            FRAGMENTS_DROPPED.labels(reason).inc(count)
+        return kept, dropped
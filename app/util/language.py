@@ -0,0 +1,50 @@
+import re
+from typing import Iterable, Optional
+
+_WORD = re.compile(r"[^\W\d_]+")
+
+# Frequent function words; enough to tell apart the languages of our offers
+_STOPWORDS = {
+    "en": {
+        "the", "and", "with", "of", "to", "for", "in", "is", "are", "we",
+        "you", "our", "experience", "years", "team", "will", "on", "as",
+    },
+    "pl": {
+        "i", "w", "z", "na", "do", "się", "jest", "oraz", "dla", "nie",
+        "jak", "lub", "od", "po", "przy", "doświadczenie", "lat", "znajomość",
+        "praca", "zespole", "będziesz", "oferujemy", "wymagania",
+    },
+}  # fmt: skip
+
+_DIACRITICS = {
+    "pl": set("ąćęłńóśźż"),
+}
+
+
+def detect_language(texts: Iterable[str], min_words: int = 3) -> Optional[str]:
+    """
+    Guesses the language of the given texts from stopwords and diacritics.
+
+    Args:
+        texts: Texts to inspect, treated as one document
+        min_words: Minimum number of recognized words for a decision
+
+    Returns:
+        Language code such as "en" or "pl", None when undecided
+    """
+    scores = dict.fromkeys(_STOPWORDS, 0)
+    for text in texts:
+        if not text:
+            continue
+        for word in _WORD.findall(text.lower()):
+            for language, stopwords in _STOPWORDS.items():
+                if word in stopwords:
+                    scores[language] += 1
+            for language, letters in _DIACRITICS.items():
+                if letters.intersection(word):
+                    scores[language] += 1
+
+    language, score = max(scores.items(), key=lambda item: item[1])
+    if score < min_words:
+        return None
+    return language
@@ -0,0 +1,58 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class LoadShedder:
+    """
+    Decides whether to admit new work from the queueing delay of admitted work.
+
+    Follows CoDel: short bursts that queue briefly are fine, but once every
+    request started during a whole interval waited longer than the target,
+    the queue is standing and new requests are rejected until a request
+    starts again within the target or the queue drains. Rejecting early keeps
+    the admitted work finishing in time instead of every request timing out.
+
+    Args:
+        target_seconds: Acceptable queueing delay; 0 disables shedding
+        interval_seconds: How long the delay must stay above the target
+        clock: Monotonic time source
+    """
+
+    def __init__(
+        self,
+        target_seconds: float = 0.1,
+        interval_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.target_seconds = target_seconds
+        self.interval_seconds = interval_seconds
+        self.clock = clock
+        self._above_since: Optional[float] = None
+        self._queued = 0
+        self._lock = threading.Lock()
+
+    def enqueued(self) -> None:
+        """Records that an admitted request is waiting to start."""
+        with self._lock:
+            self._queued += 1
+
+    def started(self, delay: float) -> None:
+        """Records that a request started after waiting delay seconds."""
+        with self._lock:
+            self._queued -= 1
+            if delay <= self.target_seconds:
+                self._above_since = None
+            elif self._above_since is None:
+                self._above_since = self.clock()
+
+    def overloaded(self) -> bool:
+        """Returns whether new requests should be rejected."""
+        if self.target_seconds <= 0:
+            return False
+        with self._lock:
+            return (
+                self._queued > 0
+                and self._above_since is not None
+                and self.clock() - self._above_since >= self.interval_seconds
+            )
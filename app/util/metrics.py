@@ -0,0 +1,326 @@
+"""
+Minimal Prometheus-compatible metrics.
+
+Counters, gauges and histograms are kept in process memory and rendered in the
+Prometheus text exposition format by the /metrics endpoint. Updating a metric
+costs a dictionary lookup and a lock, so it is safe to call on the hot path.
+"""
+
+import bisect
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond stages up to LLM calls
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = (
+            str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        )
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._new_child()
+            self._children[()] = self._default
+
+    def labels(self, *values):
+        """Returns the child metric for the given label values."""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _render_child(self, key, child) -> List[str]:
+        raise NotImplementedError
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def _new_child(self):
+        return _Value()
+
+    def _render_child(self, key, child) -> List[str]:
+        labels = _format_labels(self.labelnames, key)
+        return [f"{self.name}_total{labels} {_format_value(child.value)}"]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def _new_child(self):
+        return _Value()
+
+    def _render_child(self, key, child) -> List[str]:
+        labels = _format_labels(self.labelnames, key)
+        return [f"{self.name}{labels} {_format_value(child.value)}"]
+
+
+class _HistogramValue:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def _render_child(self, key, child) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            labels = _format_labels(
+                self.labelnames + ("le",), key + (_format_value(bound),)
+            )
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_REQUESTS = REGISTRY.register(
+    Counter(
+        "http_requests",
+        "HTTP requests by route and status code",
+        ("method", "route", "status"),
+    )
+)
+HTTP_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route",
+        ("method", "route"),
+    )
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(
+    Gauge("http_requests_in_flight", "HTTP requests currently being served")
+)
+STAGE_DURATION = REGISTRY.register(
+    Histogram(
+        "pipeline_stage_duration_seconds",
+        "Latency of analysis pipeline stages",
+        ("component", "stage"),
+    )
+)
+SENTENCES_ENCODED = REGISTRY.register(
+    Histogram(
+        "analysis_sentences_encoded",
+        "Sentences encoded per analysis call",
+        buckets=SIZE_BUCKETS,
+    )
+)
+ENCODER_BATCH_SIZE = REGISTRY.register(
+    Histogram(
+        "encoder_batch_size",
+        "Number of texts passed to the encoder in one call",
+        ("purpose",),
+        buckets=SIZE_BUCKETS,
+    )
+)
+OLLAMA_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "ollama_request_duration_seconds",
+        "Latency of Ollama generate calls by outcome",
+        ("outcome",),
+    )
+)
+ENCODER_LOADS = REGISTRY.register(
+    Counter("encoder_model_loads", "Encoder models loaded, by model", ("model",))
+)
+ENCODER_EVICTIONS = REGISTRY.register(
+    Counter(
+        "encoder_model_evictions",
+        "Encoder models evicted to stay within the memory budget",
+        ("model",),
+    )
+)
+ENCODER_RESIDENT_BYTES = REGISTRY.register(
+    Gauge("encoder_resident_bytes", "Estimated size of the resident encoder models")
+)
+RESULT_CACHE_REQUESTS = REGISTRY.register(
+    Counter(
+        "result_cache_requests",
+        "Analysis result cache lookups by outcome (hit, miss, coalesced)",
+        ("cache", "outcome"),
+    )
+)
+FRAGMENTS_DROPPED = REGISTRY.register(
+    Counter(
+        "fragments_dropped",
+        "Sentence fragments dropped by the lexical filter before encoding",
+        ("reason",),
+    )
+)
+ANALYSIS_QUEUE_DELAY = REGISTRY.register(
+    Histogram(
+        "analysis_queue_delay_seconds",
+        "Time analysis requests waited for a worker thread",
+    )
+)
+ANALYSIS_REQUESTS_ABORTED = REGISTRY.register(
+    Counter(
+        "analysis_requests_aborted",
+        "Analysis requests stopped before completion, by reason (overloaded, "
+        "deadline, cancelled)",
+        ("reason",),
+    )
+)
+EMBEDDING_STORE_LOOKUPS = REGISTRY.register(
+    Counter(
+        "embedding_store_lookups",
+        "Sentences looked up in the on-disk embedding store by outcome (hit, miss)",
+        ("outcome",),
+    )
+)
+TRACE_SPANS_EXPORTED = REGISTRY.register(
+    Counter(
+        "trace_spans_exported",
+        "Trace spans handed to the exporter by outcome (exported, failed)",
+        ("outcome",),
+    )
+)
+TENANT_INDEX_REQUESTS = REGISTRY.register(
+    Counter(
+        "tenant_index_requests",
+        "Tenant skill index lookups by outcome (hit, build, update)",
+        ("outcome",),
+    )
+)
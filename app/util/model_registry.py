@@ -0,0 +1,129 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+from app.util.metrics import ENCODER_EVICTIONS, ENCODER_LOADS, ENCODER_RESIDENT_BYTES
+
+
+def load_sentence_transformer(model_id: str):
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_id)
+
+
+def model_size_bytes(model) -> int:
+    """Estimates the resident size of a model from its parameters."""
+    parameters = getattr(model, "parameters", None)
+    if parameters is None:
+        return 0
+    try:
+        return sum(p.numel() * p.element_size() for p in parameters())
+    except TypeError:
+        return 0
+
+
+class ModelRegistry:
+    """
+    Loads encoders by name on first use and keeps the most recently used ones
+    resident within a memory budget.
+
+    Skill indexes built for a model are keyed weakly by the model object (see
+    TextAnalyzer), so evicting a model here releases its index as well once
+    in-flight requests holding the model finish.
+
+    Args:
+        models: Model name to model id (e.g. a Hugging Face repository)
+        default: Name of the model used when none is requested
+        memory_budget_mb: Total size of resident models above which the least
+            recently used ones are evicted; None for no limit
+        loader: Loads a model from its id
+    """
+
+    def __init__(
+        self,
+        models: Dict[str, str],
+        default: str,
+        memory_budget_mb: Optional[float] = None,
+        loader: Callable[[str], Any] = load_sentence_transformer,
+    ):
+        if default not in models:
+            raise ValueError(f"Default model {default} is not configured")
+        self.models = dict(models)
+        self.default = default
+        self.memory_budget = (
+            memory_budget_mb * 1024 * 1024 if memory_budget_mb is not None else None
+        )
+        self.loader = loader
+        self._resident: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {
+            name: threading.Lock() for name in self.models
+        }
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.models
+
+    def get(self, name: Optional[str] = None):
+        """
+        Returns the named model, loading it if it is not resident.
+
+        Args:
+            name: Configured model name, None for the default model
+
+        Returns:
+            The loaded model
+        """
+        name = name or self.default
+        if name not in self.models:
+            raise KeyError(f"Unknown model {name}")
+
+        with self._lock:
+            model = self._resident.get(name)
+            if model is not None:
+                self._resident.move_to_end(name)
+                return model
+
+        # Concurrent requests for the same model wait for a single load
+        with self._load_locks[name]:
+            with self._lock:
+                model = self._resident.get(name)
+                if model is not None:
+                    self._resident.move_to_end(name)
+                    return model
+
+            model = self.loader(self.models[name])
+            ENCODER_LOADS.labels(name).inc()
+
+            with self._lock:
+                self._resident[name] = model
+                self._sizes[name] = model_size_bytes(model)
+                self._evict_over_budget(keep=name)
+                ENCODER_RESIDENT_BYTES.set(sum(self._sizes.values()))
+            return model
+
+    def resident(self) -> List[str]:
+        """Returns the names of resident models, least recently used first."""
+        with self._lock:
+            return list(self._resident)
+
+    def evict(self, name: str) -> bool:
+        """Drops a resident model; returns False if it was not loaded."""
+        with self._lock:
+            return self._evict(name)
+
+    def _evict_over_budget(self, keep: str) -> None:
+        if self.memory_budget is None:
+            return
+        for name in list(self._resident):
+            if sum(self._sizes.values()) <= self.memory_budget:
+                break
+            if name != keep:
+                self._evict(name)
+
+    def _evict(self, name: str) -> bool:
+        if self._resident.pop(name, None) is None:
+            return False
+        self._sizes.pop(name, None)
+        ENCODER_EVICTIONS.labels(name).inc()
+        ENCODER_RESIDENT_BYTES.set(sum(self._sizes.values()))
+        return True
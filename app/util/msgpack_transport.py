@@ -0,0 +1,177 @@
+import json
+from functools import lru_cache
+from typing import Any, Dict, Optional
+import msgpack
+from fastapi import Request, Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from app.service.text_analyzer import taxonomy_table, taxonomy_version
+from app.util.stages import stage
+
+MSGPACK = "application/msgpack"
+_MSGPACK_TYPES = {MSGPACK, "application/x-msgpack", "application/vnd.msgpack"}
+_SKILL_CATEGORIES = ("hard_skills", "soft_skills", "tools")
+
+
+def _media_type(value: str):
+    """Splits a media type into its lower-cased type and its parameters."""
+    media, *params = [part.strip() for part in value.split(";")]
+    options = {}
+    for param in params:
+        key, _, option = param.partition("=")
+        options[key.strip().lower()] = option.strip().strip('"')
+    return media.lower(), options
+
+
+def is_msgpack(content_type: Optional[str]) -> bool:
+    return bool(content_type) and _media_type(content_type)[0] in _MSGPACK_TYPES
+
+
+def accepted_msgpack(accept: Optional[str]) -> Optional[Dict[str, str]]:
+    """
+    Returns the parameters of the msgpack media type an Accept header lists
+    (e.g. {"skill-ids": "true"}), None when the client did not ask for msgpack.
+    """
+    for part in (accept or "").split(","):
+        if not part.strip():
+            continue
+        media, options = _media_type(part)
+        if media in _MSGPACK_TYPES and options.get("q") not in ("0", "0.0"):
+            return options
+    return None
+
+
+def skill_ids() -> Dict[str, int]:
+    """Returns skill name to id, the position in the published taxonomy table."""
+    return _skill_ids(taxonomy_version())
+
+
+@lru_cache(maxsize=4)
+def _skill_ids(version: str) -> Dict[str, int]:
+    return {name: i for i, (name, _) in enumerate(taxonomy_table())}
+
+
+def compact_skills(content, ids: Dict[str, int]):
+    """
+    Replaces skill lists ({"name", "score"} items under hard_skills,
+    soft_skills and tools) with [id, score] pairs, anywhere in the content.
+    """
+    if isinstance(content, list):
+        return [compact_skills(item, ids) for item in content]
+    if not isinstance(content, dict):
+        return content
+    compacted = {}
+    for key, value in content.items():
+        if key in _SKILL_CATEGORIES and isinstance(value, list):
+            compacted[key] = [
+                [ids.get(item["name"], item["name"]), item["score"]] for item in value
+            ]
+        else:
+            compacted[key] = compact_skills(value, ids)
+    return compacted
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSON response timing its encoding as the api.serialization stage."""
+
+    def render(self, content: Any) -> bytes:
+        with stage("api", "serialization"):
+            return super().render(content)
+
+
+class MsgpackResponse(Response):
+    media_type = MSGPACK
+
+    def render(self, content: Any) -> bytes:
+        with stage("api", "serialization"):
+            return msgpack.packb(self.prepare(content), use_bin_type=True)
+
+    def prepare(self, content: Any) -> Any:
+        return content
+
+
+class CompactMsgpackResponse(MsgpackResponse):
+    """MessagePack response with skills as [id, score] pairs."""
+
+    def __init__(self, content: Any = None, *args, **kwargs):
+        super().__init__(content, *args, **kwargs)
+        self.headers["X-Taxonomy-Version"] = taxonomy_version()
+
+    def prepare(self, content: Any) -> Any:
+        return compact_skills(content, skill_ids())
+
+
+class MsgpackRequest(Request):
+    """Request whose MessagePack body FastAPI reads in place of JSON."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = msgpack.unpackb(await self.body(), raw=False)
+        return self._json
+
+
+class MsgpackRoute(APIRoute):
+    """
+    Route that also speaks MessagePack to internal callers.
+
+    Bodies sent with Content-Type: application/msgpack are decoded straight
+    into the endpoint's pydantic models, without JSON parsing. Requests with
+    Accept: application/msgpack get the response model serialized as
+    MessagePack instead of JSON; adding the skill-ids=true parameter sends
+    skills as [id, score] pairs, ids being positions in GET /api/v1/taxonomy.
+    JSON stays the default and keeps its own serialization path. Encoding
+    the response body is timed as the api.serialization stage.
+    """
+
+    def get_route_handler(self):
+        response_class = self.response_class
+        try:
+            if (
+                isinstance(response_class, DefaultPlaceholder)
+                and response_class.value is JSONResponse
+            ):
+                self.response_class = DefaultPlaceholder(TimedJSONResponse)
+            json_handler = super().get_route_handler()
+            self.response_class = MsgpackResponse
+            msgpack_handler = super().get_route_handler()
+            self.response_class = CompactMsgpackResponse
+            compact_handler = super().get_route_handler()
+        finally:
+            self.response_class = response_class
+
+        async def route_handler(request: Request) -> Response:
+            if is_msgpack(request.headers.get("content-type")):
+                # FastAPI only reads bodies of JSON content types
+                scope = dict(request.scope)
+                scope["headers"] = [
+                    (name, b"application/json" if name == b"content-type" else value)
+                    for name, value in request.scope["headers"]
+                ]
+                request = MsgpackRequest(scope, request.receive)
+
+            options = accepted_msgpack(request.headers.get("accept"))
+            if options is None:
+                return await json_handler(request)
+            compact = options.get("skill-ids", "").lower() in ("1", "true")
+            handler = compact_handler if compact else msgpack_handler
+            response = await handler(request)
+            if response.media_type == "application/json":
+                # Endpoints returning a prepared JSON response (profiles, the
+                # fast CV path) are re-encoded so the Accept header still holds
+                response = _reencode(response, compact)
+            return response
+
+        return route_handler
+
+
+def _reencode(response: Response, compact: bool) -> Response:
+    response_class = CompactMsgpackResponse if compact else MsgpackResponse
+    headers = {
+        name: value
+        for name, value in response.headers.items()
+        if name not in ("content-length", "content-type")
+    }
+    with stage("api", "serialization"):
+        content = json.loads(response.body)
+    return response_class(content, status_code=response.status_code, headers=headers)
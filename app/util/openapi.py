@@ -0,0 +1,89 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+import yaml
+
+API_DIR = Path(__file__).resolve().parent.parent.parent / "resources" / "api"
+SPEC_SOURCE = API_DIR / "openapi.yaml"
+# Build artifact produced by resolve_yaml.py
+SPEC_ARTIFACT = API_DIR / "openapi-resolved.json"
+
+
+@dataclass(frozen=True)
+class EncodedSpec:
+    """OpenAPI spec encoded once, served as-is with an ETag."""
+
+    body: bytes
+    etag: str
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Checks an If-None-Match header against the ETag."""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(tag.removeprefix("W/") == self.etag for tag in tags)
+
+
+@lru_cache(maxsize=None)
+def _load_yaml(path: Path):
+    # Schemas are referenced from many places; parse each file once.
+    # Callers must not mutate the returned data.
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def resolve_refs(data, base_path: Path):
+    """Inlines relative file $refs of an OpenAPI document."""
+    if isinstance(data, dict):
+        if "$ref" in data and len(data) == 1:
+            # This is a reference, resolve it
+            ref_path = data["$ref"]
+            if ref_path.startswith("./") or ref_path.startswith("../"):
+                # Relative file reference
+                file_path = (base_path / ref_path).resolve()
+
+                if file_path.exists():
+                    return resolve_refs(_load_yaml(file_path), file_path.parent)
+                else:
+                    print(f"Could not find referenced file: {file_path}")
+                    return data
+            else:
+                # Internal reference or other type, keep as is
+                return data
+        else:
+            # Regular dict, resolve refs in values
+            return {key: resolve_refs(value, base_path) for key, value in data.items()}
+    elif isinstance(data, list):
+        # List, resolve refs in items
+        return [resolve_refs(item, base_path) for item in data]
+    else:
+        # Primitive value, return as is
+        return data
+
+
+def build_spec(source: Path = SPEC_SOURCE) -> dict:
+    """Resolves the OpenAPI YAML sources into a single document."""
+    source = source.resolve()
+    return resolve_refs(_load_yaml(source), source.parent)
+
+
+def load_spec(artifact: Path = SPEC_ARTIFACT) -> Optional[dict]:
+    """
+    Loads the resolved spec from the build artifact, resolving the YAML
+    sources in-process only when the artifact has not been built.
+    """
+    if artifact.exists():
+        with open(artifact, "r", encoding="utf-8") as f:
+            return json.load(f)
+    if SPEC_SOURCE.exists():
+        print(f"{artifact.name} not found, resolving OpenAPI spec from YAML")
+        return build_spec()
+    return None
+
+
+def encode_spec(spec: dict) -> EncodedSpec:
+    body = json.dumps(spec, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return EncodedSpec(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
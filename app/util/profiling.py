@@ -0,0 +1,179 @@
+"""
+Opt-in per-request profiling.
+
+A RequestProfile is bound to the current context for the duration of one
+request; pipeline stages and counters report into it through
+app.util.stages. The optional sampling profiler polls the request thread's
+stack from a helper thread and summarizes where the time went.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from app.util.tracing import add_to_attribute
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "request_profile", default=None
+)
+
+# Frames from this package are reported relative to the repository root
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@dataclass
+class RequestProfile:
+    """Stage timings (milliseconds) and counters collected for one request."""
+
+    stages: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    total_ms: float = 0.0
+    sampler: Optional[dict] = None
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds * 1000
+
+    def add_count(self, name: str, value: int) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self) -> dict:
+        profile = {
+            "total_ms": round(self.total_ms, 3),
+            "stages": {name: round(ms, 3) for name, ms in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+        if self.sampler is not None:
+            profile["sampler"] = self.sampler
+        return profile
+
+
+def current_profile() -> Optional[RequestProfile]:
+    """Returns the profile of the request being served, if profiling is on."""
+    return _current_profile.get()
+
+
+def record(name: str, value: int) -> None:
+    """
+    Adds to a counter of the current request profile, if any, and to the
+    attribute of that name of the current trace span, if any.
+    """
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.add_count(name, value)
+    add_to_attribute(name, value)
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread at a fixed interval.
+
+    Args:
+        thread_id: Thread to sample, defaults to the calling thread
+        interval: Seconds between samples
+        top_n: Number of frames reported in the summary
+    """
+
+    def __init__(
+        self,
+        thread_id: Optional[int] = None,
+        interval: float = 0.005,
+        top_n: int = 10,
+    ):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.top_n = top_n
+        self.samples = 0
+        self._self_counts: Counter = Counter()
+        self._total_counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="request-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def summary(self) -> dict:
+        """Returns the most frequent leaf frames and frames on the stack."""
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "self": self._top(self._self_counts),
+            "total": self._top(self._total_counts),
+        }
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            self._self_counts[_describe(frame)] += 1
+            # Count each function once per sample, even when recursive
+            seen = set()
+            while frame is not None:
+                seen.add(_describe(frame))
+                frame = frame.f_back
+            self._total_counts.update(seen)
+
+    def _top(self, counts: Counter) -> List[dict]:
+        return [
+            {
+                "frame": frame,
+                "samples": count,
+                "percent": round(100 * count / self.samples, 1),
+            }
+            for frame, count in counts.most_common(self.top_n)
+        ]
+
+
+def _describe(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_ROOT):
+        filename = os.path.relpath(filename, _ROOT)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+@contextmanager
+def profile_request(enabled: bool, sample: bool = False, interval: float = 0.005):
+    """
+    Collects a RequestProfile for the code run inside the block.
+
+    Args:
+        enabled: Whether to profile at all; yields None when False
+        sample: Whether to also run the sampling profiler
+        interval: Seconds between sampler samples
+
+    Yields:
+        The RequestProfile being filled, or None
+    """
+    if not enabled:
+        yield None
+        return
+
+    profile = RequestProfile()
+    token = _current_profile.set(profile)
+    sampler = SamplingProfiler(interval=interval) if sample else None
+    start = time.perf_counter()
+    if sampler is not None:
+        sampler.start()
+    try:
+        yield profile
+    finally:
+        if sampler is not None:
+            sampler.stop()
+            profile.sampler = sampler.summary()
+        profile.total_ms = (time.perf_counter() - start) * 1000
+        _current_profile.reset(token)
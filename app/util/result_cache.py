@@ -0,0 +1,137 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.util.deadlines import RequestAborted, current_deadline
+from app.util.metrics import RESULT_CACHE_REQUESTS
+
+HIT = "hit"
+MISS = "miss"
+# Waited for an identical request that was already being computed
+COALESCED = "coalesced"
+
+# Seconds between deadline checks of a request waiting for another's result
+_WAIT_POLL_SECONDS = 0.05
+
+
+def cache_key(*parts) -> str:
+    """Hashes JSON-serializable parts into a key that ignores dict ordering."""
+    canonical = json.dumps(
+        parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of computed results with a time to live, where
+    concurrent requests for the same missing key share one computation.
+
+    Cached values are returned as-is to every caller and must not be mutated.
+    Waiting callers stop at their own request deadline, and take over the
+    computation when the request computing it is aborted.
+
+    Args:
+        name: Label of the cache in the metrics
+        max_entries: Maximum number of cached results
+        ttl_seconds: Time after which a result is recomputed
+        clock: Monotonic time source
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1024,
+        ttl_seconds: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Tuple[Any, str]:
+        """
+        Returns the cached result for the key, computing it if needed.
+
+        Args:
+            key: Cache key, see cache_key
+            compute: Produces the result on a miss
+
+        Returns:
+            The result and how it was obtained: HIT, MISS or COALESCED
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    expires, value = entry
+                    if expires > self.clock():
+                        self._entries.move_to_end(key)
+                        RESULT_CACHE_REQUESTS.labels(self.name, HIT).inc()
+                        return value, HIT
+                    del self._entries[key]
+
+                flight = self._in_flight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._in_flight[key] = _Flight()
+
+            if leader:
+                break
+            _wait(flight)
+            if isinstance(flight.error, RequestAborted):
+                # The leader's deadline or client, not the computation; retry
+                continue
+            RESULT_CACHE_REQUESTS.labels(self.name, COALESCED).inc()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, COALESCED
+
+        RESULT_CACHE_REQUESTS.labels(self.name, MISS).inc()
+        try:
+            flight.value = compute()
+        except BaseException as e:
+            # Failures are shared with the waiters but not cached
+            flight.error = e
+            raise
+        else:
+            with self._lock:
+                self._entries[key] = (self.clock() + self.ttl_seconds, flight.value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return flight.value, MISS
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight.done.set()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _wait(flight: _Flight) -> None:
+    """Waits for another request's computation, within this request's deadline."""
+    deadline = current_deadline()
+    if deadline is None:
+        flight.done.wait()
+        return
+    while not flight.done.wait(_WAIT_POLL_SECONDS):
+        deadline.check()
@@ -0,0 +1,35 @@
+import time
+from contextlib import contextmanager
+from app.util.deadlines import check_deadline
+from app.util.metrics import STAGE_DURATION
+from app.util.profiling import current_profile
+from app.util.tracing import current_span, span
+
+
+@contextmanager
+def stage(component: str, name: str):
+    """
+    Times one stage of the analysis pipeline, reporting to the metrics, to
+    the request's profile when it is being profiled and as a span when it is
+    traced. The stage does not start once the request's deadline has passed
+    or its client has gone.
+
+    Args:
+        component: Service running the stage, e.g. "text_analyzer"
+        name: Stage name, e.g. "encoding"
+    """
+    check_deadline()
+    histogram = STAGE_DURATION.labels(component, name)
+    profile = current_profile()
+    start = time.perf_counter()
+    try:
+        if current_span() is None:
+            yield
+        else:
+            with span(f"{component}.{name}"):
+                yield
+    finally:
+        elapsed = time.perf_counter() - start
+        histogram.observe(elapsed)
+        if profile is not None:
+            profile.add_stage(f"{component}.{name}", elapsed)
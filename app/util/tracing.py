@@ -0,0 +1,249 @@
+"""
+Sampled per-request tracing.
+
+A sampled request gets a root span for the HTTP exchange; pipeline stages
+(see app.util.stages) and other instrumented code open child spans under the
+current span, and counters reported with app.util.profiling.record become
+span attributes. When the root span ends, all spans of the trace are handed
+to the exporter, by default one JSON object per line in a rotating local
+file. Requests that are not sampled carry no span, and instrumented code
+then does nothing beyond a context variable lookup.
+"""
+
+import importlib
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+from typing import Any, Callable, Dict, List, Optional
+from app.config.service_config import (
+    TRACING_BACKUP_COUNT,
+    TRACING_EXPORTER,
+    TRACING_MAX_BYTES,
+    TRACING_PATH,
+    TRACING_SAMPLE_RATE,
+)
+from app.util.metrics import TRACE_SPANS_EXPORTED
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("trace_span", default=None)
+
+
+@dataclass
+class Span:
+    """One timed operation of a trace; finished spans are added to spans."""
+
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    attributes: Dict[str, Any]
+    spans: List["Span"]
+    start: float = field(default_factory=time.time)
+    duration_ms: float = 0.0
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        span = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+        }
+        if self.error is not None:
+            span["error"] = self.error
+        return span
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+@contextmanager
+def _run_span(span: Span):
+    token = _current_span.set(span)
+    start = time.perf_counter()
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span.duration_ms = (time.perf_counter() - start) * 1000
+        _current_span.reset(token)
+        span.spans.append(span)
+
+
+def current_span() -> Optional[Span]:
+    """Returns the innermost open span, None when the request is not traced."""
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Opens a child span of the current span; does nothing when there is none.
+
+    Args:
+        name: Span name, e.g. "text_analyzer.encoding"
+        attributes: Initial attributes of the span
+
+    Yields:
+        The span, or None
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(
+        parent.trace_id, _new_id(64), parent.span_id, name, attributes, parent.spans
+    )
+    with _run_span(child):
+        yield child
+
+
+def set_attribute(name: str, value: Any) -> None:
+    """Sets an attribute of the current span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes[name] = value
+
+
+def add_to_attribute(name: str, value: int) -> None:
+    """Adds to a counter attribute of the current span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes[name] = current.attributes.get(name, 0) + value
+
+
+class JsonlExporter:
+    """
+    Appends spans to a JSONL file, rotated to path.1 ... path.<backups> once
+    it reaches max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 50_000_000, backups: int = 5):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, delay=True
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def export(self, spans: List[dict]) -> None:
+        for span in spans:
+            self._handler.handle(
+                logging.makeLogRecord({"msg": json.dumps(span, default=str)})
+            )
+
+    def close(self) -> None:
+        self._handler.close()
+
+
+class Tracer:
+    """
+    Starts traces for a sampled fraction of requests and exports them.
+
+    Args:
+        exporter: Object whose export(spans) receives the span dicts of each
+            finished trace
+        sample_rate: Fraction of requests traced, between 0 and 1
+    """
+
+    def __init__(self, exporter, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    @contextmanager
+    def trace(self, name: str, **attributes):
+        """
+        Runs the block as the root span of a new trace, if sampled.
+
+        Yields:
+            The root span, or None when the trace is not sampled
+        """
+        if random.random() >= self.sample_rate:
+            yield None
+            return
+        root = Span(_new_id(128), _new_id(64), None, name, attributes, [])
+        try:
+            with _run_span(root):
+                yield root
+        finally:
+            self._export(root.spans)
+
+    def _export(self, spans: List[Span]) -> None:
+        try:
+            self.exporter.export([span.to_dict() for span in spans])
+            TRACE_SPANS_EXPORTED.labels("exported").inc(len(spans))
+        except Exception:
+            # Tracing never fails the request it traces
+            TRACE_SPANS_EXPORTED.labels("failed").inc(len(spans))
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware tracing sampled HTTP requests; the trace id is returned
+    in the X-Trace-Id header.
+    """
+
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with self.tracer.trace(
+            "http.request", method=scope["method"], path=scope["path"]
+        ) as root:
+            if root is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_traced(message):
+                if message["type"] == "http.response.start":
+                    root.attributes["status"] = message["status"]
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-trace-id", root.trace_id.encode("ascii")),
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_traced)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    root.attributes["route"] = route.path
+                    root.attributes["handler"] = route.name
+
+
+def _resolve(path: str) -> Callable:
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def create_tracer() -> Optional[Tracer]:
+    """Returns the tracer configured by the TRACING_* settings, if enabled."""
+    if TRACING_SAMPLE_RATE <= 0:
+        return None
+    if TRACING_EXPORTER:
+        exporter = _resolve(TRACING_EXPORTER)()
+    else:
+        exporter = JsonlExporter(
+            TRACING_PATH, max_bytes=TRACING_MAX_BYTES, backups=TRACING_BACKUP_COUNT
+        )
+    return Tracer(exporter, sample_rate=min(TRACING_SAMPLE_RATE, 1.0))
+
+
+tracer = create_tracer()
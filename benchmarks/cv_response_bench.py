@@ -0,0 +1,128 @@
+"""
+Compares the standard /analyze-cv response path with the fast path.
+
+Skill detection is replaced by a stub so that the numbers show only the cost of
+copying, validating and serializing the CV. The stage breakdown replays what the
+standard path does in-process (deep copy, response_model validation, JSON
+encoding); the end-to-end numbers go through the route with TestClient.
+Times are the best of several repeats. Run from the repository root:
+
+    python -m benchmarks.cv_response_bench --summaries 10 100 1000
+"""
+
+import argparse
+import json
+import timeit
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from app.model.skill_result import SkillItem
+from app.model.user_cv import UserCV
+
+
+class StubTextAnalyzer:
+    """Detects one technology in every third summary."""
+
+    def extract_skills_from_texts(self, texts, alpha=1.0, top_k=5, tenant_index=None):
+        return [
+            [SkillItem(name="Python", score=0.9)] if i % 3 == 0 else []
+            for i in range(len(texts))
+        ]
+
+
+def build_cv_payload(num_summaries: int, summaries_per_entry: int = 5) -> dict:
+    entries = [
+        {
+            "position": f"Engineer {i}",
+            "company": f"Company {i}",
+            "startDate": "2020-01-01",
+            "endDate": "2021-01-01",
+            "summaries": [
+                {
+                    "text": "Built and maintained backend services for payments. "
+                    "Worked closely with product and QA teams",
+                    "technologies": ["Git", "Linux"],
+                }
+                for _ in range(summaries_per_entry)
+            ],
+        }
+        for i in range(max(1, num_summaries // summaries_per_entry))
+    ]
+    return {
+        "personalInfo": {"firstName": "Jan", "lastName": "Kowalski"},
+        "skills": ["Python", "SQL"],
+        "experience": entries,
+    }
+
+
+def best_ms(func, number: int, repeat: int = 5) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--summaries", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    import app.api.cv_routes as cv_routes
+
+    service = cv_routes.cv_service
+    service.text_analyzer = StubTextAnalyzer()
+    bench_app = FastAPI()
+    bench_app.include_router(cv_routes.router, prefix="/api/v1/cv")
+    client = TestClient(bench_app)
+
+    def standard_chain(cv):
+        enhanced = service.analyze_cv(cv, 1.0, 5, 0.1)
+        validated = UserCV.model_validate(enhanced.model_dump())
+        return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+    def fast_chain(cv):
+        return service.analyze_cv_copy_on_write(cv, 1.0, 5, 0.1).model_dump_json()
+
+    print(
+        f"{'summaries':>10} {'path':>9} {'copy ms':>9} {'validate ms':>12} "
+        f"{'encode ms':>10} {'chain ms':>9} {'request ms':>11}"
+    )
+    for num_summaries in args.summaries:
+        payload = build_cv_payload(num_summaries)
+        cv = UserCV.model_validate(payload)
+        enhanced = service.analyze_cv(cv, 1.0, 5, 0.1)
+        number = args.iterations
+
+        rows = {
+            "standard": (
+                best_ms(lambda: service.analyze_cv(cv, 1.0, 5, 0.1), number),
+                best_ms(lambda: UserCV.model_validate(enhanced.model_dump()), number),
+                best_ms(lambda: json.dumps(jsonable_encoder(enhanced)), number),
+                best_ms(lambda: standard_chain(cv), number),
+                best_ms(
+                    lambda: client.post("/api/v1/cv/analyze-cv", json=payload),
+                    number,
+                ),
+            ),
+            "fast": (
+                best_ms(
+                    lambda: service.analyze_cv_copy_on_write(cv, 1.0, 5, 0.1), number
+                ),
+                0.0,
+                best_ms(lambda: enhanced.model_dump_json(), number),
+                best_ms(lambda: fast_chain(cv), number),
+                best_ms(
+                    lambda: client.post(
+                        "/api/v1/cv/analyze-cv?fast=true", json=payload
+                    ),
+                    number,
+                ),
+            ),
+        }
+        for path, (copy, validate, encode, chain, request) in rows.items():
+            print(
+                f"{num_summaries:>10} {path:>9} {copy:>9.2f} {validate:>12.2f} "
+                f"{encode:>10.2f} {chain:>9.2f} {request:>11.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Deterministic stand-in for the sentence-transformers encoder.
+
+Texts are embedded as the normalized sum of per-word random vectors seeded by
+the word itself, so a sentence mentioning "Docker" is close to the "Docker"
+skill and results are identical across runs and machines. To keep timings
+meaningful, every encode call also runs a stack of dense layers over the
+tokens, roughly a sixth of the per-token FLOPs of all-mpnet-base-v2 with the
+default settings.
+"""
+
+import re
+import zlib
+from typing import Dict, List, Union
+import numpy as np
+import torch
+
+EMBEDDING_DIM = 768
+
+_WORD = re.compile(r"\w+")
+
+
+class FakeEncoder:
+    """
+    Args:
+        dim: Embedding dimension
+        layers: Number of dense layers simulated per token, 0 for no cost
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, layers: int = 12):
+        self.dim = dim
+        self.layers = layers
+        self._word_vectors: Dict[str, np.ndarray] = {}
+        self._weights = np.random.default_rng(0).standard_normal(
+            (dim, dim), dtype=np.float32
+        ) / np.sqrt(dim)
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        convert_to_tensor: bool = False,
+        **kwargs,
+    ):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        tokens = [_WORD.findall(text.lower()) for text in texts]
+
+        self._simulate_cost(sum(len(words) for words in tokens))
+
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, words in enumerate(tokens):
+            for word in words:
+                embeddings[row] += self._word_vector(word)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        embeddings /= norms
+
+        if single:
+            embeddings = embeddings[0]
+        if convert_to_tensor:
+            return torch.from_numpy(embeddings)
+        return embeddings
+
+    def _word_vector(self, word: str) -> np.ndarray:
+        vector = self._word_vectors.get(word)
+        if vector is None:
+            rng = np.random.default_rng(zlib.crc32(word.encode("utf-8")))
+            vector = rng.standard_normal(self.dim, dtype=np.float32)
+            vector /= np.linalg.norm(vector)
+            self._word_vectors[word] = vector
+        return vector
+
+    def _simulate_cost(self, num_tokens: int) -> None:
+        if not self.layers or not num_tokens:
+            return
+        hidden = np.ones((num_tokens, self.dim), dtype=np.float32)
+        for _ in range(self.layers):
+            hidden = np.tanh(hidden @ self._weights)
+
+
+def load_fake_encoder(model_id: str) -> FakeEncoder:
+    """Model loader for the inference server (--loader) ignoring the model id."""
+    return FakeEncoder()
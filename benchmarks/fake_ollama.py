@@ -0,0 +1,139 @@
+"""
+Local stand-in for the Ollama generate API.
+
+Answers POST /api/generate like Ollama does, both as one JSON object and, when
+the request sets "stream": true, as newline-delimited JSON chunks. Latency,
+jitter, generation speed, error and hang rates are configurable, so the
+/generate-bio path can be load-tested without a GPU. Run from the repository
+root and point the service at it with OLLAMA_URL:
+
+    python -m benchmarks.fake_ollama --port 11434 --latency-ms 800 --failure-rate 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_WORDS = (
+    "experienced engineer with a track record of delivering reliable backend "
+    "services and leading small teams through ambitious product launches"
+).split()
+
+
+@dataclass
+class FakeOllamaConfig:
+    """
+    Args:
+        latency_ms: Time to first token
+        jitter_ms: Uniform random extra latency, 0 to jitter_ms
+        tokens: Number of generated tokens
+        tokens_per_second: Generation speed after the first token
+        failure_rate: Fraction of requests answered with HTTP 500
+        hang_rate: Fraction of requests that never answer (client timeouts)
+        seed: Seed of the random generator, for reproducible runs
+    """
+
+    latency_ms: float = 500.0
+    jitter_ms: float = 100.0
+    tokens: int = 120
+    tokens_per_second: float = 400.0
+    failure_rate: float = 0.0
+    hang_rate: float = 0.0
+    seed: int = 0
+
+
+def create_app(config: FakeOllamaConfig) -> FastAPI:
+    app = FastAPI(title="Fake Ollama")
+    rng = random.Random(config.seed)
+    stats = {"requests": 0, "failures": 0, "hangs": 0}
+
+    def generated_tokens():
+        return [_WORDS[i % len(_WORDS)] + " " for i in range(config.tokens)]
+
+    def done_chunk(model: str, started: float) -> dict:
+        return {
+            "model": model,
+            "response": "",
+            "done": True,
+            "total_duration": int((time.perf_counter() - started) * 1e9),
+            "eval_count": config.tokens,
+        }
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        started = time.perf_counter()
+        payload = await request.json()
+        model = payload.get("model", "fake")
+        stats["requests"] += 1
+
+        roll = rng.random()
+        await asyncio.sleep(
+            (config.latency_ms + rng.uniform(0, config.jitter_ms)) / 1000
+        )
+        if roll < config.hang_rate:
+            stats["hangs"] += 1
+            await asyncio.Event().wait()
+        if roll < config.hang_rate + config.failure_rate:
+            stats["failures"] += 1
+            return JSONResponse(
+                status_code=500, content={"error": "simulated model failure"}
+            )
+
+        tokens = generated_tokens()
+        token_delay = 1 / config.tokens_per_second if config.tokens_per_second else 0
+
+        if payload.get("stream", True):
+
+            async def chunks():
+                for token in tokens:
+                    await asyncio.sleep(token_delay)
+                    chunk = {"model": model, "response": token, "done": False}
+                    yield json.dumps(chunk) + "\n"
+                yield json.dumps(done_chunk(model, started)) + "\n"
+
+            return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+        await asyncio.sleep(token_delay * len(tokens))
+        return {**done_chunk(model, started), "response": "".join(tokens).strip()}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--tokens", type=int, default=120)
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = FakeOllamaConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens=args.tokens,
+        tokens_per_second=args.tokens_per_second,
+        failure_rate=args.failure_rate,
+        hang_rate=args.hang_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
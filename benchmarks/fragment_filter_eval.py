@@ -0,0 +1,149 @@
+"""
+Evaluates the fragment filter: encoding saved against skill recall lost.
+
+Runs TextAnalyzer.extract_skills_from_text over a labeled sample with the
+filter off and on and reports the fragments dropped per reason, the time
+saved, recall against the labels in both runs and every skill detected
+without the filter but missed with it. The sample is JSON lines with the
+"text" and the taxonomy "skills" it mentions. Use it to tune
+FRAGMENT_FILTER_MIN_CHARS and FRAGMENT_FILTER_BOILERPLATE before deploying
+new values. Run from the repository root:
+
+    python -m benchmarks.fragment_filter_eval --encoder model
+    python -m benchmarks.fragment_filter_eval --min-chars 5 --show-dropped
+    python -m benchmarks.fragment_filter_eval --max-recall-loss 0.02
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional, Set
+from benchmarks.pipeline_bench import install_encoder
+from app.config.skill_config import hard_skills, soft_skills, tools
+from app.util.fragment_filter import DEFAULT_BOILERPLATE, FragmentFilter
+
+SAMPLE_PATH = Path(__file__).resolve().parent / "data" / "fragment_filter_sample.jsonl"
+
+
+def load_sample(path: Path) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def detect(analyzer, texts: List[str], repeat: int):
+    """Returns the skills detected per text and the best time of all texts."""
+    best, detected = float("inf"), []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        detected = [
+            {skill.name.casefold() for skill in analyzer.extract_skills_from_text(t)}
+            for t in texts
+        ]
+        best = min(best, time.perf_counter() - start)
+    return detected, best
+
+
+def recall(labels: List[Set[str]], detected: List[Set[str]]) -> float:
+    total = sum(len(expected) for expected in labels)
+    found = sum(len(expected & got) for expected, got in zip(labels, detected))
+    return found / total if total else 1.0
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sample", type=Path, default=SAMPLE_PATH)
+    parser.add_argument("--encoder", choices=["fake", "model"], default="fake")
+    parser.add_argument("--encoder-layers", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-chars", type=int, default=3)
+    parser.add_argument(
+        "--boilerplate",
+        type=Path,
+        help="JSON file with the list of boilerplate regexes to evaluate",
+    )
+    parser.add_argument(
+        "--show-dropped", action="store_true", help="Print every dropped fragment"
+    )
+    parser.add_argument(
+        "--max-recall-loss",
+        type=float,
+        help="Exit with status 1 if recall drops by more than this fraction",
+    )
+    args = parser.parse_args(argv)
+
+    encoder = install_encoder(args.encoder, args.encoder_layers)
+    # Imported here so the encoder is installed before the analyzer exists
+    from app.service import text_analyzer
+
+    boilerplate = DEFAULT_BOILERPLATE
+    if args.boilerplate is not None:
+        with open(args.boilerplate, encoding="utf-8") as f:
+            boilerplate = json.load(f)
+    gate = FragmentFilter(
+        hard_skills + soft_skills + tools,
+        min_chars=args.min_chars,
+        boilerplate=boilerplate,
+    )
+
+    sample = load_sample(args.sample)
+    texts = [item["text"] for item in sample]
+    labels = [{skill.casefold() for skill in item["skills"]} for item in sample]
+
+    fragments, reasons, dropped = 0, Counter(), []
+    for text in texts:
+        for fragment in text_analyzer.TextAnalyzer._split_sentences(text):
+            fragments += 1
+            reason = gate.reason(fragment)
+            if reason is not None:
+                reasons[reason] += 1
+                dropped.append((reason, fragment))
+
+    analyzer = text_analyzer.TextAnalyzer()
+    analyzer.get_skill_matrix()
+    configured = text_analyzer.fragment_filter
+    try:
+        text_analyzer.fragment_filter = None
+        unfiltered, unfiltered_seconds = detect(analyzer, texts, args.repeat)
+        text_analyzer.fragment_filter = gate
+        filtered, filtered_seconds = detect(analyzer, texts, args.repeat)
+    finally:
+        text_analyzer.fragment_filter = configured
+
+    recall_off, recall_on = recall(labels, unfiltered), recall(labels, filtered)
+    print(f"encoder: {encoder}")
+    print(f"sample: {args.sample} ({len(texts)} texts, {fragments} fragments)")
+    print(f"dropped: {len(dropped)} ({len(dropped) / max(fragments, 1):.1%})")
+    for reason, count in reasons.most_common():
+        print(f"  {reason:<16} {count:>5}")
+    print(
+        f"time: {unfiltered_seconds * 1000:.1f} ms -> {filtered_seconds * 1000:.1f} ms "
+        f"({filtered_seconds / unfiltered_seconds - 1:+.1%})"
+    )
+    print(f"recall: {recall_off:.3f} -> {recall_on:.3f}")
+
+    lost = [
+        (text, sorted(off - on))
+        for text, off, on in zip(texts, unfiltered, filtered)
+        if off - on
+    ]
+    if lost:
+        print("\nskills detected only without the filter:")
+        for text, skills in lost:
+            print(f"  {', '.join(skills)}  <-  {text[:70]}")
+    if args.show_dropped:
+        print("\ndropped fragments:")
+        for reason, fragment in dropped:
+            print(f"  {reason:<16} {fragment}")
+
+    if args.max_recall_loss is not None and (
+        recall_off - recall_on > args.max_recall_loss
+    ):
+        print(f"\nFAIL: recall dropped by {recall_off - recall_on:.3f}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""
+End-to-end load test of the HTTP API.
+
+Drives the running service with a closed loop of concurrent clients sending a
+weighted mix of /analyze-offer, /analyze-cv and /generate-bio requests with
+synthetic payloads of configurable sizes. Each concurrency level runs for a
+fixed time; the report gives throughput, error rate and p50/p95/p99 latency per
+level and route, and the saturation point, the level after which adding
+clients no longer adds throughput. Run from the repository root:
+
+    # Against a running service
+    python -m benchmarks.loadtest run --url http://127.0.0.1:8082
+
+    # Self-contained: starts the fake Ollama and the app with the fake encoder
+    python -m benchmarks.loadtest run --spawn --concurrency 1 2 4 8 16
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import httpx
+from benchmarks.pipeline_bench import SyntheticText, install_encoder
+
+ROUTES = {
+    "analyze-offer": "/api/v1/offer/analyze-offer",
+    "analyze-cv": "/api/v1/cv/analyze-cv",
+    "generate-bio": "/api/v1/cv/generate-bio",
+}
+
+# Distinct payloads per route and size, so caches do not flatter the numbers
+PAYLOAD_VARIANTS = 16
+
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def record(self, latency: float, status: str, ok: bool) -> None:
+        self.latencies.append(latency)
+        self.statuses[status] += 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, duration: float) -> dict:
+        count = len(self.latencies)
+        ordered = sorted(self.latencies)
+        return {
+            "requests": count,
+            "throughput": count / duration,
+            "error_rate": self.errors / count if count else 0.0,
+            "p50_ms": percentile(ordered, 50) * 1000,
+            "p95_ms": percentile(ordered, 95) * 1000,
+            "p99_ms": percentile(ordered, 99) * 1000,
+            "statuses": dict(self.statuses),
+        }
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parses "analyze-offer=6,analyze-cv=3,generate-bio=1" into route weights."""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ROUTES:
+            raise argparse.ArgumentTypeError(
+                f"Unknown route {name}, expected one of {', '.join(ROUTES)}"
+            )
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def build_payloads(
+    mix: Dict[str, float], sizes: List[int], seed: int
+) -> Dict[str, List[bytes]]:
+    """Pre-encodes request bodies so the client spends no time on them."""
+    synthetic = SyntheticText(seed)
+    payloads = {}
+    for route in mix:
+        bodies = []
+        for size in sizes:
+            for _ in range(PAYLOAD_VARIANTS):
+                if route == "analyze-offer":
+                    body = synthetic.job_offer(size)
+                elif route == "analyze-cv":
+                    body = synthetic.cv(max(1, size // 2)).model_dump(mode="json")
+                else:
+                    body = {
+                        "user_cv": synthetic.cv(5).model_dump(mode="json"),
+                        "skill_result": {
+                            "hard_skills": [{"name": "Python", "score": 0.9}],
+                            "soft_skills": [{"name": "teamwork", "score": 0.6}],
+                            "tools": [{"name": "Docker", "score": 0.7}],
+                        },
+                        "job_offer": synthetic.job_offer(size),
+                    }
+                bodies.append(json.dumps(body).encode("utf-8"))
+        payloads[route] = bodies
+    return payloads
+
+
+async def run_level(
+    url: str,
+    mix: Dict[str, float],
+    payloads: Dict[str, List[bytes]],
+    concurrency: int,
+    duration: float,
+    timeout: float,
+    seed: int,
+) -> Tuple[Dict[str, RouteStats], float]:
+    """Runs `concurrency` clients back to back for `duration` seconds."""
+    stats: Dict[str, RouteStats] = defaultdict(RouteStats)
+    routes = list(mix)
+    weights = [mix[route] for route in routes]
+    deadline = time.perf_counter() + duration
+
+    async def client_loop(client: httpx.AsyncClient, worker: int):
+        rng = random.Random(seed * 1000 + worker)
+        while time.perf_counter() < deadline:
+            route = rng.choices(routes, weights)[0]
+            body = rng.choice(payloads[route])
+            start = time.perf_counter()
+            try:
+                response = await client.post(
+                    ROUTES[route],
+                    content=body,
+                    headers={"Content-Type": "application/json"},
+                )
+                status, ok = str(response.status_code), response.is_success
+            except httpx.TimeoutException:
+                status, ok = "timeout", False
+            except httpx.HTTPError as e:
+                status, ok = type(e).__name__, False
+            stats[route].record(time.perf_counter() - start, status, ok)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=url, timeout=timeout, limits=limits
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return stats, elapsed
+
+
+def find_saturation(levels: List[dict], min_gain: float, max_error_rate: float):
+    """
+    Returns the concurrency level after which throughput stops growing by at
+    least `min_gain` (or errors exceed `max_error_rate`), None if it kept
+    scaling over all tested levels.
+    """
+    for previous, level in zip(levels, levels[1:]):
+        if level["total"]["error_rate"] > max_error_rate:
+            return previous["concurrency"]
+        gain = level["total"]["throughput"] / previous["total"]["throughput"] - 1
+        if gain < min_gain:
+            return previous["concurrency"]
+    return None
+
+
+def print_level(level: dict) -> None:
+    for route, summary in [("all", level["total"]), *level["routes"].items()]:
+        print(
+            f"{level['concurrency']:>11} {route:<14} {summary['requests']:>8} "
+            f"{summary['throughput']:>8.1f} {summary['error_rate']:>7.1%} "
+            f"{summary['p50_ms']:>9.1f} {summary['p95_ms']:>9.1f} "
+            f"{summary['p99_ms']:>9.1f}"
+        )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/ready", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"{url} did not become ready within {timeout:.0f}s")
+
+
+def spawn_services(args) -> Tuple[str, List[subprocess.Popen]]:
+    """Starts the fake Ollama and the app on free local ports."""
+    ollama_port, app_port = free_port(), free_port()
+    ollama = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.fake_ollama",
+            "--port",
+            str(ollama_port),
+            "--latency-ms",
+            str(args.ollama_latency_ms),
+            "--failure-rate",
+            str(args.ollama_failure_rate),
+            "--hang-rate",
+            str(args.ollama_hang_rate),
+        ]
+    )
+    env = {
+        **os.environ,
+        "OLLAMA_URL": f"http://127.0.0.1:{ollama_port}/api/generate",
+        "HF_HUB_OFFLINE": "1",
+    }
+    app = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.loadtest",
+            "serve",
+            "--port",
+            str(app_port),
+            "--encoder",
+            args.encoder,
+        ],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{app_port}"
+    try:
+        wait_until_ready(url, args.ready_timeout)
+    except Exception:
+        for process in (app, ollama):
+            process.terminate()
+        raise
+    return url, [app, ollama]
+
+
+def run(args) -> None:
+    processes = []
+    url = args.url
+    if args.spawn:
+        url, processes = spawn_services(args)
+
+    try:
+        payloads = build_payloads(args.mix, args.sizes, args.seed)
+        if args.warmup:
+            asyncio.run(
+                run_level(
+                    url, args.mix, payloads, 1, args.warmup, args.timeout, args.seed
+                )
+            )
+
+        print(f"target: {url}  mix: {args.mix}  sizes: {args.sizes}")
+        print(
+            f"{'concurrency':>11} {'route':<14} {'requests':>8} {'req/s':>8} "
+            f"{'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        )
+        levels = []
+        for concurrency in args.concurrency:
+            stats, elapsed = asyncio.run(
+                run_level(
+                    url,
+                    args.mix,
+                    payloads,
+                    concurrency,
+                    args.duration,
+                    args.timeout,
+                    args.seed,
+                )
+            )
+            total = RouteStats()
+            for route_stats in stats.values():
+                total.latencies.extend(route_stats.latencies)
+                total.errors += route_stats.errors
+                for status, count in route_stats.statuses.items():
+                    total.statuses[status] += count
+            level = {
+                "concurrency": concurrency,
+                "total": total.summary(elapsed),
+                "routes": {
+                    route: stats[route].summary(elapsed)
+                    for route in args.mix
+                    if route in stats
+                },
+            }
+            levels.append(level)
+            print_level(level)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    saturation = find_saturation(levels, args.min_gain, args.max_error_rate)
+    if saturation is None:
+        print("\nThroughput kept growing; test higher concurrency to saturate")
+    else:
+        best = next(level for level in levels if level["concurrency"] == saturation)
+        print(
+            f"\nSaturation at concurrency {saturation}: "
+            f"{best['total']['throughput']:.1f} req/s, "
+            f"p95 {best['total']['p95_ms']:.0f} ms"
+        )
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "url": url,
+                    "mix": args.mix,
+                    "sizes": args.sizes,
+                    "duration": args.duration,
+                    "levels": levels,
+                    "saturation_concurrency": saturation,
+                },
+                f,
+                indent=2,
+            )
+        print(f"Report saved: {args.report}")
+
+
+def serve(args) -> None:
+    # The encoder must be in place before the app creates its analyzers
+    install_encoder(args.encoder, args.encoder_layers)
+
+    import uvicorn
+    from app.main import app
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the load test")
+    run_parser.add_argument("--url", default="http://127.0.0.1:8082")
+    run_parser.add_argument(
+        "--spawn",
+        action="store_true",
+        help="Start the fake Ollama and the app locally instead of using --url",
+    )
+    run_parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=parse_mix("analyze-offer=6,analyze-cv=3,generate-bio=1"),
+        help="Route weights, e.g. analyze-offer=6,analyze-cv=3,generate-bio=1",
+    )
+    run_parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10, 50],
+        help="Sentences per payload, picked at random per request",
+    )
+    run_parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16]
+    )
+    run_parser.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds per concurrency level"
+    )
+    run_parser.add_argument("--warmup", type=float, default=2.0)
+    run_parser.add_argument("--timeout", type=float, default=60.0)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument(
+        "--min-gain",
+        type=float,
+        default=0.1,
+        help="Throughput gain below which a level counts as saturated",
+    )
+    run_parser.add_argument("--max-error-rate", type=float, default=0.01)
+    run_parser.add_argument("--report", help="Write the report as JSON")
+    run_parser.add_argument("--encoder", choices=["fake", "model"], default="fake")
+    run_parser.add_argument("--ready-timeout", type=float, default=300.0)
+    run_parser.add_argument("--ollama-latency-ms", type=float, default=500.0)
+    run_parser.add_argument("--ollama-failure-rate", type=float, default=0.0)
+    run_parser.add_argument("--ollama-hang-rate", type=float, default=0.0)
+    run_parser.set_defaults(func=run)
+
+    serve_parser = commands.add_parser(
+        "serve", help="Serve the app with the chosen encoder (used by --spawn)"
+    )
+    serve_parser.add_argument("--port", type=int, default=8082)
+    serve_parser.add_argument("--encoder", choices=["fake", "model"], default="fake")
+    serve_parser.add_argument("--encoder-layers", type=int, default=12)
+    serve_parser.set_defaults(func=serve)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Measures CV-to-offers matching over large offer sets.
+
+Offers are synthetic skill results of 12 taxonomy skills each, scored against
+one CV the way POST /api/v1/match/cv-to-offers does it. Skill embeddings come
+from the fake encoder, so the numbers show only the cost of building the
+offer vectors, the matrix product and the top-k selection. Times are the best
+of several repeats. Run from the repository root:
+
+    python -m benchmarks.matching_bench --offers 1000 10000 100000
+"""
+
+import argparse
+import timeit
+from typing import List, Optional
+import numpy as np
+from benchmarks.pipeline_bench import install_encoder
+from app.model.skill_result import SkillItem, SkillResult
+from app.model.user_cv import UserCV
+from app.service.matching_service import MatchingService
+from app.service.text_analyzer import TextAnalyzer
+
+
+def make_offers(names: List[str], count: int, seed: int = 0) -> List[SkillResult]:
+    rng = np.random.default_rng(seed)
+    return [
+        SkillResult(
+            hard_skills=[
+                SkillItem(name=name, score=1.0)
+                for name in rng.choice(names, size=12, replace=False)
+            ],
+            soft_skills=[],
+            tools=[],
+        )
+        for _ in range(count)
+    ]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--offers", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    install_encoder("fake", 2)
+    service = MatchingService(TextAnalyzer())
+    names, _ = service.text_analyzer.get_skill_matrix()
+    cv = UserCV(
+        personalInfo=UserCV.PersonalInfo(firstName="Jan", lastName="Kowalski"),
+        skills=["Python", "Docker"],
+    )
+
+    print(f"{'offers':>8} {'ms':>9}")
+    for count in args.offers:
+        offers = make_offers(names, count)
+        ms = (
+            min(
+                timeit.repeat(
+                    lambda: service.match_cv_to_offers(cv, offers, top_k=args.top_k),
+                    number=1,
+                    repeat=args.repeat,
+                )
+            )
+            * 1000
+        )
+        print(f"{count:>8} {ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Goodput of the analysis runner under overload.
+
+Offers requests at a fixed rate above the runner's capacity (open loop, as
+real clients do not wait for each other) and counts the requests answered
+within the client's timeout, i.e. before the client gave up. Each request's
+work is a few pipeline stages of fixed CPU-free duration. Three setups are
+compared: work always runs to completion (the service before deadlines),
+work stops at the client's deadline or disconnect, and the latter plus load
+shedding. Run from the repository root:
+
+    python -m benchmarks.overload_bench
+    python -m benchmarks.overload_bench --load 2.0 --client-timeout 0.5
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List, Optional
+from app.util.admission import AnalysisRunner
+from app.util.deadlines import Deadline, RequestAborted
+from app.util.load_shedding import LoadShedder
+from app.util.stages import stage
+
+
+class _Request:
+    """Client that disconnects when its timeout passes, if noticed at all."""
+
+    def __init__(self, timeout: Optional[float]):
+        self.timeout = timeout
+
+    async def receive(self) -> dict:
+        if self.timeout is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.timeout)
+        return {"type": "http.disconnect"}
+
+
+def make_work(stages: int, stage_seconds: float):
+    def work():
+        for i in range(stages):
+            with stage("overload_bench", f"stage_{i}"):
+                time.sleep(stage_seconds)
+
+    return work
+
+
+async def run_setup(
+    runner: AnalysisRunner,
+    rate: float,
+    duration: float,
+    client_timeout: float,
+    deadlines: bool,
+    work,
+) -> dict:
+    counts = {"good": 0, "late": 0, "aborted": 0}
+
+    async def one_request():
+        start = time.perf_counter()
+        timeout = client_timeout if deadlines else None
+        try:
+            await runner.run(_Request(timeout), Deadline(timeout), work)
+        except RequestAborted:
+            counts["aborted"] += 1
+            return
+        elapsed = time.perf_counter() - start
+        counts["good" if elapsed <= client_timeout else "late"] += 1
+
+    tasks = []
+    start = time.perf_counter()
+    sent = 0
+    while time.perf_counter() - start < duration:
+        tasks.append(asyncio.ensure_future(one_request()))
+        sent += 1
+        await asyncio.sleep(max(0.0, start + sent / rate - time.perf_counter()))
+    await asyncio.gather(*tasks)
+    return {
+        "sent": sent,
+        **counts,
+        "goodput": counts["good"] / duration,
+        "drain_seconds": time.perf_counter() - start - duration,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--stages", type=int, default=4)
+    parser.add_argument("--stage-ms", type=float, default=10.0)
+    parser.add_argument(
+        "--load", type=float, default=1.5, help="Offered load relative to capacity"
+    )
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--client-timeout", type=float, default=0.3)
+    parser.add_argument("--shed-target-ms", type=float, default=50.0)
+    parser.add_argument("--shed-interval-ms", type=float, default=200.0)
+    args = parser.parse_args(argv)
+
+    work = make_work(args.stages, args.stage_ms / 1000)
+    capacity = args.concurrency / (args.stages * args.stage_ms / 1000)
+    rate = capacity * args.load
+    print(
+        f"capacity {capacity:.0f} req/s, offered {rate:.0f} req/s, "
+        f"client timeout {args.client_timeout * 1000:.0f} ms"
+    )
+    print(
+        f"{'setup':<22} {'sent':>6} {'good':>6} {'late':>6} {'aborted':>8} "
+        f"{'goodput/s':>10} {'drain s':>8}"
+    )
+    setups = [
+        ("run to completion", False, 0.0),
+        ("deadlines", True, 0.0),
+        ("deadlines + shedding", True, args.shed_target_ms / 1000),
+    ]
+    for name, deadlines, target in setups:
+        runner = AnalysisRunner(
+            concurrency=args.concurrency,
+            shedder=LoadShedder(
+                target_seconds=target,
+                interval_seconds=args.shed_interval_ms / 1000,
+            ),
+        )
+        try:
+            result = asyncio.run(
+                run_setup(
+                    runner, rate, args.duration, args.client_timeout, deadlines, work
+                )
+            )
+        finally:
+            runner.close()
+        print(
+            f"{name:<22} {result['sent']:>6} {result['good']:>6} "
+            f"{result['late']:>6} {result['aborted']:>8} "
+            f"{result['goodput']:>10.1f} {result['drain_seconds']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
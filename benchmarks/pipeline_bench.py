@@ -0,0 +1,361 @@
+"""
+Offline microbenchmarks for the skill analysis pipeline.
+
+Runs TextAnalyzer.extract_skills_from_text, TextAnalyzer.analyze_multiple_texts,
+OfferAnalyzer.analyze_job_offer and CVService.analyze_cv over synthetic inputs
+of several sizes and reports latency (best of several repeats), throughput in
+sentences per second, peak traced memory and blocks still allocated after the
+call (caches that keep growing show up here). No network access is needed:
+by default the encoder is benchmarks.fake_encoder.FakeEncoder, and
+--encoder model uses all-mpnet-base-v2 only if it is already cached.
+
+Each result also carries a digest of the pipeline output, so a stored baseline
+catches behaviour changes as well as slowdowns. Run from the repository root:
+
+    python -m benchmarks.pipeline_bench
+    python -m benchmarks.pipeline_bench --save-baseline
+    python -m benchmarks.pipeline_bench --fail-on-regression
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from fastapi.encoders import jsonable_encoder
+from benchmarks.fake_encoder import FakeEncoder
+from app.config.skill_config import hard_skills, soft_skills, tools
+from app.model.user_cv import UserCV
+from app.util import embeddings
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+_FILLER = (
+    "worked closely with product owners and designers on customer facing features",
+    "improved the reliability of nightly releases across several teams",
+    "mentored junior colleagues and ran weekly knowledge sharing sessions",
+    "took part in planning and estimation of upcoming milestones",
+    "maintained documentation for internal services and onboarding",
+)
+
+
+@dataclass
+class Case:
+    name: str
+    sentences: int
+    run: Callable[[], object]
+
+
+@dataclass
+class Result:
+    ms: float
+    sentences_per_second: float
+    peak_kib: float
+    retained_blocks: int
+    digest: str
+
+
+class SyntheticText:
+    """Deterministic sentences mixing taxonomy skills with filler text."""
+
+    def __init__(self, seed: int = 0):
+        self.random = random.Random(seed)
+        self.skills = hard_skills + soft_skills + tools
+
+    def sentence(self) -> str:
+        skills = self.random.sample(self.skills, self.random.randint(0, 2))
+        filler = self.random.choice(_FILLER)
+        if not skills:
+            return filler.capitalize()
+        return f"Used {' and '.join(skills)} and {filler}"
+
+    def text(self, num_sentences: int) -> str:
+        return ". ".join(self.sentence() for _ in range(num_sentences)) + "."
+
+    def job_offer(self, num_sentences: int) -> dict:
+        per_section = max(1, num_sentences // 4)
+        return {
+            "description": self.text(per_section),
+            # Half taxonomy names (exact lookup), half free text
+            "technologies": [
+                self.random.choice(self.skills) if i % 2 else self.sentence()
+                for i in range(per_section)
+            ],
+            "requirements": [self.sentence() for _ in range(per_section)],
+            "responsibilities": [self.sentence() for _ in range(per_section)],
+        }
+
+    def cv(self, num_summaries: int, summaries_per_entry: int = 5) -> UserCV:
+        entries = [
+            {
+                "position": f"Engineer {i}",
+                "company": f"Company {i}",
+                "startDate": "2020-01-01",
+                "endDate": "2021-01-01",
+                "summaries": [
+                    {"text": self.text(2), "technologies": ["Git"]}
+                    for _ in range(summaries_per_entry)
+                ],
+            }
+            for i in range(max(1, num_summaries // summaries_per_entry))
+        ]
+        return UserCV.model_validate(
+            {
+                "personalInfo": {"firstName": "Jan", "lastName": "Kowalski"},
+                "skills": ["Python", "SQL"],
+                "experience": entries,
+            }
+        )
+
+
+def build_cases(sizes: List[int]) -> List[Case]:
+    # Imported here so the encoder is installed before the services exist
+    from app.service.cv_service import CVService
+    from app.service.offer_analyzer import OfferAnalyzer
+    from app.service.text_analyzer import TextAnalyzer
+
+    text_analyzer = TextAnalyzer()
+    offer_analyzer = OfferAnalyzer()
+    cv_service = CVService()
+    synthetic = SyntheticText()
+
+    cases = []
+    for size in sizes:
+        text = synthetic.text(size)
+        cases.append(
+            Case(
+                f"extract_skills_from_text/sentences={size}",
+                size,
+                lambda text=text: text_analyzer.extract_skills_from_text(text),
+            )
+        )
+
+        texts = [synthetic.text(5) for _ in range(max(1, size // 5))]
+        cases.append(
+            Case(
+                f"analyze_multiple_texts/sentences={size}",
+                5 * len(texts),
+                lambda texts=texts: text_analyzer.analyze_multiple_texts(texts),
+            )
+        )
+
+        offer = synthetic.job_offer(size)
+        cases.append(
+            Case(
+                f"analyze_job_offer/sentences={size}",
+                size,
+                lambda offer=offer: offer_analyzer.analyze_job_offer(offer),
+            )
+        )
+
+        cv = synthetic.cv(max(1, size // 2))
+        cases.append(
+            Case(
+                f"analyze_cv/sentences={size}",
+                2 * sum(len(entry.summaries) for entry in cv.experience),
+                lambda cv=cv: cv_service.analyze_cv(cv, 1.0, 5, 0.1),
+            )
+        )
+    return cases
+
+
+def digest(output) -> str:
+    """Hashes a pipeline output, rounding scores to hide float noise."""
+
+    def rounded(value):
+        if isinstance(value, float):
+            return round(value, 4)
+        if isinstance(value, dict):
+            return {key: rounded(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [rounded(item) for item in value]
+        return value
+
+    data = json.dumps(rounded(jsonable_encoder(output)), sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+
+def measure(case: Case, repeat: int, min_time: float) -> Result:
+    output = case.run()
+
+    # Enough calls per repeat to get above timer noise
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            case.run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1000:
+            break
+        number *= 2
+
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            case.run()
+        best = min(best, (time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    case.run()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(max(stat.count_diff, 0) for stat in after.compare_to(before, "lineno"))
+
+    return Result(
+        ms=best * 1000,
+        sentences_per_second=case.sentences / best,
+        peak_kib=peak / 1024,
+        retained_blocks=blocks,
+        digest=digest(output),
+    )
+
+
+def install_encoder(name: str, layers: int) -> str:
+    registry = embeddings.registry
+    if name == "fake":
+        registry.loader = lambda model_id: FakeEncoder(layers=layers)
+        return f"fake(layers={layers})"
+
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    from sentence_transformers import SentenceTransformer
+
+    registry.loader = lambda model_id: SentenceTransformer(
+        model_id, local_files_only=True
+    )
+    model_id = registry.models[registry.default]
+    try:
+        registry.get()
+    except Exception as e:
+        sys.exit(f"{model_id} is not cached locally: {e}")
+    return model_id
+
+
+def machine() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: Dict[str, Result], baseline: dict, tolerance: float) -> List[str]:
+    """Prints the change against the baseline and returns the regressions."""
+    regressions = []
+    print(f"\n{'case':<42} {'baseline ms':>12} {'ms':>9} {'change':>8}  output")
+    for name, result in results.items():
+        stored = baseline["results"].get(name)
+        if stored is None:
+            print(f"{name:<42} {'-':>12} {result.ms:>9.2f} {'new':>8}")
+            continue
+        change = result.ms / stored["ms"] - 1
+        same_output = stored["digest"] == result.digest
+        print(
+            f"{name:<42} {stored['ms']:>12.2f} {result.ms:>9.2f} {change:>+8.1%}  "
+            f"{'same' if same_output else 'CHANGED'}"
+        )
+        if change > tolerance:
+            regressions.append(f"{name} is {change:.0%} slower")
+        if not same_output:
+            regressions.append(f"{name} output changed")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--encoder", choices=["fake", "model"], default="fake")
+    parser.add_argument(
+        "--encoder-layers",
+        type=int,
+        default=12,
+        help="Dense layers simulated per token by the fake encoder",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="Seconds per timed repeat"
+    )
+    parser.add_argument("--filter", help="Only run cases containing this text")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Store these results"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.3,
+        help="Allowed slowdown against the baseline, as a fraction",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit with status 1 on slowdowns or changed outputs",
+    )
+    args = parser.parse_args(argv)
+
+    encoder = install_encoder(args.encoder, args.encoder_layers)
+    cases = [
+        case
+        for case in build_cases(args.sizes)
+        if not args.filter or args.filter in case.name
+    ]
+
+    print(f"encoder: {encoder}")
+    print(
+        f"{'case':<42} {'ms':>9} {'sentences/s':>12} {'peak KiB':>9} "
+        f"{'retained':>8}  digest"
+    )
+    results = {}
+    for case in cases:
+        result = measure(case, args.repeat, args.min_time)
+        results[case.name] = result
+        print(
+            f"{case.name:<42} {result.ms:>9.2f} {result.sentences_per_second:>12.0f} "
+            f"{result.peak_kib:>9.0f} {result.retained_blocks:>8}  {result.digest}"
+        )
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "encoder": encoder,
+                    "machine": machine(),
+                    "results": {
+                        name: asdict(result) for name, result in results.items()
+                    },
+                },
+                f,
+                indent=2,
+            )
+            f.write("\n")
+        print(f"\nBaseline saved: {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        return
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["encoder"] != encoder:
+        print(f"\nBaseline was recorded with {baseline['encoder']}, not comparing")
+        return
+    if baseline["machine"] != machine():
+        print("\nBaseline was recorded on another machine, timings may differ")
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Compares JSON and MessagePack payload size and CPU cost on the analysis routes.
+
+For synthetic CVs and job offers of several sizes it measures what a request
+costs to decode into UserCV / JobOffer (body bytes to validated model) and
+what a response costs to encode (model to body bytes), the way FastAPI does
+it for each transport: JSON through json.loads / pydantic's JSON serializer,
+MessagePack through msgpack and, for skill results, with skills sent as
+[id, score] pairs (Accept: application/msgpack; skill-ids=true). Run from
+the repository root:
+
+    python -m benchmarks.transport_bench
+    python -m benchmarks.transport_bench --sizes 10 1000 --repeat 20
+"""
+
+import argparse
+import json
+import random
+import timeit
+from typing import Callable, List, Optional
+import msgpack
+from pydantic import TypeAdapter
+from benchmarks.pipeline_bench import SyntheticText
+from app.config.skill_config import hard_skills, soft_skills, tools
+from app.model.job_offer import JobOffer
+from app.model.skill_result import SkillItem, SkillResult
+from app.model.user_cv import UserCV
+from app.util.msgpack_transport import compact_skills, skill_ids
+
+
+def best_us(function: Callable[[], object], repeat: int) -> float:
+    number = max(1, int(0.05 / max(timeit.timeit(function, number=1), 1e-6)))
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1e6
+
+
+def skill_result(num_skills: int, seed: int = 0) -> SkillResult:
+    rng = random.Random(seed)
+
+    def items(names):
+        chosen = rng.sample(names, min(num_skills, len(names)))
+        return [SkillItem(name=name, score=rng.random() * 2) for name in chosen]
+
+    return SkillResult(
+        hard_skills=items(hard_skills),
+        soft_skills=items(soft_skills),
+        tools=items(tools),
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    ids = skill_ids()
+    skill_result_adapter = TypeAdapter(SkillResult)
+    rows = []
+    for size in args.sizes:
+        synthetic = SyntheticText(seed=size)
+        cv = synthetic.cv(size)
+        offer = synthetic.job_offer(size)
+        result = skill_result(max(1, size // 10))
+
+        cv_data = cv.model_dump(mode="json")
+        cv_json = json.dumps(cv_data).encode()
+        cv_msgpack = msgpack.packb(cv_data)
+        offer_json = json.dumps(offer).encode()
+        offer_msgpack = msgpack.packb(offer)
+        result_data = skill_result_adapter.dump_python(result, mode="json")
+
+        cases = [
+            (
+                f"decode UserCV/summaries={size}",
+                (len(cv_json), lambda: UserCV.model_validate(json.loads(cv_json))),
+                (
+                    len(cv_msgpack),
+                    lambda: UserCV.model_validate(msgpack.unpackb(cv_msgpack)),
+                ),
+                None,
+            ),
+            (
+                f"decode JobOffer/sentences={size}",
+                (len(offer_json), lambda: JobOffer(**json.loads(offer_json))),
+                (
+                    len(offer_msgpack),
+                    lambda: JobOffer(**msgpack.unpackb(offer_msgpack)),
+                ),
+                None,
+            ),
+            (
+                f"encode UserCV/summaries={size}",
+                (len(cv_json), lambda: cv.model_dump_json()),
+                (len(cv_msgpack), lambda: msgpack.packb(cv.model_dump(mode="json"))),
+                None,
+            ),
+            (
+                f"encode SkillResult/skills={size // 10 or 1}",
+                (
+                    len(skill_result_adapter.dump_json(result)),
+                    lambda: skill_result_adapter.dump_json(result),
+                ),
+                (
+                    len(msgpack.packb(result_data)),
+                    lambda: msgpack.packb(
+                        skill_result_adapter.dump_python(result, mode="json")
+                    ),
+                ),
+                (
+                    len(msgpack.packb(compact_skills(result_data, ids))),
+                    lambda: msgpack.packb(
+                        compact_skills(
+                            skill_result_adapter.dump_python(result, mode="json"), ids
+                        )
+                    ),
+                ),
+            ),
+        ]
+        for name, json_case, msgpack_case, compact_case in cases:
+            row = [name]
+            for case in (json_case, msgpack_case, compact_case):
+                if case is None:
+                    row += [None, None]
+                else:
+                    size_bytes, function = case
+                    row += [size_bytes, best_us(function, args.repeat)]
+            rows.append(row)
+
+    print(
+        f"{'case':<36} {'json B':>9} {'json us':>9} {'msgpack B':>10} "
+        f"{'msgpack us':>11} {'ids B':>8} {'ids us':>8}"
+    )
+    for name, *values in rows:
+        cells = []
+        for width, value in zip((9, 9, 10, 11, 8, 8), values):
+            if value is None:
+                cells.append(f"{'-':>{width}}")
+            elif isinstance(value, int):
+                cells.append(f"{value:>{width}}")
+            else:
+                cells.append(f"{value:>{width}.1f}")
+        print(f"{name:<36} {' '.join(cells)}")
+
+
+if __name__ == "__main__":
+    main()
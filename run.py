@@ -0,0 +1,4 @@
+from app.service.bulk_analysis import main
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
+import msgpack
 import pytest
 from unittest.mock import MagicMock
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from app.api.cv_routes import router
 from app.model.user_cv import UserCV
+from app.service.cv_sessions import CVSessionStore
+from app.util.result_cache import ResultCache
 
 # Create a test app with just the CV router
 test_app = FastAPI()
@@ -12,11 +15,18 @@ test_app.include_router(router, prefix="/api/v1/cv")
 client = TestClient(test_app)
 
 
+@pytest.fixture(autouse=True)
+def result_cache(monkeypatch):
+    cache = ResultCache("analyze-cv")
+    monkeypatch.setattr("app.api.cv_routes.result_cache", cache)
+    return cache
+
+
 @pytest.fixture
 def mock_cv_service(monkeypatch):
     mock = MagicMock()
     mock.analyze_cv.return_value = UserCV(
-        personal_info=UserCV.PersonalInfo(first_name="Jan", last_name="Kowalski"),
+        personalInfo=UserCV.PersonalInfo(firstName="Jan", lastName="Kowalski"),
         experience=[],
     )
     monkeypatch.setattr("app.api.cv_routes.cv_service", mock)
@@ -25,7 +35,7 @@ def mock_cv_service(monkeypatch):
 
 def test_analyze_cv_success(mock_cv_service):
     payload = {
-        "personal_info": {"first_name": "Jan", "last_name": "Kowalski"},
+        "personalInfo": {"firstName": "Jan", "lastName": "Kowalski"},
         "experience": [],
     }
 
@@ -35,8 +45,8 @@ def test_analyze_cv_success(mock_cv_service):
 
     assert response.status_code == 200
     data = response.json()
-    assert data["personal_info"]["first_name"] == "Jan"
-    assert data["personal_info"]["last_name"] == "Kowalski"
+    assert data["personalInfo"]["firstName"] == "Jan"
+    assert data["personalInfo"]["lastName"] == "Kowalski"
 
     mock_cv_service.analyze_cv.assert_called_once()
 
@@ -48,7 +58,7 @@ def test_analyze_cv_internal_error(monkeypatch):
     monkeypatch.setattr("app.api.cv_routes.cv_service.analyze_cv", broken_analyze_cv)
 
     payload = {
-        "personal_info": {"first_name": "Jan", "last_name": "Kowalski"},
+        "personalInfo": {"firstName": "Jan", "lastName": "Kowalski"},
         "experience": [],
     }
 
@@ -62,9 +72,9 @@ def test_generate_bio_success(mock_cv_service):
     # Test data
     payload = {
         "user_cv": {
-            "personal_info": {
-                "first_name": "Jan",
-                "last_name": "Kowalski",
+            "personalInfo": {
+                "firstName": "Jan",
+                "lastName": "Kowalski",
                 "role": "Senior Python Developer",
                 "summary": "Experienced Python developer",
             },
@@ -126,7 +136,7 @@ def test_generate_bio_internal_error(monkeypatch):
 
     # Minimal valid payload
     payload = {
-        "user_cv": {"personal_info": {"first_name": "Jan", "last_name": "Kowalski"}},
+        "user_cv": {"personalInfo": {"firstName": "Jan", "lastName": "Kowalski"}},
         "skill_result": {"hard_skills": [], "soft_skills": [], "tools": []},
         "job_offer": {
             "description": "Test",
@@ -140,3 +150,128 @@ def test_generate_bio_internal_error(monkeypatch):
 
     assert response.status_code == 500
     assert "Error generating bio" in response.json()["detail"]
+
+
+def test_analyze_cv_fast_path(mock_cv_service):
+    mock_cv_service.analyze_cv_copy_on_write.return_value = UserCV(
+        personalInfo=UserCV.PersonalInfo(firstName="Jan", lastName="Kowalski"),
+        experience=[
+            UserCV.Experience(
+                summaries=[UserCV.Summary(text="Python", technologies=["Python"])]
+            )
+        ],
+    )
+    payload = {"personalInfo": {"firstName": "Jan", "lastName": "Kowalski"}}
+
+    response = client.post("/api/v1/cv/analyze-cv?fast=true", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    data = response.json()
+    assert data["experience"][0]["summaries"][0]["technologies"] == ["Python"]
+    mock_cv_service.analyze_cv_copy_on_write.assert_called_once()
+    mock_cv_service.analyze_cv.assert_not_called()
+
+
+def test_analyze_cv_cached_per_parameters(mock_cv_service):
+    payload = {
+        "personalInfo": {"firstName": "Jan", "lastName": "Kowalski"},
+        "experience": [],
+    }
+
+    first = client.post("/api/v1/cv/analyze-cv?top_k=5", json=payload)
+    second = client.post("/api/v1/cv/analyze-cv?top_k=5", json=payload)
+    third = client.post("/api/v1/cv/analyze-cv?top_k=3", json=payload)
+
+    assert first.headers["X-Cache"] == "miss"
+    assert second.headers["X-Cache"] == "hit"
+    assert third.headers["X-Cache"] == "miss"
+    assert mock_cv_service.analyze_cv.call_count == 2
+
+
+@pytest.fixture
+def cv_sessions(monkeypatch):
+    sessions = CVSessionStore()
+    monkeypatch.setattr("app.api.cv_routes.cv_sessions", sessions)
+    return sessions
+
+
+@pytest.fixture
+def mock_incremental(monkeypatch):
+    def analyze_cv_incremental(cv, session, **kwargs):
+        session.cv = cv
+        session.params = kwargs
+        return cv, 1
+
+    mock = MagicMock(side_effect=analyze_cv_incremental)
+    monkeypatch.setattr("app.api.cv_routes.cv_service.analyze_cv_incremental", mock)
+    return mock
+
+
+def test_analyze_cv_session_roundtrip(cv_sessions, mock_incremental):
+    payload = {
+        "personalInfo": {"firstName": "Jan", "lastName": "Kowalski"},
+        "experience": [{"summaries": [{"text": "Built APIs in Python"}]}],
+    }
+
+    response = client.post("/api/v1/cv/analyze-cv?session=new&top_k=3", json=payload)
+
+    assert response.status_code == 200
+    token = response.headers["X-CV-Session"]
+    assert response.headers["X-Summaries-Analyzed"] == "1"
+
+    response = client.patch(
+        f"/api/v1/cv/sessions/{token}",
+        json={
+            "summaries": [
+                {"section": "experience", "entry": 0, "index": 0, "text": "Go"}
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["experience"][0]["summaries"][0]["text"] == "Go"
+    assert mock_incremental.call_args.kwargs["top_k"] == 3
+
+    assert client.delete(f"/api/v1/cv/sessions/{token}").status_code == 204
+    assert client.delete(f"/api/v1/cv/sessions/{token}").status_code == 404
+
+
+def test_edit_cv_session_errors(cv_sessions, mock_incremental):
+    edit = {"summaries": [{"section": "projects", "entry": 0, "index": 0}]}
+
+    assert client.patch("/api/v1/cv/sessions/unknown", json=edit).status_code == 404
+
+    payload = {"personalInfo": {"firstName": "Jan", "lastName": "Kowalski"}}
+    token = client.post("/api/v1/cv/analyze-cv?session=new", json=payload).headers[
+        "X-CV-Session"
+    ]
+
+    assert client.patch(f"/api/v1/cv/sessions/{token}", json=edit).status_code == 400
+
+
+def test_analyze_cv_fast_path_msgpack(mock_cv_service):
+    mock_cv_service.analyze_cv_copy_on_write.return_value = (
+        mock_cv_service.analyze_cv.return_value
+    )
+    payload = {
+        "personalInfo": {"firstName": "Jan", "lastName": "Kowalski"},
+        "experience": [{"startDate": "2020-01-01", "summaries": []}],
+    }
+
+    response = client.post(
+        "/api/v1/cv/analyze-cv?fast=true",
+        content=msgpack.packb(payload),
+        headers={
+            "Content-Type": "application/msgpack",
+            "Accept": "application/msgpack",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    assert response.headers["X-Cache"] == "miss"
+    data = msgpack.unpackb(response.content)
+    assert data["personalInfo"]["lastName"] == "Kowalski"
+    cv = mock_cv_service.analyze_cv_copy_on_write.call_args[0][0]
+    assert str(cv.experience[0].startDate) == "2020-01-01"
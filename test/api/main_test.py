@@ -0,0 +1,79 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app, warmup
+from app.service import warmup as warmup_module
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def warming_up(monkeypatch):
+    monkeypatch.setattr(warmup, "stage", warmup_module.LOADING_MODEL)
+
+
+def test_health_while_warming_up(warming_up):
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "healthy"}
+
+
+def test_analysis_routes_rejected_while_warming_up(warming_up):
+    response = client.post("/api/v1/offer/analyze-offer", json={})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert response.json()["status"] == "loading_model"
+
+
+def test_ready_reports_progress(warming_up, monkeypatch):
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "loading_model"
+
+    monkeypatch.setattr(warmup, "stage", warmup_module.READY)
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+
+def test_openapi_served_with_etag():
+    response = client.get("/openapi.json")
+
+    assert response.status_code == 200
+    assert response.json()["info"]["title"] == "Career AI Service"
+    etag = response.headers["ETag"]
+
+    cached = client.get("/openapi.json", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+
+def test_docs_use_served_spec():
+    response = client.get("/docs")
+
+    assert response.status_code == 200
+    assert "/openapi.json" in response.text
+
+
+def test_metrics_exposes_request_counts():
+    client.get("/health")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE http_requests counter" in response.text
+    assert (
+        'http_requests_total{method="GET",route="/health",status="200"}'
+        in response.text
+    )
+
+
+def test_metrics_label_unmatched_paths():
+    client.get("/no-such-path")
+
+    response = client.get("/metrics")
+
+    assert 'route="unmatched",status="404"' in response.text
@@ -0,0 +1,69 @@
+import pytest
+from unittest.mock import MagicMock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.match_routes import router
+from app.model.match_result import MatchItem, MatchResult
+
+test_app = FastAPI()
+test_app.include_router(router, prefix="/api/v1/match")
+
+client = TestClient(test_app)
+
+CV = {"personalInfo": {"firstName": "Jan", "lastName": "Kowalski"}}
+OFFER = {
+    "hard_skills": [{"name": "Python", "score": 0.9}],
+    "soft_skills": [],
+    "tools": [],
+}
+
+
+@pytest.fixture
+def mock_matching_service(monkeypatch):
+    mock = MagicMock()
+    result = MatchResult(matches=[MatchItem(index=1, score=0.8)])
+    mock.match_cv_to_offers.return_value = result
+    mock.match_offer_to_cvs.return_value = result
+    monkeypatch.setattr("app.api.match_routes.matching_service", mock)
+    return mock
+
+
+def test_match_cv_to_offers_success(mock_matching_service):
+    response = client.post(
+        "/api/v1/match/cv-to-offers?top_k=3",
+        json={"user_cv": CV, "offers": [OFFER, OFFER]},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"matches": [{"index": 1, "score": 0.8}]}
+    call_args = mock_matching_service.match_cv_to_offers.call_args
+    assert len(call_args[0][1]) == 2
+    assert call_args[1]["top_k"] == 3
+
+
+def test_match_offer_to_cvs_success(mock_matching_service):
+    response = client.post(
+        "/api/v1/match/offer-to-cvs", json={"skill_result": OFFER, "cvs": [CV]}
+    )
+
+    assert response.status_code == 200
+    mock_matching_service.match_offer_to_cvs.assert_called_once()
+
+
+def test_match_invalid_top_k(mock_matching_service):
+    response = client.post(
+        "/api/v1/match/cv-to-offers?top_k=0", json={"user_cv": CV, "offers": []}
+    )
+
+    assert response.status_code == 422
+
+
+def test_match_internal_error(mock_matching_service):
+    mock_matching_service.match_cv_to_offers.side_effect = RuntimeError("boom")
+
+    response = client.post(
+        "/api/v1/match/cv-to-offers", json={"user_cv": CV, "offers": [OFFER]}
+    )
+
+    assert response.status_code == 500
+    assert response.json()["detail"].startswith("Error matching CV")
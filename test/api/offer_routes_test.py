@@ -1,3 +1,6 @@
+import time
+import msgpack
+import numpy as np
 import pytest
 from unittest.mock import MagicMock
 from fastapi import FastAPI
@@ -5,7 +8,14 @@ from fastapi.testclient import TestClient
 from app.api.offer_routes import router
 from app.model.job_offer import JobOffer
 from app.model.skill_result import SkillResult, SkillItem
-
+from app.service.offer_store import OfferStore
+from app.service.skill_stats import SkillStats
+from app.service.text_analyzer import taxonomy_version
+from app.util.admission import AnalysisRunner
+from app.util.msgpack_transport import skill_ids
+from app.util.profiling import record
+from app.util.result_cache import ResultCache
+from app.util.stages import stage
 
 test_app = FastAPI()
 test_app.include_router(router, prefix="/api/v1/offer")
@@ -13,6 +23,13 @@ test_app.include_router(router, prefix="/api/v1/offer")
 client = TestClient(test_app)
 
 
+@pytest.fixture(autouse=True)
+def result_cache(monkeypatch):
+    cache = ResultCache("analyze-offer")
+    monkeypatch.setattr("app.api.offer_routes.result_cache", cache)
+    return cache
+
+
 @pytest.fixture
 def mock_offer_analyzer(monkeypatch):
     mock = MagicMock()
@@ -212,3 +229,365 @@ def test_job_offer_model_with_none_values():
     assert result["technologies"] is None
     assert result["requirements"] is None
     assert result["responsibilities"] is None
+
+
+@pytest.fixture
+def mock_offer_store(monkeypatch):
+    mock = MagicMock()
+    monkeypatch.setattr("app.api.offer_routes.offer_store", mock)
+    return mock
+
+
+def test_analyze_job_offer_stores_offer(
+    mock_offer_analyzer, mock_offer_store, sample_job_offer
+):
+    mock_offer_analyzer.analyze_and_vectorize_job_offer.return_value = (
+        mock_offer_analyzer.analyze_job_offer.return_value,
+        (MagicMock(size=2), MagicMock()),
+    )
+
+    response = client.post(
+        "/api/v1/offer/analyze-offer?offer_id=offer-1", json=sample_job_offer
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Offer-Id"] == "offer-1"
+    assert mock_offer_store.add.call_args[0][0] == "offer-1"
+
+
+def test_similar_offers_success(mock_offer_store):
+    mock_offer_store.similar.return_value = [("offer-2", 0.9), ("offer-3", 0.5)]
+
+    response = client.get("/api/v1/offer/offer-1/similar?top_k=2&approximate=true")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "offers": [
+            {"offer_id": "offer-2", "score": 0.9},
+            {"offer_id": "offer-3", "score": 0.5},
+        ]
+    }
+    mock_offer_store.similar.assert_called_once_with(
+        "offer-1", top_k=2, approximate=True
+    )
+
+
+def test_similar_offers_not_found(mock_offer_store):
+    mock_offer_store.similar.side_effect = KeyError("offer-1")
+
+    response = client.get("/api/v1/offer/offer-1/similar")
+
+    assert response.status_code == 404
+
+
+def test_similar_offers_store_disabled(monkeypatch):
+    monkeypatch.setattr("app.api.offer_routes.offer_store", None)
+
+    response = client.get("/api/v1/offer/offer-1/similar")
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Offer store is not enabled"
+
+
+def test_delete_and_compact_offer_store(mock_offer_store):
+    mock_offer_store.delete.return_value = True
+    mock_offer_store.compact.return_value = 3
+
+    assert client.delete("/api/v1/offer/offer-1").status_code == 204
+    response = client.post("/api/v1/offer/store/compact")
+
+    assert response.status_code == 200
+    assert response.json() == {"removed": 3}
+
+
+def test_analyze_job_offer_profile(mock_offer_analyzer, sample_job_offer):
+    def analyze(job_data, **kwargs):
+        with stage("offer_analyzer", "section_extraction"):
+            record("sentences_found", 3)
+        return mock_offer_analyzer.analyze_job_offer.return_value
+
+    mock_offer_analyzer.analyze_job_offer.side_effect = analyze
+
+    response = client.post(
+        "/api/v1/offer/analyze-offer?profile=true", json=sample_job_offer
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["result"]["hard_skills"][0]["name"] == "Python"
+    assert "offer_analyzer.section_extraction" in data["profile"]["stages"]
+    assert data["profile"]["counters"] == {"sentences_found": 3}
+    assert "sampler" not in data["profile"]
+
+
+def test_analyze_job_offer_sampler_disabled(mock_offer_analyzer, sample_job_offer):
+    response = client.post(
+        "/api/v1/offer/analyze-offer?profile=true&sample=true", json=sample_job_offer
+    )
+
+    assert response.status_code == 403
+    mock_offer_analyzer.analyze_job_offer.assert_not_called()
+
+
+def test_analyze_job_offer_sampler_enabled(
+    monkeypatch, mock_offer_analyzer, sample_job_offer
+):
+    monkeypatch.setattr("app.api.offer_routes.PROFILING_SAMPLER_ENABLED", True)
+
+    response = client.post(
+        "/api/v1/offer/analyze-offer?profile=true&sample=true", json=sample_job_offer
+    )
+
+    assert response.status_code == 200
+    assert "samples" in response.json()["profile"]["sampler"]
+
+
+def test_analyze_job_offer_model_selection(mock_offer_analyzer, sample_job_offer):
+    response = client.post(
+        "/api/v1/offer/analyze-offer?model=auto", json=sample_job_offer
+    )
+
+    assert response.status_code == 200
+    assert mock_offer_analyzer.analyze_job_offer.call_args.kwargs["model"] == "auto"
+
+
+def test_analyze_job_offer_unknown_model(mock_offer_analyzer, sample_job_offer):
+    response = client.post(
+        "/api/v1/offer/analyze-offer?model=unknown", json=sample_job_offer
+    )
+
+    assert response.status_code == 400
+    mock_offer_analyzer.analyze_job_offer.assert_not_called()
+
+
+@pytest.fixture
+def skill_stats(monkeypatch):
+    stats = SkillStats()
+    monkeypatch.setattr("app.api.offer_routes.skill_stats", stats)
+    return stats
+
+
+def test_analyze_job_offer_updates_skill_stats(
+    mock_offer_analyzer, skill_stats, sample_job_offer
+):
+    client.post("/api/v1/offer/analyze-offer", json=sample_job_offer)
+    client.post(
+        "/api/v1/offer/analyze-offer",
+        json={**sample_job_offer, "description": "Another offer"},
+    )
+
+    response = client.get("/api/v1/offer/stats/top-skills?days=7&limit=2")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["days"] == 7
+    assert data["offers"] == 2
+    assert [skill["name"] for skill in data["skills"]] == ["Python", "Docker"]
+    assert data["skills"][0]["count"] == 2
+
+
+def test_top_skills_unknown_category(skill_stats):
+    response = client.get("/api/v1/offer/stats/top-skills?category=languages")
+
+    assert response.status_code == 400
+
+
+def test_top_skills_disabled(monkeypatch):
+    monkeypatch.setattr("app.api.offer_routes.skill_stats", None)
+
+    response = client.get("/api/v1/offer/stats/top-skills")
+
+    assert response.status_code == 404
+
+
+def test_analyze_job_offer_serves_repeats_from_cache(
+    mock_offer_analyzer, sample_job_offer
+):
+    first = client.post("/api/v1/offer/analyze-offer", json=sample_job_offer)
+    second = client.post("/api/v1/offer/analyze-offer", json=sample_job_offer)
+
+    assert first.headers["X-Cache"] == "miss"
+    assert second.headers["X-Cache"] == "hit"
+    assert second.json() == first.json()
+    mock_offer_analyzer.analyze_job_offer.assert_called_once()
+
+
+def test_analyze_job_offer_cache_keyed_by_parameters(
+    mock_offer_analyzer, sample_job_offer
+):
+    client.post("/api/v1/offer/analyze-offer", json=sample_job_offer)
+    response = client.post(
+        "/api/v1/offer/analyze-offer?max_results_per_category=1",
+        json=sample_job_offer,
+    )
+
+    assert response.headers["X-Cache"] == "miss"
+    assert mock_offer_analyzer.analyze_job_offer.call_count == 2
+
+
+def test_analyze_job_offer_cache_invalidated_by_taxonomy_change(
+    monkeypatch, mock_offer_analyzer, sample_job_offer
+):
+    client.post("/api/v1/offer/analyze-offer", json=sample_job_offer)
+    monkeypatch.setattr(
+        "app.config.skill_config.tools", ["Docker", "Kubernetes", "Terraform"]
+    )
+    response = client.post("/api/v1/offer/analyze-offer", json=sample_job_offer)
+
+    assert response.headers["X-Cache"] == "miss"
+    assert mock_offer_analyzer.analyze_job_offer.call_count == 2
+
+
+def test_analyze_job_offer_cache_disabled(
+    monkeypatch, mock_offer_analyzer, sample_job_offer
+):
+    monkeypatch.setattr("app.api.offer_routes.result_cache", None)
+
+    client.post("/api/v1/offer/analyze-offer", json=sample_job_offer)
+    client.post("/api/v1/offer/analyze-offer", json=sample_job_offer)
+
+    assert mock_offer_analyzer.analyze_job_offer.call_count == 2
+
+
+def test_analyze_job_offer_msgpack(mock_offer_analyzer, sample_job_offer):
+    response = client.post(
+        "/api/v1/offer/analyze-offer",
+        content=msgpack.packb(sample_job_offer),
+        headers={
+            "Content-Type": "application/msgpack",
+            "Accept": "application/msgpack",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    assert response.headers["X-Cache"] == "miss"
+    assert msgpack.unpackb(response.content)["hard_skills"] == [
+        {"name": "Python", "score": 0.9}
+    ]
+    job_data = mock_offer_analyzer.analyze_job_offer.call_args[0][0]
+    assert job_data["technologies"] == ["Python", "Django", "PostgreSQL"]
+
+
+def test_analyze_job_offer_msgpack_skill_ids(mock_offer_analyzer, sample_job_offer):
+    response = client.post(
+        "/api/v1/offer/analyze-offer?profile=true",
+        json=sample_job_offer,
+        headers={"Accept": "application/msgpack; skill-ids=true"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Taxonomy-Version"] == taxonomy_version()
+    result = msgpack.unpackb(response.content)["result"]
+    assert result["hard_skills"] == [[skill_ids()["Python"], 0.9]]
+
+
+def test_analyze_job_offer_invalid_msgpack(mock_offer_analyzer):
+    response = client.post(
+        "/api/v1/offer/analyze-offer",
+        content=b"\xc1",
+        headers={"Content-Type": "application/msgpack"},
+    )
+
+    assert response.status_code == 400
+
+
+def test_analyze_job_offer_deadline_exceeded(mock_offer_analyzer, sample_job_offer):
+    def slow_analysis(*args, **kwargs):
+        time.sleep(0.1)
+        with stage("offer_analyzer", "next_step"):
+            pass
+
+    mock_offer_analyzer.analyze_job_offer.side_effect = slow_analysis
+
+    response = client.post(
+        "/api/v1/offer/analyze-offer",
+        json=sample_job_offer,
+        headers={"X-Request-Timeout": "0.05"},
+    )
+
+    assert response.status_code == 504
+
+
+def test_analyze_job_offer_invalid_timeout_header(
+    mock_offer_analyzer, sample_job_offer
+):
+    response = client.post(
+        "/api/v1/offer/analyze-offer",
+        json=sample_job_offer,
+        headers={"X-Request-Timeout": "soon"},
+    )
+
+    assert response.status_code == 422
+    mock_offer_analyzer.analyze_job_offer.assert_not_called()
+
+
+def test_analyze_job_offer_shed_when_overloaded(
+    monkeypatch, mock_offer_analyzer, sample_job_offer
+):
+    shedder = MagicMock()
+    shedder.overloaded.return_value = True
+    runner = AnalysisRunner(shedder=shedder)
+    monkeypatch.setattr("app.api.offer_routes.analysis_runner", runner)
+
+    response = client.post("/api/v1/offer/analyze-offer", json=sample_job_offer)
+    runner.close()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    mock_offer_analyzer.analyze_job_offer.assert_not_called()
+
+
+@pytest.fixture
+def offer_store(tmp_path, monkeypatch, mock_offer_analyzer):
+    store = OfferStore(str(tmp_path))
+    monkeypatch.setattr("app.api.offer_routes.offer_store", store)
+    mock_offer_analyzer.analyze_and_vectorize_job_offer.return_value = (
+        mock_offer_analyzer.analyze_job_offer.return_value,
+        (np.array([1.0, 0.0, 0.0]), np.array([1.0, 0.0])),
+    )
+    return store
+
+
+def test_resubmitted_offer_is_counted_once(
+    mock_offer_analyzer, offer_store, skill_stats, sample_job_offer
+):
+    url = "/api/v1/offer/analyze-offer?offer_id=offer-1"
+    first = client.post(url, json=sample_job_offer)
+    second = client.post(url, json=sample_job_offer)
+
+    assert [first.headers["X-Cache"], second.headers["X-Cache"]] == ["miss", "hit"]
+    assert second.headers["X-Offer-Id"] == "offer-1"
+    assert len(offer_store) == 1
+    offers, skills = skill_stats.top_skills(1)
+    assert offers == 1
+    assert skills[0]["count"] == 1
+
+
+def test_cached_offer_is_stored_under_the_requested_id(
+    mock_offer_analyzer, offer_store, sample_job_offer
+):
+    url = "/api/v1/offer/analyze-offer?offer_id="
+    client.post(url + "offer-a", json=sample_job_offer)
+    response = client.post(url + "offer-b", json=sample_job_offer)
+
+    assert response.headers["X-Cache"] == "hit"
+    assert response.headers["X-Offer-Id"] == "offer-b"
+    assert "offer-a" in offer_store and "offer-b" in offer_store
+    similar = client.get("/api/v1/offer/offer-b/similar")
+    assert similar.status_code == 200
+    assert similar.json()["offers"][0]["offer_id"] == "offer-a"
+
+
+def test_cached_offer_is_stored_again_after_deletion(
+    mock_offer_analyzer, offer_store, sample_job_offer
+):
+    url = "/api/v1/offer/analyze-offer?offer_id=offer-a"
+    client.post(url, json=sample_job_offer)
+    assert client.delete("/api/v1/offer/offer-a").status_code == 204
+
+    response = client.post(url, json=sample_job_offer)
+
+    assert response.headers["X-Cache"] == "hit"
+    assert response.headers["X-Offer-Id"] == "offer-a"
+    assert "offer-a" in offer_store
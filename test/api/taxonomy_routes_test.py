@@ -0,0 +1,115 @@
+import threading
+import msgpack
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.taxonomy_routes import router
+from app.config.skill_config import hard_skills
+from app.service.related_skills import SkillNeighbours
+from app.service.text_analyzer import taxonomy_table, taxonomy_version
+from app.util.embeddings import normalize_rows
+
+test_app = FastAPI()
+test_app.include_router(router, prefix="/api/v1/taxonomy")
+
+client = TestClient(test_app)
+
+
+def test_taxonomy_table():
+    response = client.get("/api/v1/taxonomy")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["version"] == taxonomy_version()
+    assert data["skills"][0] == {
+        "id": 0,
+        "name": hard_skills[0],
+        "category": "hard_skills",
+    }
+    assert [skill["id"] for skill in data["skills"]] == list(range(len(data["skills"])))
+
+
+def test_taxonomy_table_as_msgpack():
+    response = client.get("/api/v1/taxonomy", headers={"Accept": "application/msgpack"})
+
+    assert response.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content) == client.get("/api/v1/taxonomy").json()
+
+
+@pytest.fixture
+def neighbours(monkeypatch):
+    table = taxonomy_table()
+    matrix = normalize_rows(
+        np.random.default_rng(0).normal(size=(len(table), 8)).astype(np.float32)
+    )
+    neighbours = SkillNeighbours(
+        [name for name, _ in table], [category for _, category in table], matrix
+    )
+    analyzer = MagicMock()
+    analyzer.get_skill_neighbours.return_value = neighbours
+    analyzer.match_skill_names.side_effect = lambda items: (
+        [name for name in neighbours.names if name.casefold() == items[0].casefold()],
+        [],
+    )
+    monkeypatch.setattr("app.api.taxonomy_routes.text_analyzer", analyzer)
+    return neighbours
+
+
+def test_related_skills(neighbours):
+    response = client.get(
+        "/api/v1/taxonomy/related", params={"skill": "python", "limit": 3}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["skill"] == "Python"
+    assert data["related"] == neighbours.related(neighbours.position("Python"), 3)
+
+
+def test_related_skills_by_id(neighbours):
+    response = client.get(
+        "/api/v1/taxonomy/related",
+        params={"skill_id": 0, "category": "tools"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["skill"] == hard_skills[0]
+    assert data["related"]
+    assert {skill["category"] for skill in data["related"]} == {"tools"}
+
+
+def test_related_skills_errors(neighbours):
+    url = "/api/v1/taxonomy/related"
+
+    assert client.get(url).status_code == 400
+    assert client.get(url, params={"skill": "Python", "skill_id": 1}).status_code == 400
+    assert (
+        client.get(url, params={"skill": "Python", "category": "x"}).status_code == 400
+    )
+    assert client.get(url, params={"skill": "Basket weaving"}).status_code == 404
+    assert client.get(url, params={"skill_id": 100000}).status_code == 404
+
+
+def test_related_skills_built_off_the_event_loop(neighbours, monkeypatch):
+    analyzer = MagicMock()
+    threads = []
+
+    def get_skill_neighbours():
+        threads.append(threading.current_thread().name)
+        return neighbours
+
+    analyzer.get_skill_neighbours.side_effect = get_skill_neighbours
+    monkeypatch.setattr(
+        "app.api.taxonomy_routes.select_text_analyzer", lambda *args: analyzer
+    )
+
+    response = client.get(
+        "/api/v1/taxonomy/related", params={"skill_id": 0, "limit": 1000}
+    )
+
+    assert response.status_code == 200
+    assert threads[0].startswith("analysis")
+    assert len(response.json()["related"]) == neighbours.top_n
@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import MagicMock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.offer_routes import router as offer_router
+from app.api.tenant_routes import router
+from app.model.skill_result import SkillResult
+from app.service.tenant_skills import TenantSkillStore
+
+test_app = FastAPI()
+test_app.include_router(router, prefix="/api/v1/tenants")
+test_app.include_router(offer_router, prefix="/api/v1/offer")
+
+client = TestClient(test_app)
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    store = TenantSkillStore(str(tmp_path))
+    monkeypatch.setattr("app.api.tenant_routes.tenant_skill_store", store)
+    return store
+
+
+def test_put_get_and_delete_tenant_skills(store):
+    response = client.put("/api/v1/tenants/acme/skills", json={"tools": ["AcmeFlow"]})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["tenant"] == "acme"
+    assert data["tools"] == ["AcmeFlow"]
+    assert data["hard_skills"] == []
+    assert client.get("/api/v1/tenants/acme/skills").json() == data
+
+    assert client.delete("/api/v1/tenants/acme/skills").status_code == 204
+    assert client.get("/api/v1/tenants/acme/skills").status_code == 404
+
+
+def test_put_rejects_invalid_tenant_and_too_many_skills(store, monkeypatch):
+    monkeypatch.setattr("app.api.tenant_routes.TENANT_MAX_SKILLS", 2)
+
+    assert client.put("/api/v1/tenants/a%20b/skills", json={}).status_code == 400
+    assert client.put("/api/v1/tenants/acme%0A/skills", json={}).status_code == 400
+    response = client.put(
+        "/api/v1/tenants/acme/skills", json={"tools": ["a", "b", "c"]}
+    )
+    assert response.status_code == 400
+
+
+def test_tenant_skills_disabled(monkeypatch):
+    monkeypatch.setattr("app.api.tenant_routes.tenant_skill_store", None)
+
+    response = client.get("/api/v1/tenants/acme/skills")
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Tenant skill sets are not enabled"
+
+
+def test_analyze_offer_with_tenant(store, monkeypatch):
+    mock = MagicMock()
+    mock.analyze_job_offer.return_value = SkillResult(
+        hard_skills=[], soft_skills=[], tools=[]
+    )
+    monkeypatch.setattr("app.api.offer_routes.offer_analyzer", mock)
+    monkeypatch.setattr("app.api.offer_routes.result_cache", None)
+    client.put("/api/v1/tenants/acme/skills", json={"tools": ["AcmeFlow"]})
+
+    response = client.post(
+        "/api/v1/offer/analyze-offer?tenant=acme", json={"technologies": ["Python"]}
+    )
+    unknown = client.post(
+        "/api/v1/offer/analyze-offer?tenant=other", json={"technologies": ["Python"]}
+    )
+
+    assert response.status_code == 200
+    assert mock.analyze_job_offer.call_args.kwargs["tenant"] == store.get("acme")
+    assert unknown.status_code == 404
@@ -0,0 +1,91 @@
+import threading
+import numpy as np
+import pytest
+from benchmarks.fake_encoder import FakeEncoder
+from app.inference.client import InferenceClient, RemoteEncoder, remote_loader
+from app.inference.protocol import InferenceError
+from app.inference.server import InferenceServer
+
+MODEL_ID = "sentence-transformers/all-mpnet-base-v2"
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    socket_path = str(tmp_path_factory.mktemp("inference") / "encoder.sock")
+    server = InferenceServer(
+        socket_path,
+        workers=1,
+        batch_wait=0.05,
+        loader="benchmarks.fake_encoder:load_fake_encoder",
+        preload=[MODEL_ID],
+    )
+    server.start()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def client(server):
+    client = InferenceClient(server.socket_path, shm_bytes=64 * 1024)
+    yield client
+    client.close()
+
+
+def test_encode_matches_in_process_encoder(client):
+    sentences = ["Worked with Python", "Deployed Docker containers"]
+
+    embeddings = client.encode(MODEL_ID, sentences)
+
+    assert embeddings.dtype == np.float32
+    np.testing.assert_allclose(
+        embeddings, FakeEncoder(layers=0).encode(sentences), rtol=1e-6
+    )
+
+
+def test_results_larger_than_shared_memory_come_inline(server):
+    client = InferenceClient(server.socket_path, shm_bytes=1024)
+    try:
+        embeddings = client.encode(MODEL_ID, ["Python"] * 4)
+    finally:
+        client.close()
+
+    assert embeddings.shape == (4, 768)
+
+
+def test_concurrent_requests_are_batched(server, client):
+    batches = server.batches
+    results = {}
+
+    def encode(position):
+        results[position] = client.encode(MODEL_ID, [f"sentence {position}"])
+
+    threads = [threading.Thread(target=encode, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    assert len(results) == 6
+    assert server.batches - batches < 6
+
+
+def test_remote_encoder_loads_through_the_server(client):
+    encoder = remote_loader(client)(MODEL_ID)
+
+    assert isinstance(encoder, RemoteEncoder)
+    assert tuple(encoder.encode("Python", convert_to_tensor=True).shape) == (768,)
+
+
+def test_health(client):
+    health = client.health()
+
+    assert health["status"] == "ok"
+    assert health["workers"] == 1
+    assert MODEL_ID in health["models"]
+
+
+def test_unreachable_server(tmp_path):
+    client = InferenceClient(str(tmp_path / "missing.sock"))
+
+    with pytest.raises(InferenceError):
+        client.encode(MODEL_ID, ["Python"])
@@ -0,0 +1,126 @@
+import io
+import json
+import pytest
+from unittest.mock import MagicMock
+from app.model.skill_result import SkillItem, SkillResult
+from app.service import bulk_analysis
+from app.service.bulk_analysis import OFFERS, Progress, run
+
+OPTIONS = {"id_field": "id", "model": None, "max_results_per_category": None}
+
+
+class FakeOfferAnalyzer:
+    """Detects an offer's technologies as tools; stops at fail_on."""
+
+    def __init__(self, fail_on=None):
+        self.text_analyzer = MagicMock()
+        self.analyzed = []
+        self.fail_on = fail_on
+
+    def analyze_job_offer(self, job_description, **kwargs):
+        technologies = job_description["technologies"] or []
+        if self.fail_on in technologies:
+            raise KeyboardInterrupt
+        self.analyzed.append(technologies)
+        return SkillResult(
+            hard_skills=[],
+            soft_skills=[],
+            tools=[SkillItem(name, 1.0) for name in technologies],
+        )
+
+
+@pytest.fixture
+def offers(tmp_path):
+    path = tmp_path / "offers.jsonl"
+    lines = [json.dumps({"id": f"o{i}", "technologies": [f"T{i}"]}) for i in range(9)]
+    lines[4] = '{"technologies": ["T4"]}'
+    lines[6] = "not json"
+    path.write_text("\n".join(lines[:7] + [""] + lines[7:]) + "\n")
+    return path
+
+
+def use_analyzer(monkeypatch, analyzer):
+    monkeypatch.setattr(bulk_analysis, "create_analyzer", lambda task: analyzer)
+    return analyzer
+
+
+def read_results(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_run_writes_results_in_input_order(monkeypatch, offers, tmp_path):
+    use_analyzer(monkeypatch, FakeOfferAnalyzer())
+    output = tmp_path / "results.jsonl"
+
+    progress = run(OFFERS, str(offers), str(output), OPTIONS, chunk_size=3)
+
+    results = read_results(output)
+    assert [result["id"] for result in results] == [
+        "o0", "o1", "o2", "o3", 5, "o5", 7, "o7", "o8"
+    ]  # fmt: skip
+    assert results[0]["tools"] == [{"name": "T0", "score": 1.0}]
+    assert "error" in results[6]
+    assert (progress.records, progress.errors) == (9, 1)
+
+
+def test_interrupted_run_resumes_after_checkpoint(monkeypatch, offers, tmp_path):
+    output = tmp_path / "results.jsonl"
+    use_analyzer(monkeypatch, FakeOfferAnalyzer(fail_on="T5"))
+    with pytest.raises(KeyboardInterrupt):
+        run(OFFERS, str(offers), str(output), OPTIONS, chunk_size=2)
+    # Leftovers after the checkpoint are dropped on resume
+    with open(output, "a") as f:
+        f.write('{"id": "partial"')
+
+    analyzer = use_analyzer(monkeypatch, FakeOfferAnalyzer())
+    run(OFFERS, str(offers), str(output), OPTIONS, chunk_size=2)
+
+    assert analyzer.analyzed == [["T4"], ["T5"], ["T7"], ["T8"]]
+    expected = tmp_path / "expected.jsonl"
+    run(OFFERS, str(offers), str(expected), OPTIONS, chunk_size=2)
+    assert read_results(output) == read_results(expected)
+
+
+def test_checkpoint_of_another_run_is_rejected(monkeypatch, offers, tmp_path):
+    use_analyzer(monkeypatch, FakeOfferAnalyzer())
+    output = tmp_path / "results.jsonl"
+    run(OFFERS, str(offers), str(output), OPTIONS)
+
+    with pytest.raises(ValueError):
+        run(OFFERS, str(offers), str(output), {**OPTIONS, "model": "multilingual"})
+    run(
+        OFFERS,
+        str(offers),
+        str(output),
+        {**OPTIONS, "model": "multilingual"},
+        restart=True,
+    )
+
+
+def test_worker_processes_share_the_preloaded_analyzer(monkeypatch, offers, tmp_path):
+    use_analyzer(monkeypatch, FakeOfferAnalyzer())
+    output = tmp_path / "results.jsonl"
+
+    run(OFFERS, str(offers), str(output), OPTIONS, workers=2, chunk_size=2)
+
+    expected = tmp_path / "expected.jsonl"
+    run(OFFERS, str(offers), str(expected), OPTIONS, chunk_size=2)
+    assert read_results(output) == read_results(expected)
+
+
+def test_progress_reports_throughput_and_eta():
+    now = [0.0]
+    stream = io.StringIO()
+    progress = Progress(
+        1000, start_bytes=200, interval=5, stream=stream, clock=lambda: now[0]
+    )
+
+    now[0] = 2
+    progress.update([{"id": 1}] * 10, 300)
+    assert stream.getvalue() == ""
+    now[0] = 10
+    progress.update([{"id": 2}] * 9 + [{"id": 3, "error": "bad"}], 400)
+
+    assert stream.getvalue() == (
+        "20 records (1 failed), 2.0 records/s, 40.0%, ETA 00:00:30\n"
+    )
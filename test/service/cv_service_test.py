@@ -2,16 +2,20 @@ import pytest
 from app.service.cv_service import CVService
 from datetime import date
 import json
+import requests
+from fastapi import HTTPException
 from unittest.mock import MagicMock, mock_open, patch
+from app.model.cv_session import SummaryEdit
 from app.model.job_offer import JobOffer
 from app.model.skill_result import SkillResult, SkillItem
 from app.model.user_cv import UserCV
+from app.service.cv_sessions import CVSession
 
 
 @pytest.fixture
 def sample_cv():
     return UserCV(
-        personal_info=UserCV.PersonalInfo(first_name="Jan", last_name="Kowalski"),
+        personalInfo=UserCV.PersonalInfo(firstName="Jan", lastName="Kowalski"),
         experience=[
             UserCV.Experience(
                 summaries=[
@@ -26,10 +30,12 @@ def sample_cv():
 @pytest.fixture
 def mock_analyzer(monkeypatch):
     mock = MagicMock()
-    mock.extract_skills_from_text.return_value = [
-        SkillItem(name="Python", score=0.9),
-        SkillItem(name="Communication", score=0.7),
-        SkillItem(name="Excel", score=0.3),  # poniżej progu
+    mock.extract_skills_from_texts.return_value = [
+        [
+            SkillItem(name="Python", score=0.9),
+            SkillItem(name="Communication", score=0.7),
+            SkillItem(name="Excel", score=0.3),  # poniżej progu
+        ]
     ]
     monkeypatch.setattr("app.service.cv_service.TextAnalyzer", lambda: mock)
     return mock
@@ -58,13 +64,13 @@ def test_analyze_summary_empty_text(sample_cv, mock_analyzer):
         and result.experience[0].summaries
         and result.experience[0].summaries[0].technologies == []
     )
-    mock_analyzer.extract_skills_from_text.assert_not_called()
+    mock_analyzer.extract_skills_from_texts.assert_not_called()
 
 
 @pytest.fixture
 def sample_cv():
     return UserCV(
-        personal_info=UserCV.PersonalInfo(first_name="Jan", last_name="Kowalski"),
+        personalInfo=UserCV.PersonalInfo(firstName="Jan", lastName="Kowalski"),
         experience=[
             UserCV.Experience(
                 summaries=[
@@ -79,16 +85,16 @@ def sample_cv():
 @pytest.fixture
 def sample_bio_inputs():
     user_cv = UserCV(
-        personal_info=UserCV.PersonalInfo(
-            first_name="Jan", last_name="Kowalski", summary="Senior Python Developer"
+        personalInfo=UserCV.PersonalInfo(
+            firstName="Jan", lastName="Kowalski", summary="Senior Python Developer"
         ),
         skills=["Python", "Django", "FastAPI"],  # List of strings, not complex objects
         experience=[
             UserCV.Experience(
                 position="Senior Developer",
                 company="Tech Corp",
-                start_date=date(2020, 1, 1),
-                end_date=date(2023, 12, 31),
+                startDate=date(2020, 1, 1),
+                endDate=date(2023, 12, 31),
                 summaries=[
                     UserCV.Summary(
                         text="Led development team", technologies=["Python", "Django"]
@@ -119,6 +125,9 @@ def mock_requests(monkeypatch):
     mock = MagicMock()
     mock.post.return_value.json.return_value = {"response": "Generated bio text"}
     mock.post.return_value.raise_for_status = MagicMock()
+    # generate_bio catches these, so they must stay exception classes
+    mock.Timeout = requests.Timeout
+    mock.ConnectionError = requests.ConnectionError
     monkeypatch.setattr("app.service.cv_service.requests", mock)
     return mock
 
@@ -134,16 +143,34 @@ def test_generate_bio_success(sample_bio_inputs, mock_requests):
         mock_requests.post.assert_called_once()
 
 
+def test_generate_bio_sends_summary_as_role(sample_bio_inputs, mock_requests):
+    user_cv, skill_result, job_offer = sample_bio_inputs
+    user_cv.personalInfo.role = "Team Lead"
+
+    with patch("builtins.open", mock_open(read_data='{"instructions": "Write a bio"}')):
+        CVService().generate_bio(user_cv, skill_result, job_offer)
+
+    prompt = json.loads(mock_requests.post.call_args.kwargs["json"]["prompt"])
+    assert prompt["UserCV"]["personal_info"] == {
+        "first_name": "Jan",
+        "last_name": "Kowalski",
+    }
+    assert prompt["UserCV"]["role"] == "Senior Python Developer"
+
+
 def test_generate_bio_file_error(sample_bio_inputs):
     user_cv, skill_result, job_offer = sample_bio_inputs
     service = CVService()
 
     with (
         patch("builtins.open", side_effect=FileNotFoundError),
-        pytest.raises(FileNotFoundError),
+        pytest.raises(HTTPException) as error,
     ):
         service.generate_bio(user_cv, skill_result, job_offer)
 
+    assert error.value.status_code == 500
+    assert error.value.detail.startswith("Error generating bio")
+
 
 def test_generate_bio_api_error(sample_bio_inputs, mock_requests):
     user_cv, skill_result, job_offer = sample_bio_inputs
@@ -166,9 +193,14 @@ def test_generate_bio_empty_response(sample_bio_inputs, mock_requests):
     # Simulate empty response
     mock_requests.post.return_value.json.return_value = {}
 
-    with patch("builtins.open", mock_open(read_data='{"instructions": "Write a bio"}')):
-        bio = service.generate_bio(user_cv, skill_result, job_offer)
-        assert bio == ""
+    with (
+        patch("builtins.open", mock_open(read_data='{"instructions": "Write a bio"}')),
+        pytest.raises(HTTPException) as error,
+    ):
+        service.generate_bio(user_cv, skill_result, job_offer)
+
+    assert error.value.status_code == 500
+    assert "Empty response from Ollama service" in error.value.detail
 
 
 def test_analyze_cv_adds_technologies(sample_cv, mock_analyzer):
@@ -194,4 +226,148 @@ def test_analyze_summary_empty_text(sample_cv, mock_analyzer):
         and result.experience[0].summaries
         and result.experience[0].summaries[0].technologies == []
     )
-    mock_analyzer.extract_skills_from_text.assert_not_called()
+    mock_analyzer.extract_skills_from_texts.assert_not_called()
+
+
+def test_analyze_cv_batches_all_summaries(mock_analyzer):
+    cv = UserCV(
+        personalInfo=UserCV.PersonalInfo(firstName="Jan", lastName="Kowalski"),
+        experience=[
+            UserCV.Experience(
+                summaries=[
+                    UserCV.Summary(text="Built APIs in Python", technologies=["Git"]),
+                    UserCV.Summary(text=" "),
+                ]
+            )
+        ],
+        projects=[
+            UserCV.Project(summaries=[UserCV.Summary(text="Dockerized services")])
+        ],
+    )
+    mock_analyzer.extract_skills_from_texts.return_value = [
+        [SkillItem(name="Python", score=0.9)],
+        [SkillItem(name="Docker", score=0.8)],
+    ]
+
+    result = CVService().analyze_cv(cv, alpha=1.0, top_k=3, min_score=0.5)
+
+    mock_analyzer.extract_skills_from_texts.assert_called_once_with(
+        ["Built APIs in Python", "Dockerized services"], 1.0, 3, tenant_index=None
+    )
+    assert result.experience[0].summaries[0].technologies == ["Git", "Python"]
+    assert result.experience[0].summaries[1].technologies is None
+    assert result.projects[0].summaries[0].technologies == ["Docker"]
+    assert cv.experience[0].summaries[0].technologies == ["Git"]
+
+
+def test_analyze_cv_copy_on_write_matches_analyze_cv(mock_analyzer):
+    cv = UserCV(
+        personalInfo=UserCV.PersonalInfo(firstName="Jan", lastName="Kowalski"),
+        experience=[
+            UserCV.Experience(
+                summaries=[
+                    UserCV.Summary(text="Python APIs", technologies=["Python"]),
+                    UserCV.Summary(text="Docker"),
+                ]
+            ),
+            UserCV.Experience(summaries=[UserCV.Summary(text="Nothing here")]),
+        ],
+    )
+    mock_analyzer.extract_skills_from_texts.return_value = [
+        [SkillItem(name="Python", score=0.9)],
+        [SkillItem(name="Docker", score=0.8)],
+        [],
+    ]
+    service = CVService()
+
+    fast = service.analyze_cv_copy_on_write(cv, alpha=1.0, top_k=3, min_score=0.5)
+    full = service.analyze_cv(cv, alpha=1.0, top_k=3, min_score=0.5)
+
+    assert fast == full
+    assert cv.experience[0].summaries[1].technologies is None
+    # Unchanged parts are shared with the input instead of copied
+    assert fast.personalInfo is cv.personalInfo
+    assert fast.experience[0].summaries[0] is cv.experience[0].summaries[0]
+    assert fast.experience[1] is cv.experience[1]
+
+
+def _summaries_cv(*texts):
+    return UserCV(
+        personalInfo=UserCV.PersonalInfo(firstName="Jan", lastName="Kowalski"),
+        experience=[
+            UserCV.Experience(summaries=[UserCV.Summary(text=text) for text in texts])
+        ],
+    )
+
+
+def _detect_by_text(texts, alpha, top_k, tenant_index=None):
+    return [[SkillItem(name=text.split()[-1], score=0.9)] for text in texts]
+
+
+def test_analyze_cv_incremental_reanalyzes_only_changed_summaries(mock_analyzer):
+    mock_analyzer.extract_skills_from_texts.side_effect = _detect_by_text
+    service = CVService()
+    session = CVSession("token")
+
+    _, analyzed = service.analyze_cv_incremental(
+        _summaries_cv("Built APIs in Python", "Deployed with Docker"),
+        session,
+        alpha=1.0,
+        top_k=3,
+        min_score=0.5,
+    )
+    assert analyzed == 2
+
+    result, analyzed = service.analyze_cv_incremental(
+        _summaries_cv("Built APIs in Python", "Deployed with Kubernetes"),
+        session,
+        alpha=1.0,
+        top_k=3,
+        min_score=0.5,
+    )
+
+    assert analyzed == 1
+    assert mock_analyzer.extract_skills_from_texts.call_args[0][0] == [
+        "Deployed with Kubernetes"
+    ]
+    summaries = result.experience[0].summaries
+    assert [summary.technologies for summary in summaries] == [
+        ["Python"],
+        ["Kubernetes"],
+    ]
+
+
+def test_analyze_cv_incremental_reanalyzes_when_parameters_change(mock_analyzer):
+    mock_analyzer.extract_skills_from_texts.side_effect = _detect_by_text
+    service = CVService()
+    session = CVSession("token")
+    cv = _summaries_cv("Built APIs in Python")
+
+    service.analyze_cv_incremental(cv, session, alpha=1.0, top_k=3, min_score=0.5)
+    _, analyzed = service.analyze_cv_incremental(
+        cv, session, alpha=1.0, top_k=5, min_score=0.5
+    )
+
+    assert analyzed == 1
+
+
+def test_apply_summary_edits_copies_only_edited_entries():
+    cv = UserCV(
+        personalInfo=UserCV.PersonalInfo(firstName="Jan", lastName="Kowalski"),
+        experience=[
+            UserCV.Experience(summaries=[UserCV.Summary(text="a")]),
+            UserCV.Experience(summaries=[UserCV.Summary(text="b")]),
+        ],
+    )
+
+    edited = CVService.apply_summary_edits(
+        cv, [SummaryEdit(section="experience", entry=1, index=0, text="c")]
+    )
+
+    assert edited.experience[1].summaries[0].text == "c"
+    assert edited.experience[0] is cv.experience[0]
+    assert cv.experience[1].summaries[0].text == "b"
+    with pytest.raises(ValueError):
+        CVService.apply_summary_edits(
+            cv, [SummaryEdit(section="projects", entry=0, index=0, text="c")]
+        )
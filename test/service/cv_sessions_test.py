@@ -0,0 +1,84 @@
+from app.model.skill_result import SkillItem
+from app.service.cv_sessions import CVSession, CVSessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _detector(calls):
+    def detect(texts):
+        calls.append(list(texts))
+        return [[SkillItem(name=text, score=1.0)] for text in texts]
+
+    return detect
+
+
+def test_session_detects_only_new_texts():
+    session = CVSession("token")
+    calls = []
+
+    session.detect(["a", "b"], ("mpnet",), _detector(calls))
+    detected, analyzed = session.detect(["b", "c", "c"], ("mpnet",), _detector(calls))
+
+    assert calls == [["a", "b"], ["c"]]
+    assert analyzed == 1
+    assert [skills[0].name for skills in detected] == ["b", "c", "c"]
+
+
+def test_session_forgets_removed_texts():
+    session = CVSession("token")
+    calls = []
+
+    session.detect(["a", "b"], ("mpnet",), _detector(calls))
+    session.detect(["b"], ("mpnet",), _detector(calls))
+    session.detect(["a", "b"], ("mpnet",), _detector(calls))
+
+    assert calls[-1] == ["a"]
+
+
+def test_session_resets_when_settings_change():
+    session = CVSession("token")
+    calls = []
+
+    session.detect(["a"], ("mpnet", 5), _detector(calls))
+    _, analyzed = session.detect(["a"], ("mpnet", 3), _detector(calls))
+
+    assert analyzed == 1
+
+
+def test_store_expires_idle_sessions():
+    clock = FakeClock()
+    store = CVSessionStore(ttl_seconds=10, clock=clock)
+    session = store.create()
+
+    clock.now = 9
+    assert store.get(session.token) is session
+    clock.now = 18
+    assert store.get(session.token) is session
+    clock.now = 28
+    assert store.get(session.token) is None
+
+
+def test_store_drops_least_recently_used_session():
+    store = CVSessionStore(max_sessions=2)
+    first, second = store.create(), store.create()
+    store.get(first.token)
+    store.create()
+
+    assert len(store) == 2
+    assert store.get(first.token) is first
+    assert store.get(second.token) is None
+
+
+def test_store_delete():
+    store = CVSessionStore()
+    session = store.create()
+
+    assert store.delete(session.token)
+    assert not store.delete(session.token)
+    assert store.get(session.token) is None
@@ -0,0 +1,82 @@
+import multiprocessing
+import numpy as np
+import pytest
+from app.service.embedding_store import EmbeddingStore
+
+
+def embeddings(count, dim=16, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return EmbeddingStore(str(tmp_path / "embeddings"), max_entries=64)
+
+
+def test_lookup_returns_stored_embeddings(store):
+    vectors = embeddings(3)
+    store.store("model-a", ["Python", "Docker", "Java"], vectors)
+
+    found = store.lookup("model-a", ["Docker", "Kubernetes", "  Python \n"])
+
+    np.testing.assert_array_equal(found[0], vectors[1])
+    assert found[1] is None
+    np.testing.assert_array_equal(found[2], vectors[0])
+
+
+def test_models_are_kept_apart(store):
+    store.store("model-a", ["Python"], embeddings(1))
+
+    assert store.lookup("model-b", ["Python"]) == [None]
+    store.store("model-b", ["Python"], embeddings(1, dim=8))
+    assert store.lookup("model-b", ["Python"])[0].shape == (8,)
+
+
+def test_store_stays_within_capacity_evicting_least_recently_used(tmp_path):
+    now = [1000.0]
+    store = EmbeddingStore(
+        str(tmp_path / "embeddings"), max_entries=4, probe=4, clock=lambda: now[0]
+    )
+    store.store("model", ["a", "b", "c", "d"], embeddings(4))
+    now[0] += 1
+    store.lookup("model", ["a", "c", "d"])
+    now[0] += 1
+
+    store.store("model", ["e"], embeddings(1, seed=1))
+
+    found = store.lookup("model", ["a", "b", "c", "d", "e"])
+    assert [vector is not None for vector in found] == [True, False, True, True, True]
+
+
+def test_reopened_store_reads_entries_of_another_instance(tmp_path):
+    vectors = embeddings(2)
+    EmbeddingStore(str(tmp_path)).store("model", ["Python", "Docker"], vectors)
+
+    found = EmbeddingStore(str(tmp_path)).lookup("model", ["Docker", "Python"])
+
+    np.testing.assert_array_equal(np.stack(found), vectors[::-1])
+
+
+def _store_range(directory, start, count):
+    store = EmbeddingStore(directory, max_entries=1024)
+    for i in range(start, start + count):
+        store.store("model", [f"sentence {i}"], np.full((1, 4), i, dtype=np.float32))
+
+
+def test_concurrent_writers_in_separate_processes(tmp_path):
+    directory = str(tmp_path)
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_store_range, args=(directory, start, 100))
+        for start in (0, 100, 200)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    found = EmbeddingStore(directory).lookup(
+        "model", [f"sentence {i}" for i in range(300)]
+    )
+    assert all(vector is not None for vector in found)
+    assert [int(vector[0]) for vector in found] == list(range(300))
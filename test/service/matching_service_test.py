@@ -0,0 +1,92 @@
+import zlib
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from app.model.skill_result import SkillItem, SkillResult
+from app.model.user_cv import UserCV
+from app.service.matching_service import MatchingService
+from app.service.text_analyzer import TextAnalyzer
+
+
+def fake_encode(texts, convert_to_tensor=False, **kwargs):
+    if isinstance(texts, list):
+        return np.stack([fake_encode(text) for text in texts])
+    rng = np.random.default_rng(zlib.crc32(texts.encode("utf-8")))
+    return rng.standard_normal(64).astype(np.float32)
+
+
+@pytest.fixture
+def matching_service(monkeypatch):
+    mock_model = MagicMock()
+    mock_model.encode.side_effect = fake_encode
+    monkeypatch.setattr(
+        "app.service.text_analyzer.get_model", lambda name=None: mock_model
+    )
+    return MatchingService(TextAnalyzer())
+
+
+def make_cv(technologies, skills=None):
+    return UserCV(
+        personalInfo=UserCV.PersonalInfo(firstName="Jan", lastName="Kowalski"),
+        skills=skills,
+        experience=[
+            UserCV.Experience(
+                summaries=[UserCV.Summary(text="Work", technologies=technologies)]
+            )
+        ],
+    )
+
+
+def make_offer(*names):
+    return SkillResult(
+        hard_skills=[SkillItem(name=name, score=1.0) for name in names],
+        soft_skills=[],
+        tools=[],
+    )
+
+
+def test_match_cv_to_offers_ranks_overlap_first(matching_service):
+    cv = make_cv(["Python", "Django"], skills=["PostgreSQL"])
+    offers = [
+        make_offer("Java", "Spring Boot"),
+        make_offer("Python", "Django", "PostgreSQL"),
+        make_offer("Python", "Kotlin"),
+    ]
+
+    result = matching_service.match_cv_to_offers(cv, offers, top_k=2)
+
+    assert [m.index for m in result.matches] == [1, 2]
+    assert result.matches[0].score == pytest.approx(1.0, abs=1e-5)
+
+
+def test_match_offer_to_cvs_ranks_cvs(matching_service):
+    offer = make_offer("Docker", "Kubernetes")
+    cvs = [make_cv(["Excel"]), make_cv(["docker", "kubernetes"]), make_cv(["Docker"])]
+
+    result = matching_service.match_offer_to_cvs(offer, cvs, top_k=5)
+
+    assert [m.index for m in result.matches][:2] == [1, 2]
+    # CV without any known skill scores zero
+    assert result.matches[-1].index == 0
+    assert result.matches[-1].score == 0.0
+
+
+def test_match_with_no_candidates(matching_service):
+    result = matching_service.match_cv_to_offers(make_cv(["Python"]), [], top_k=3)
+    assert result.matches == []
+
+
+def test_match_ten_thousand_offers(matching_service):
+    names, _ = matching_service.text_analyzer.get_skill_matrix()
+    rng = np.random.default_rng(0)
+    offers = [
+        make_offer(*rng.choice(names, size=12, replace=False)) for _ in range(10_000)
+    ]
+
+    result = matching_service.match_cv_to_offers(
+        make_cv(["Python", "Docker"]), offers, top_k=20
+    )
+
+    assert len(result.matches) == 20
+    scores = [m.score for m in result.matches]
+    assert scores == sorted(scores, reverse=True)
@@ -0,0 +1,102 @@
+import pytest
+import torch
+from unittest.mock import MagicMock
+from app.service.offer_analyzer import OfferAnalyzer
+from app.util.fragment_filter import FragmentFilter
+
+
+@pytest.fixture
+def offer_analyzer(monkeypatch):
+    mock_model = MagicMock()
+    mock_model.encode.side_effect = lambda sentences, **kwargs: torch.tensor(
+        [[1.0, 0.0, 0.0]] * (len(sentences) if isinstance(sentences, list) else 1)
+    )
+    monkeypatch.setattr(
+        "app.service.text_analyzer.get_model", lambda name=None: mock_model
+    )
+    monkeypatch.setattr(
+        "app.service.text_analyzer.util.cos_sim",
+        lambda a, b: torch.full((len(a), len(b)), 0.1),
+    )
+    analyzer = OfferAnalyzer()
+    analyzer.text_analyzer.skill_embeddings
+    mock_model.encode.reset_mock()
+    return analyzer
+
+
+def test_match_skill_names_normalizes(offer_analyzer):
+    matched, unmatched = offer_analyzer.text_analyzer.match_skill_names(
+        ["java", "Spring-Boot", " docker ", "React", "In-house framework", ""]
+    )
+
+    assert matched == ["Java", "Spring Boot", "Docker", "React.js"]
+    assert unmatched == ["In-house framework"]
+
+
+def test_technologies_resolved_without_encoder(offer_analyzer):
+    result = offer_analyzer.analyze_job_offer(
+        {"technologies": ["Python", "docker", "Jira", "python"]}
+    )
+
+    offer_analyzer.text_analyzer.model.encode.assert_not_called()
+    assert [s.name for s in result.hard_skills] == ["Python", "Docker"]
+    assert [s.name for s in result.tools] == ["Jira"]
+    assert all(s.score == pytest.approx(2.0) for s in result.hard_skills)
+
+
+def test_unmatched_technologies_use_encoder(offer_analyzer):
+    offer_analyzer.analyze_job_offer(
+        {
+            "description": "Backend role",
+            "technologies": ["Python", "Acme Framework", "Zeta DB"],
+        }
+    )
+
+    encoded = offer_analyzer.text_analyzer.model.encode.call_args[0][0]
+    assert encoded == ["Backend role", "Acme Framework Zeta DB"]
+
+
+def test_vectorizing_reuses_the_analysis_embeddings(offer_analyzer):
+    offer = {"description": "Backend role. Python services", "technologies": ["Java"]}
+
+    result, (embedding, skill_vector) = offer_analyzer.analyze_and_vectorize_job_offer(
+        offer
+    )
+
+    # Only the technology resolved by lookup is encoded for the embedding
+    encoded = [
+        call[0][0] for call in offer_analyzer.text_analyzer.model.encode.call_args_list
+    ]
+    assert encoded == [["Backend role", "Python services"], ["Java"]]
+    assert embedding.shape == (3,)
+    assert embedding == pytest.approx([1.0, 0.0, 0.0])
+    names, _ = offer_analyzer.text_analyzer.get_skill_matrix()
+    assert skill_vector[names.index("Java")] == pytest.approx(2.0)
+    assert [s.name for s in result.hard_skills] == ["Java"]
+
+
+def test_vectorizing_with_the_analysis_matches_vectorize_job_offer(
+    offer_analyzer, monkeypatch
+):
+    offer_analyzer.text_analyzer.model.encode.side_effect = (
+        lambda sentences, **kwargs: torch.tensor(
+            [[len(s), s.count("e"), 1.0] for s in sentences]
+        )
+    )
+    monkeypatch.setattr(
+        "app.service.text_analyzer.fragment_filter", FragmentFilter(["Python"])
+    )
+    offer = {
+        "description": "Backend role. Python services. Apply now",
+        "technologies": ["Java", "Acme Framework"],
+    }
+
+    result, (embedding, skill_vector) = offer_analyzer.analyze_and_vectorize_job_offer(
+        offer
+    )
+    expected_embedding, expected_skill_vector = offer_analyzer.vectorize_job_offer(
+        offer, result
+    )
+
+    assert embedding == pytest.approx(expected_embedding)
+    assert skill_vector == pytest.approx(expected_skill_vector)
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+from app.service.offer_store import OfferStore
+
+
+def vectors(seed, embedding_dim=32, skill_dim=8):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal(embedding_dim), rng.random(skill_dim)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return OfferStore(str(tmp_path / "offers"))
+
+
+def test_similar_returns_closest_offers(store):
+    base_embedding, base_skills = vectors(0)
+    store.add("query", base_embedding, base_skills)
+    store.add("near", base_embedding + 0.05, base_skills)
+    for i in range(20):
+        store.add(f"other-{i}", *vectors(i + 1))
+
+    result = store.similar("query", top_k=3)
+
+    assert len(result) == 3
+    assert result[0][0] == "near"
+    assert result[0][1] == pytest.approx(1.0, abs=0.01)
+    assert "query" not in [offer_id for offer_id, _ in result]
+
+
+def test_approximate_search_matches_exact_on_small_store(store):
+    for i in range(50):
+        store.add(f"offer-{i}", *vectors(i))
+
+    assert store.similar("offer-0", top_k=5, approximate=True) == store.similar(
+        "offer-0", top_k=5
+    )
+
+
+def test_approximate_search_recall_beyond_the_shortlist(store, monkeypatch):
+    # 40 clusters of 25 similar offers: more rows than the 200-row shortlist
+    rng = np.random.default_rng(0)
+    for cluster in range(40):
+        embedding, skills = vectors(1000 + cluster)
+        for i in range(25):
+            store.add(
+                f"offer-{cluster}-{i}",
+                embedding + rng.normal(scale=0.3, size=embedding.shape),
+                skills,
+            )
+    shortlisted = []
+    shortlist = store._shortlist
+
+    def recording_shortlist(*args):
+        rows = shortlist(*args)
+        shortlisted.append(len(rows))
+        return rows
+
+    monkeypatch.setattr(store, "_shortlist", recording_shortlist)
+
+    found = 0
+    for cluster in range(10):
+        query = f"offer-{cluster}-0"
+        exact = {offer_id for offer_id, _ in store.similar(query, top_k=5)}
+        approximate = store.similar(query, top_k=5, approximate=True)
+        found += len(exact & {offer_id for offer_id, _ in approximate})
+
+    assert shortlisted and max(shortlisted) < len(store)
+    assert found / 50 >= 0.9
+
+
+def test_approximate_search_survives_a_concurrent_compaction(store, monkeypatch):
+    # More live rows than the shortlist, so that signatures are compared
+    for i in range(300):
+        store.add(f"offer-{i}", *vectors(i))
+    for i in range(50):
+        store.delete(f"offer-{i}")
+    expected = store.similar("offer-299", top_k=5)
+    map_file = store._map
+
+    # Compacts from "another thread" whenever a file is mapped outside the lock
+    def map_during_compaction(*args):
+        if not store._lock.locked():
+            store.compact()
+        return map_file(*args)
+
+    monkeypatch.setattr(store, "_map", map_during_compaction)
+
+    assert store.similar("offer-299", top_k=5, approximate=True) == expected
+
+
+def test_readd_and_delete_then_compact(store):
+    store.add("a", *vectors(1))
+    store.add("b", *vectors(2))
+    store.add("a", *vectors(3))
+    assert store.delete("b")
+    assert not store.delete("missing")
+
+    assert len(store) == 1
+    assert store.compact() == 2
+    assert len(store) == 1
+    assert "a" in store and "b" not in store
+
+
+def test_store_is_persistent_across_instances(tmp_path, store):
+    store.add("a", *vectors(1))
+    store.add("b", *vectors(2))
+
+    reopened = OfferStore(store.directory)
+    store.add("c", *vectors(3))
+    store.delete("a")
+    store.compact()
+
+    # The second instance picks up appends and compaction on its next call
+    assert sorted(offer_id for offer_id, _ in reopened.similar("b")) == ["c"]
+
+
+def test_similar_unknown_offer(store):
+    with pytest.raises(KeyError):
+        store.similar("missing")
+
+
+def test_dimension_mismatch(store):
+    store.add("a", *vectors(1))
+    with pytest.raises(ValueError):
+        store.add("b", *vectors(2, embedding_dim=16))
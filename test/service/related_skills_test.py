@@ -0,0 +1,63 @@
+import numpy as np
+from app.service.related_skills import SkillNeighbours
+from app.util.embeddings import normalize_rows
+
+
+def make_neighbours(top_n=2):
+    names = ["Java", "Spring Boot", "Hibernate", "Teamwork"]
+    categories = ["hard_skills", "hard_skills", "tools", "soft_skills"]
+    matrix = normalize_rows(
+        np.array(
+            [
+                [1.0, 0.2, 0.0],
+                [0.9, 0.4, 0.0],
+                [0.7, 0.7, 0.1],
+                [0.0, 0.1, 1.0],
+            ],
+            dtype=np.float32,
+        )
+    )
+    return SkillNeighbours(names, categories, matrix, top_n=top_n), matrix
+
+
+def test_neighbours_are_the_most_similar_other_skills():
+    neighbours, matrix = make_neighbours(top_n=3)
+    similarities = matrix @ matrix.T
+
+    for position in range(4):
+        expected = [i for i in np.argsort(-similarities[position]) if i != position]
+        assert list(neighbours.indices[position]) == expected[:3]
+        assert np.allclose(
+            neighbours.scores[position], similarities[position, expected[:3]]
+        )
+
+
+def test_related_skills():
+    neighbours, _ = make_neighbours()
+
+    related = neighbours.related(neighbours.position("spring boot"), limit=1)
+
+    assert related == [
+        {"name": "Java", "category": "hard_skills", "score": related[0]["score"]}
+    ]
+    assert related[0]["score"] > 0.9
+
+
+def test_related_skills_filters():
+    neighbours, _ = make_neighbours(top_n=3)
+    java = neighbours.position("Java")
+
+    assert [r["name"] for r in neighbours.related(java, category="tools")] == [
+        "Hibernate"
+    ]
+    assert [r["name"] for r in neighbours.related(java, min_score=0.9)] == [
+        "Spring Boot"
+    ]
+
+
+def test_top_n_is_capped_by_taxonomy_size():
+    neighbours, _ = make_neighbours(top_n=10)
+
+    assert neighbours.indices.shape == (4, 3)
+    assert neighbours.indices.dtype == np.uint16
+    assert neighbours.position("Kotlin") is None
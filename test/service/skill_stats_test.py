@@ -0,0 +1,138 @@
+import threading
+import pytest
+from app.model.skill_result import SkillItem, SkillResult
+from app.service.skill_stats import SkillStats
+
+DAY = 86400
+NOW = 1000 * DAY + 3600
+
+
+def offer(hard=(), soft=(), tools=()):
+    return SkillResult(
+        hard_skills=[SkillItem(name=name, score=score) for name, score in hard],
+        soft_skills=[SkillItem(name=name, score=score) for name, score in soft],
+        tools=[SkillItem(name=name, score=score) for name, score in tools],
+    )
+
+
+def test_top_skills_ranks_by_count_then_score():
+    stats = SkillStats()
+    stats.record(offer(hard=[("Python", 0.9), ("Java", 0.4)]), timestamp=NOW)
+    stats.record(offer(hard=[("Python", 0.7)], tools=[("Scrum", 0.8)]), NOW)
+    stats.record(offer(hard=[("Java", 0.9)]), timestamp=NOW)
+
+    offers, skills = stats.top_skills(1, now=NOW)
+
+    assert offers == 3
+    assert [skill["name"] for skill in skills] == ["Python", "Java", "Scrum"]
+    assert skills[0]["count"] == 2
+    assert skills[0]["score_sum"] == pytest.approx(1.6)
+    assert skills[0]["mean_score"] == pytest.approx(0.8)
+    assert skills[2]["category"] == "tools"
+
+
+def test_top_skills_filters_category_and_limits():
+    stats = SkillStats()
+    stats.record(offer(hard=[("Python", 0.9)], soft=[("teamwork", 0.5)]), timestamp=NOW)
+
+    _, skills = stats.top_skills(1, category="soft_skills", now=NOW)
+    assert [skill["name"] for skill in skills] == ["teamwork"]
+
+    _, skills = stats.top_skills(1, limit=1, now=NOW)
+    assert len(skills) == 1
+
+    with pytest.raises(ValueError):
+        stats.top_skills(1, category="unknown", now=NOW)
+
+
+def test_window_covers_only_recent_buckets():
+    stats = SkillStats(retention_buckets=7)
+    stats.record(offer(hard=[("Python", 0.9)]), timestamp=NOW - 3 * DAY)
+    stats.record(offer(hard=[("Java", 0.9)]), timestamp=NOW)
+
+    offers, skills = stats.top_skills(1, now=NOW)
+    assert offers == 1
+    assert [skill["name"] for skill in skills] == ["Java"]
+
+    offers, _ = stats.top_skills(7, now=NOW)
+    assert offers == 2
+
+
+def test_old_buckets_are_recycled():
+    stats = SkillStats(retention_buckets=2)
+    stats.record(offer(hard=[("Python", 0.9)]), timestamp=NOW - 2 * DAY)
+    stats.record(offer(hard=[("Java", 0.9)]), timestamp=NOW)
+    # Falls before the retained window and is dropped
+    stats.record(offer(hard=[("Go", 0.9)]), timestamp=NOW - 5 * DAY)
+
+    offers, skills = stats.top_skills(30, now=NOW)
+
+    assert offers == 1
+    assert [skill["name"] for skill in skills] == ["Java"]
+
+
+def test_unknown_skills_are_ignored():
+    stats = SkillStats()
+    stats.record(offer(hard=[("NotASkill", 0.9)]), timestamp=NOW)
+
+    offers, skills = stats.top_skills(1, now=NOW)
+
+    assert offers == 1
+    assert skills == []
+
+
+def test_counters_persist_across_instances(tmp_path):
+    path = str(tmp_path / "stats.npz")
+    stats = SkillStats(path, flush_seconds=3600)
+    stats.record(offer(hard=[("Python", 0.9)]), timestamp=NOW)
+    stats.close()
+
+    reloaded = SkillStats(path)
+    offers, skills = reloaded.top_skills(1, now=NOW)
+
+    assert offers == 1
+    assert skills[0]["name"] == "Python"
+    assert skills[0]["score_sum"] == pytest.approx(0.9)
+
+
+def test_workers_sharing_a_file_merge_their_counts(tmp_path):
+    path = str(tmp_path / "stats.npz")
+    first = SkillStats(path, flush_seconds=3600)
+    second = SkillStats(path, flush_seconds=3600)
+    first.record(offer(hard=[("Python", 0.9)]), timestamp=NOW)
+    second.record(offer(hard=[("Python", 0.5)]), timestamp=NOW)
+    second.record(offer(hard=[("Java", 0.5)]), timestamp=NOW)
+
+    first.flush()
+    second.flush()
+    first.flush()
+
+    for stats in (first, second, SkillStats(path)):
+        offers, skills = stats.top_skills(1, now=NOW)
+        assert offers == 3
+        assert skills[0]["name"] == "Python"
+        assert skills[0]["score_sum"] == pytest.approx(1.4)
+    first.close()
+    second.close()
+    assert SkillStats(path).top_skills(1, now=NOW)[0] == 3
+
+
+def test_counters_are_written_by_a_background_thread(tmp_path, monkeypatch):
+    path = str(tmp_path / "stats.npz")
+    stats = SkillStats(path, flush_seconds=0.01)
+    written = threading.Event()
+    writers = []
+    write = stats._write
+
+    def recording_write(buckets):
+        writers.append(threading.current_thread().name)
+        write(buckets)
+        written.set()
+
+    monkeypatch.setattr(stats, "_write", recording_write)
+    stats.record(offer(hard=[("Python", 0.9)]), timestamp=NOW)
+
+    assert written.wait(5)
+    stats.close()
+    assert writers == ["skill-stats-flush"]
+    assert SkillStats(path).top_skills(1, now=NOW)[0] == 1
@@ -0,0 +1,91 @@
+import os
+import numpy as np
+import pytest
+from app.service.tenant_skills import (
+    TenantIndexCache,
+    TenantSkillIndex,
+    TenantSkillSet,
+    TenantSkillStore,
+)
+
+
+def make_index(version, names=()):
+    return TenantSkillIndex(
+        version=version,
+        names=list(names),
+        categories={name: "tools" for name in names},
+        matrix=np.eye(len(names), 4, dtype=np.float32),
+        lookup={},
+        protected_words=frozenset(),
+    )
+
+
+def test_store_round_trip_and_reload(tmp_path):
+    store = TenantSkillStore(str(tmp_path))
+    skill_set = TenantSkillSet(tenant="acme", hard_skills=["AcmeQL"], tools=["Flow"])
+
+    store.put(skill_set)
+    loaded = store.get("acme")
+
+    assert loaded == skill_set
+    assert loaded.version == skill_set.version
+    assert loaded.skills() == [("AcmeQL", "hard_skills"), ("Flow", "tools")]
+    assert store.get("other") is None
+
+    # A set written by another worker is picked up on the next read
+    TenantSkillStore(str(tmp_path)).put(TenantSkillSet(tenant="acme", tools=["Flow"]))
+    os.utime(tmp_path / "acme.json", ns=(0, 1))
+    assert store.get("acme").version != skill_set.version
+
+    assert store.delete("acme")
+    assert store.get("acme") is None
+    assert not store.delete("acme")
+
+
+def test_store_rejects_unsafe_tenant_ids(tmp_path):
+    store = TenantSkillStore(str(tmp_path))
+
+    with pytest.raises(ValueError):
+        store.get("../etc")
+    with pytest.raises(ValueError):
+        store.get("acme\n")
+
+
+def test_index_cache_evicts_least_recently_used():
+    cache = TenantIndexCache(max_entries=2)
+    builds = []
+
+    def build(previous):
+        builds.append(previous)
+        return make_index("v1")
+
+    cache.get(("model", "a"), "v1", build)
+    cache.get(("model", "b"), "v1", build)
+    cache.get(("model", "a"), "v1", build)
+    cache.get(("model", "c"), "v1", build)
+    assert len(builds) == 3
+
+    # "b" was evicted, "a" was kept
+    cache.get(("model", "a"), "v1", build)
+    assert len(builds) == 3
+    cache.get(("model", "b"), "v1", build)
+    assert len(builds) == 4
+
+
+def test_index_cache_rebuilds_from_outdated_index():
+    cache = TenantIndexCache()
+    outdated = cache.get(("model", "a"), "v1", lambda _: make_index("v1", ["Flow"]))
+
+    received = []
+
+    def build(previous):
+        received.append(previous)
+        return make_index("v2", ["Flow", "AcmeQL"])
+
+    updated = cache.get(("model", "a"), "v2", build)
+
+    assert received == [outdated]
+    assert cache.get(("model", "a"), "v2", build) is updated
+    cache.discard("a")
+    cache.get(("model", "a"), "v2", build)
+    assert received[-1] is None
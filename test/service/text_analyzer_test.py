@@ -1,27 +1,32 @@
+import zlib
+import numpy as np
 import pytest
+import torch
 from unittest.mock import MagicMock
-from app.service.text_analyzer import TextAnalyzer
+from app.service.embedding_store import EmbeddingStore
+from app.service.tenant_skills import TenantIndexCache, TenantSkillSet
+from app.service.text_analyzer import TextAnalyzer, select_text_analyzer
 from app.model.skill_result import SkillItem, SkillResult
+from app.util.fragment_filter import FragmentFilter
 
 
-class MockTensor:
-    """Mock tensor-like object that has an item() method"""
-
-    def __init__(self, value):
-        self.value = value
-
-    def item(self):
-        return self.value
+def mock_cos_sim(value):
+    """Mock cos_sim returning a constant similarity for every sentence-skill pair"""
+    return lambda a, b: torch.full((len(a), len(b)), value)
 
 
 @pytest.fixture
 def mock_text_analyzer(monkeypatch):
     mock_model = MagicMock()
 
-    # Mock the model to return tensor-like objects
-    mock_model.encode.return_value = [1.0, 0.0, 0.0]
+    # Mock the model to return one embedding per encoded sentence
+    mock_model.encode.side_effect = lambda sentences, **kwargs: torch.tensor(
+        [[1.0, 0.0, 0.0]] * len(sentences)
+    )
 
-    monkeypatch.setattr("app.service.text_analyzer.get_model", lambda: mock_model)
+    monkeypatch.setattr(
+        "app.service.text_analyzer.get_model", lambda name=None: mock_model
+    )
 
     analyzer = TextAnalyzer()
 
@@ -39,17 +44,13 @@ def test_extract_skills_empty_text(mock_text_analyzer):
 
 def test_extract_skills_no_matches(monkeypatch, mock_text_analyzer):
 
-    monkeypatch.setattr(
-        "app.service.text_analyzer.util.cos_sim", lambda a, b: MockTensor(0.1)
-    )
+    monkeypatch.setattr("app.service.text_analyzer.util.cos_sim", mock_cos_sim(0.1))
     skills = mock_text_analyzer.extract_skills_from_text("Some text")
     assert skills == []
 
 
 def test_extract_skills_with_matches(monkeypatch, mock_text_analyzer):
-    monkeypatch.setattr(
-        "app.service.text_analyzer.util.cos_sim", lambda a, b: MockTensor(0.9)
-    )
+    monkeypatch.setattr("app.service.text_analyzer.util.cos_sim", mock_cos_sim(0.9))
     skills = mock_text_analyzer.extract_skills_from_text(
         "Worked with Python", similarity_threshold=0.5
     )
@@ -58,9 +59,7 @@ def test_extract_skills_with_matches(monkeypatch, mock_text_analyzer):
 
 
 def test_analyze_multiple_texts(mock_text_analyzer, monkeypatch):
-    monkeypatch.setattr(
-        "app.service.text_analyzer.util.cos_sim", lambda a, b: MockTensor(0.95)
-    )
+    monkeypatch.setattr("app.service.text_analyzer.util.cos_sim", mock_cos_sim(0.95))
     result = mock_text_analyzer.analyze_multiple_texts(
         ["Python project", "Another with Python"], top_k=2, max_results_per_category=1
     )
@@ -69,3 +68,130 @@ def test_analyze_multiple_texts(mock_text_analyzer, monkeypatch):
     assert set(result.keys()) == {"hard_skills", "soft_skills", "tools"}
 
     assert any(len(v) > 0 for v in result.values())
+
+
+def test_extract_skills_from_texts_encodes_once(mock_text_analyzer, monkeypatch):
+    monkeypatch.setattr("app.service.text_analyzer.util.cos_sim", mock_cos_sim(0.9))
+    mock_text_analyzer.model.encode.reset_mock()
+
+    results = mock_text_analyzer.extract_skills_from_texts(
+        ["Python. Docker", "", "Worked with Java"], top_k=2
+    )
+
+    assert len(results) == 3
+    assert results[1] == []
+    assert results[0] and results[2]
+    mock_text_analyzer.model.encode.assert_called_once()
+    assert mock_text_analyzer.model.encode.call_args[0][0] == [
+        "Python",
+        "Docker",
+        "Worked with Java",
+    ]
+
+
+def test_select_text_analyzer_by_name_and_language(monkeypatch):
+    requested = []
+    monkeypatch.setattr(
+        "app.service.text_analyzer.get_model",
+        lambda name=None: requested.append(name) or MagicMock(),
+    )
+    default = TextAnalyzer()
+    polish = ["Szukamy programisty z doświadczeniem w Pythonie oraz Dockerze"]
+
+    assert select_text_analyzer(default, None, polish) is default
+    assert select_text_analyzer(default, "mpnet", polish) is default
+
+    multilingual = select_text_analyzer(default, "auto", polish)
+    assert multilingual.model_name == "multilingual"
+    assert select_text_analyzer(default, "multilingual", []) is multilingual
+    assert select_text_analyzer(default, "auto", ["Python and Docker"]) is default
+
+    multilingual.model
+    assert requested == ["multilingual"]
+
+    with pytest.raises(ValueError):
+        select_text_analyzer(default, "unknown", [])
+
+
+def test_extract_skills_skips_filtered_fragments(mock_text_analyzer, monkeypatch):
+    monkeypatch.setattr("app.service.text_analyzer.util.cos_sim", mock_cos_sim(0.9))
+    monkeypatch.setattr(
+        "app.service.text_analyzer.fragment_filter", FragmentFilter(["Python"])
+    )
+    mock_text_analyzer.model.encode.reset_mock()
+
+    results = mock_text_analyzer.extract_skills_from_texts(
+        ["Python. Apply now", "We offer. 2024"]
+    )
+
+    assert results[0] and results[1] == []
+    assert mock_text_analyzer.model.encode.call_args[0][0] == ["Python"]
+
+
+def test_skill_neighbours_rebuilt_on_taxonomy_change(monkeypatch, mock_text_analyzer):
+    neighbours = mock_text_analyzer.get_skill_neighbours()
+    assert mock_text_analyzer.get_skill_neighbours() is neighbours
+    assert "Pulumi" not in neighbours.names
+
+    monkeypatch.setattr("app.config.skill_config.tools", ["Docker", "Pulumi"])
+    rebuilt = mock_text_analyzer.get_skill_neighbours()
+
+    assert rebuilt is not neighbours
+    assert "Pulumi" in rebuilt.names
+    assert len(rebuilt.names) == len(mock_text_analyzer.get_skill_matrix()[0])
+
+
+def test_encode_sentences_reuses_stored_embeddings(
+    mock_text_analyzer, monkeypatch, tmp_path
+):
+    monkeypatch.setattr("app.service.text_analyzer.util.cos_sim", mock_cos_sim(0.9))
+    monkeypatch.setattr(
+        "app.service.text_analyzer.embedding_store", EmbeddingStore(str(tmp_path))
+    )
+    mock_text_analyzer.model.encode.reset_mock()
+
+    mock_text_analyzer.extract_skills_from_texts(["Python. Docker"])
+    results = mock_text_analyzer.extract_skills_from_texts(["Docker. Worked with Java"])
+
+    assert results[0]
+    calls = mock_text_analyzer.model.encode.call_args_list
+    assert [call[0][0] for call in calls] == [
+        ["Python", "Docker"],
+        ["Worked with Java"],
+    ]
+
+
+def test_tenant_skills_scored_with_taxonomy(monkeypatch):
+    def fake_encode(sentences, **kwargs):
+        rng = [np.random.default_rng(zlib.crc32(s.encode("utf-8"))) for s in sentences]
+        return torch.tensor(
+            np.stack([r.standard_normal(16) for r in rng]).astype(np.float32)
+        )
+
+    mock_model = MagicMock()
+    mock_model.encode.side_effect = fake_encode
+    monkeypatch.setattr(
+        "app.service.text_analyzer.get_model", lambda name=None: mock_model
+    )
+    monkeypatch.setattr("app.service.text_analyzer.tenant_indexes", TenantIndexCache())
+    analyzer = TextAnalyzer()
+    analyzer.get_skill_matrix()
+    skill_set = TenantSkillSet(tenant="acme", tools=["AcmeFlow", "Python"])
+
+    index = analyzer.get_tenant_index(skill_set)
+    result = analyzer.analyze_multiple_texts(["AcmeFlow. Python"], tenant_index=index)
+
+    # Taxonomy skills stay taxonomy skills
+    assert index.names == ["AcmeFlow"]
+    assert [skill.name for skill in result["tools"]][:1] == ["AcmeFlow"]
+    assert "Python" in [skill.name for skill in result["hard_skills"]]
+    assert analyzer.match_skill_names(["acme-flow"], index) == (["AcmeFlow"], [])
+
+    # Only skills added since the previous version are encoded
+    mock_model.encode.reset_mock()
+    skill_set.hard_skills.append("AcmeQL")
+    updated = analyzer.get_tenant_index(skill_set)
+    [call] = mock_model.encode.call_args_list
+    assert call.args[0] == ["AcmeQL"]
+    assert np.array_equal(updated.matrix[1], index.matrix[0])
+    assert analyzer.get_tenant_index(skill_set) is updated
@@ -0,0 +1,62 @@
+import torch
+from unittest.mock import MagicMock
+from app.service.text_analyzer import TextAnalyzer
+from app.service.warmup import ServiceWarmup
+
+
+def mock_model():
+    model = MagicMock()
+    model.encode.side_effect = lambda sentences, **kwargs: torch.ones(
+        (len(sentences), 3)
+    )
+    return model
+
+
+def test_warmup_loads_model_and_indexes_skills_once(monkeypatch):
+    model = mock_model()
+    monkeypatch.setattr("app.service.text_analyzer.get_model", lambda name=None: model)
+    analyzers = [TextAnalyzer(), TextAnalyzer()]
+    warmup = ServiceWarmup(analyzers)
+    assert warmup.status() == {"status": "starting", "progress": 0.0}
+
+    warmup.run()
+
+    assert warmup.ready
+    status = warmup.status()
+    assert status["status"] == "ready"
+    assert status["progress"] == 1.0
+    assert "elapsed_seconds" in status
+    # One batch per category, shared by both analyzers
+    assert model.encode.call_count == 3
+    assert analyzers[0].skill_embeddings is analyzers[1].skill_embeddings
+
+
+def test_warmup_failure(monkeypatch):
+    def broken_get_model(name=None):
+        raise OSError("model not found")
+
+    monkeypatch.setattr("app.service.text_analyzer.get_model", broken_get_model)
+    warmup = ServiceWarmup([TextAnalyzer()])
+
+    warmup.run()
+
+    assert not warmup.ready
+    assert warmup.status()["status"] == "failed"
+    assert warmup.status()["error"] == "model not found"
+
+
+def test_warmup_configures_encoder_before_indexing_skills(monkeypatch):
+    model = mock_model()
+    monkeypatch.setattr("app.service.text_analyzer.get_model", lambda name=None: model)
+    stages = []
+    warmup = ServiceWarmup(
+        [TextAnalyzer()],
+        configure_encoder=lambda: stages.append(
+            (warmup.stage, model.encode.call_count)
+        ),
+    )
+
+    warmup.run()
+
+    assert warmup.ready
+    assert stages == [("tuning_encoder", 0)]
@@ -0,0 +1,79 @@
+import asyncio
+import time
+import pytest
+from app.util.admission import AnalysisRunner, Overloaded, abort_exception
+from app.util.deadlines import (
+    Deadline,
+    DeadlineExceeded,
+    RequestCancelled,
+    check_deadline,
+    current_deadline,
+)
+from app.util.load_shedding import LoadShedder
+
+
+class FakeRequest:
+    def __init__(self, disconnected: bool = False):
+        self.disconnected = disconnected
+
+    async def receive(self) -> dict:
+        if not self.disconnected:
+            await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+
+class OverloadedShedder(LoadShedder):
+    def overloaded(self) -> bool:
+        return True
+
+
+@pytest.fixture
+def runner():
+    runner = AnalysisRunner(concurrency=2)
+    yield runner
+    runner.close()
+
+
+def test_runs_work_with_the_deadline_bound(runner):
+    deadline = Deadline(10.0)
+
+    result = asyncio.run(
+        runner.run(FakeRequest(), deadline, lambda: current_deadline())
+    )
+
+    assert result is deadline
+
+
+def test_disconnect_cancels_work(runner):
+    def work():
+        for _ in range(500):
+            check_deadline()
+            time.sleep(0.01)
+        return "finished"
+
+    deadline = Deadline()
+    with pytest.raises(RequestCancelled):
+        asyncio.run(runner.run(FakeRequest(disconnected=True), deadline, work))
+    assert deadline.cancelled
+
+
+def test_expired_deadline_skips_work(runner):
+    ran = []
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(runner.run(FakeRequest(), Deadline(0.0), lambda: ran.append(1)))
+    assert ran == []
+
+
+def test_overloaded_runner_rejects_requests():
+    runner = AnalysisRunner(shedder=OverloadedShedder())
+    ran = []
+    try:
+        with pytest.raises(Overloaded) as error:
+            asyncio.run(runner.run(FakeRequest(), Deadline(), lambda: ran.append(1)))
+    finally:
+        runner.close()
+
+    assert ran == []
+    http_error = abort_exception(error.value)
+    assert http_error.status_code == 503
+    assert http_error.headers == {"Retry-After": "1"}
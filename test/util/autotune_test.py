@@ -0,0 +1,105 @@
+import json
+import pytest
+import torch
+from dataclasses import asdict
+from unittest.mock import MagicMock
+from app.util import autotune
+from app.util.autotune import (
+    EncoderSettings,
+    Measurement,
+    candidates,
+    choose,
+    configure_encoder,
+    encoder_settings,
+    measure,
+)
+
+
+@pytest.fixture(autouse=True)
+def restore_settings():
+    threads = torch.get_num_threads()
+    settings = asdict(encoder_settings)
+    yield
+    torch.set_num_threads(threads)
+    for name, value in settings.items():
+        setattr(encoder_settings, name, value)
+
+
+def measurement(threads, batch_size, sentences_per_second, p95_ms):
+    return Measurement(
+        EncoderSettings(threads=threads, interop_threads=1, batch_size=batch_size),
+        sentences_per_second,
+        p95_ms,
+    )
+
+
+def test_choose_prefers_throughput_within_latency_target():
+    fast_but_slow_tail = measurement(4, 64, 900.0, 400.0)
+    best_within = measurement(2, 32, 700.0, 180.0)
+    measurements = [measurement(1, 16, 300.0, 120.0), best_within, fast_but_slow_tail]
+
+    assert choose(measurements, latency_target_ms=250) is best_within
+    # Nothing meets the target: the lowest latency wins
+    assert choose(measurements, latency_target_ms=100) is measurements[0]
+
+
+def test_candidates_cover_powers_of_two_up_to_the_cores():
+    threads = sorted({settings.threads for settings in candidates(6)})
+
+    assert threads == [1, 2, 4, 6]
+    assert len(candidates(6)) == 4 * len(autotune.BATCH_SIZES)
+
+
+def test_measure_encodes_every_request_with_the_batch_size():
+    model = MagicMock()
+    settings = EncoderSettings(threads=1, interop_threads=0, batch_size=16)
+
+    result = measure(model, settings, [["a", "b"], ["c"], ["d", "e"]], concurrency=2)
+
+    assert result.sentences_per_second > 0
+    assert result.p95_ms >= 0
+    # One warm-up call, then one per request
+    assert model.encode.call_count == 4
+    assert {call.kwargs["batch_size"] for call in model.encode.call_args_list} == {16}
+    assert torch.get_num_threads() == 1
+
+
+def test_configure_encoder_tunes_once_per_host_type(monkeypatch, tmp_path):
+    path = str(tmp_path / "tuning.json")
+    tuned = []
+
+    def fake_measure(model, settings, requests, concurrency):
+        tuned.append(settings)
+        # Throughput grows with the batch size and threads, latency with threads
+        return Measurement(
+            settings,
+            settings.batch_size * settings.threads * 10.0,
+            settings.threads * 50.0,
+        )
+
+    monkeypatch.setattr(autotune, "measure", fake_measure)
+    monkeypatch.setattr(autotune, "usable_cpus", lambda: 4)
+
+    settings = configure_encoder(
+        MagicMock(), "model-a", tune=True, path=path, latency_target_ms=120
+    )
+
+    assert (settings.threads, settings.batch_size) == (2, 64)
+    assert encoder_settings.batch_size == 64
+    with open(path) as f:
+        [(key, entry)] = json.load(f).items()
+    assert key.endswith("|4 cpus|model-a")
+    assert entry["latency_target_ms"] == 120
+
+    count = len(tuned)
+    assert configure_encoder(MagicMock(), "model-a", tune=True, path=path) == settings
+    assert len(tuned) == count
+
+
+def test_configure_encoder_without_tuning_applies_configured_settings(tmp_path):
+    settings = configure_encoder(
+        MagicMock(), "model-a", tune=False, path=str(tmp_path / "tuning.json")
+    )
+
+    assert settings.batch_size == autotune.ENCODER_FORWARD_BATCH_SIZE
+    assert not (tmp_path / "tuning.json").exists()
@@ -0,0 +1,74 @@
+import pytest
+from app.util.deadlines import (
+    Deadline,
+    DeadlineExceeded,
+    RequestCancelled,
+    bind_deadline,
+    check_deadline,
+    current_deadline,
+    time_left,
+)
+from app.util.stages import stage
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_deadline_expires():
+    clock = FakeClock()
+    deadline = Deadline(2.0, clock=clock)
+    deadline.check()
+    assert deadline.remaining() == 2.0
+
+    clock.now = 2.0
+    assert deadline.remaining() == 0.0
+    with pytest.raises(DeadlineExceeded):
+        deadline.check()
+
+
+def test_deadline_without_timeout_never_expires():
+    deadline = Deadline()
+    deadline.check()
+    assert deadline.remaining() is None
+
+
+def test_cancelled_deadline_raises():
+    deadline = Deadline()
+    deadline.cancel()
+
+    assert deadline.cancelled
+    with pytest.raises(RequestCancelled):
+        deadline.check()
+
+
+def test_bound_deadline_is_current():
+    clock = FakeClock()
+    deadline = Deadline(10.0, clock=clock)
+    check_deadline()
+    assert time_left(300) == 300
+
+    with bind_deadline(deadline):
+        assert current_deadline() is deadline
+        assert time_left(300) == 10.0
+        assert time_left(5) == 5
+        clock.now = 11.0
+        with pytest.raises(DeadlineExceeded):
+            check_deadline()
+    assert current_deadline() is None
+
+
+def test_stage_does_not_start_after_deadline():
+    deadline = Deadline()
+    deadline.cancel()
+    ran = []
+
+    with bind_deadline(deadline):
+        with pytest.raises(RequestCancelled):
+            with stage("test", "step"):
+                ran.append(1)
+    assert ran == []
@@ -0,0 +1,50 @@
+from app.util.fragment_filter import (
+    BOILERPLATE,
+    NUMERIC,
+    STOPWORDS_ONLY,
+    TOO_SHORT,
+    FragmentFilter,
+)
+
+SKILLS = ["Python", "Go", "Node.js", "C++", "Communication"]
+
+
+def test_drops_fragments_that_cannot_name_a_skill():
+    gate = FragmentFilter(SKILLS)
+
+    assert gate.reason("ok") == TOO_SHORT
+    assert gate.reason("and the") == STOPWORDS_ONLY
+    assert gate.reason("10 000") == NUMERIC
+    assert gate.reason("Apply now") == BOILERPLATE
+    assert gate.reason("We offer private healthcare") == BOILERPLATE
+    assert gate.reason("Salary 10k") == BOILERPLATE
+    assert gate.reason("Remote possible") == BOILERPLATE
+
+
+def test_keeps_fragments_with_skill_words_or_content():
+    gate = FragmentFilter(SKILLS)
+
+    assert gate.reason("Go") is None
+    assert gate.reason("js") is None
+    assert gate.reason("We offer C++ training") is None
+    assert gate.reason("Strong communication skills") is None
+    assert gate.reason("Develop web applications") is None
+
+
+def test_stopwords_of_skill_names_do_not_protect_boilerplate():
+    gate = FragmentFilter(SKILLS + ["Attention to detail", "New Relic"])
+
+    kept, dropped = gate.filter(["Apply now to join us", "Send your CV to us today"])
+
+    assert kept == []
+    assert dropped == {BOILERPLATE: 2}
+    assert gate.reason("Monitoring with New Relic") is None
+
+
+def test_filter_counts_drops_per_reason():
+    gate = FragmentFilter(SKILLS, boilerplate=[r"benefits\b"])
+
+    kept, dropped = gate.filter(["Python", "Benefits", "Apply now", "a", "2024"])
+
+    assert kept == ["Python", "Apply now"]
+    assert dropped == {BOILERPLATE: 1, TOO_SHORT: 1, NUMERIC: 1}
@@ -0,0 +1,21 @@
+from app.util.language import detect_language
+
+
+def test_detects_english():
+    texts = ["We are looking for a developer with 3 years of experience in Python"]
+
+    assert detect_language(texts) == "en"
+
+
+def test_detects_polish():
+    texts = [
+        "Szukamy programisty z doświadczeniem w Pythonie",
+        "Znajomość Dockera oraz pracy w zespole",
+    ]
+
+    assert detect_language(texts) == "pl"
+
+
+def test_undecided_for_short_or_empty_text():
+    assert detect_language(["Python, Docker"]) is None
+    assert detect_language(["", None]) is None
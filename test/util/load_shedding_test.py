@@ -0,0 +1,64 @@
+from app.util.load_shedding import LoadShedder
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_sheds_once_delay_stays_above_target_for_an_interval():
+    clock = FakeClock()
+    shedder = LoadShedder(target_seconds=0.1, interval_seconds=1.0, clock=clock)
+    for _ in range(3):
+        shedder.enqueued()
+
+    shedder.started(0.5)
+    assert not shedder.overloaded()
+    clock.now = 0.9
+    shedder.started(0.6)
+    assert not shedder.overloaded()
+    clock.now = 1.0
+    assert shedder.overloaded()
+
+    # One request starting within the target ends the episode
+    shedder.started(0.05)
+    assert not shedder.overloaded()
+
+
+def test_short_bursts_are_admitted():
+    clock = FakeClock()
+    shedder = LoadShedder(target_seconds=0.1, interval_seconds=1.0, clock=clock)
+    for delay in (0.5, 0.05, 0.5, 0.05):
+        shedder.enqueued()
+        shedder.enqueued()
+        shedder.started(delay)
+        clock.now += 0.6
+        assert not shedder.overloaded()
+        shedder.started(0.0)
+
+
+def test_admits_once_queue_drains():
+    clock = FakeClock()
+    shedder = LoadShedder(target_seconds=0.1, interval_seconds=1.0, clock=clock)
+    shedder.enqueued()
+    shedder.enqueued()
+    shedder.started(0.5)
+    clock.now = 2.0
+    assert shedder.overloaded()
+
+    shedder.started(0.5)
+    assert not shedder.overloaded()
+
+
+def test_target_of_zero_disables_shedding():
+    clock = FakeClock()
+    shedder = LoadShedder(target_seconds=0, clock=clock)
+    shedder.enqueued()
+    shedder.enqueued()
+    shedder.started(10.0)
+    clock.now = 100.0
+
+    assert not shedder.overloaded()
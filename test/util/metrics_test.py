@@ -0,0 +1,82 @@
+import pytest
+from app.util.metrics import Counter, Gauge, Histogram, Registry
+from app.util.stages import stage
+from app.util import metrics
+
+
+def test_counter_renders_total_per_label_set():
+    registry = Registry()
+    counter = registry.register(Counter("jobs", "Jobs processed", ("kind",)))
+
+    counter.labels("cv").inc()
+    counter.labels("cv").inc(2)
+    counter.labels("offer").inc()
+
+    text = registry.render()
+    assert "# TYPE jobs counter" in text
+    assert 'jobs_total{kind="cv"} 3' in text
+    assert 'jobs_total{kind="offer"} 1' in text
+
+
+def test_labels_require_all_label_values():
+    counter = Counter("jobs", "Jobs processed", ("kind", "status"))
+
+    with pytest.raises(ValueError):
+        counter.labels("cv")
+
+
+def test_gauge_goes_up_and_down():
+    registry = Registry()
+    gauge = registry.register(Gauge("in_flight", "Requests in flight"))
+
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+
+    assert "in_flight 1" in registry.render()
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.register(
+        Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    )
+
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+    assert "latency_seconds_sum 5.55" in text
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    counter = registry.register(Counter("errors", "Errors", ("message",)))
+
+    counter.labels('bad "quote"\n').inc()
+
+    assert 'errors_total{message="bad \\"quote\\"\\n"} 1' in registry.render()
+
+
+def test_duplicate_registration_rejected():
+    registry = Registry()
+    registry.register(Counter("jobs", "Jobs processed"))
+
+    with pytest.raises(ValueError):
+        registry.register(Counter("jobs", "Jobs processed"))
+
+
+def test_stage_records_duration_even_on_error():
+    child = metrics.STAGE_DURATION.labels("test_component", "failing_stage")
+    before = sum(child.counts)
+
+    with pytest.raises(RuntimeError):
+        with stage("test_component", "failing_stage"):
+            raise RuntimeError("boom")
+
+    assert sum(child.counts) == before + 1
@@ -0,0 +1,98 @@
+import threading
+import time
+import pytest
+import torch
+from app.util.model_registry import ModelRegistry, model_size_bytes
+
+MODELS = {"en": "org/en-model", "pl": "org/pl-model", "de": "org/de-model"}
+
+
+class FakeModel(torch.nn.Module):
+    def __init__(self, model_id, size_mb=1):
+        super().__init__()
+        self.model_id = model_id
+        # float32 parameters of the given size
+        self.weights = torch.nn.Parameter(torch.zeros(size_mb * 256 * 1024))
+
+
+class CountingLoader:
+    def __init__(self, size_mb=1, delay=0.0):
+        self.size_mb = size_mb
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, model_id):
+        self.calls.append(model_id)
+        time.sleep(self.delay)
+        return FakeModel(model_id, self.size_mb)
+
+
+def test_models_load_lazily_once():
+    loader = CountingLoader()
+    registry = ModelRegistry(MODELS, "en", loader=loader)
+    assert loader.calls == []
+
+    model = registry.get()
+
+    assert model.model_id == "org/en-model"
+    assert registry.get("en") is model
+    assert loader.calls == ["org/en-model"]
+
+
+def test_unknown_model_rejected():
+    registry = ModelRegistry(MODELS, "en", loader=CountingLoader())
+
+    assert "xx" not in registry
+    with pytest.raises(KeyError):
+        registry.get("xx")
+    with pytest.raises(ValueError):
+        ModelRegistry(MODELS, "xx")
+
+
+def test_least_recently_used_model_evicted_over_budget():
+    loader = CountingLoader(size_mb=1)
+    registry = ModelRegistry(MODELS, "en", memory_budget_mb=2, loader=loader)
+
+    registry.get("en")
+    registry.get("pl")
+    registry.get("en")
+    registry.get("de")
+
+    assert registry.resident() == ["en", "de"]
+    # Evicted models are loaded again on demand
+    registry.get("pl")
+    assert loader.calls.count("org/pl-model") == 2
+
+
+def test_model_larger_than_budget_stays_loaded():
+    registry = ModelRegistry(
+        MODELS, "en", memory_budget_mb=1, loader=CountingLoader(size_mb=3)
+    )
+
+    registry.get("en")
+    registry.get("pl")
+
+    assert registry.resident() == ["pl"]
+
+
+def test_concurrent_requests_share_one_load():
+    loader = CountingLoader(delay=0.05)
+    registry = ModelRegistry(MODELS, "en", loader=loader)
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get("pl")))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loader.calls == ["org/pl-model"]
+    assert all(model is results[0] for model in results)
+
+
+def test_model_size_from_parameters():
+    assert model_size_bytes(FakeModel("x", size_mb=2)) == 2 * 1024 * 1024
+    assert model_size_bytes(object()) == 0
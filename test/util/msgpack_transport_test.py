@@ -0,0 +1,66 @@
+import msgpack
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from app.util.metrics import STAGE_DURATION
+from app.util.msgpack_transport import (
+    MsgpackRoute,
+    accepted_msgpack,
+    compact_skills,
+    is_msgpack,
+    skill_ids,
+)
+
+
+def test_content_negotiation():
+    assert is_msgpack("application/msgpack")
+    assert is_msgpack("application/x-msgpack; charset=binary")
+    assert not is_msgpack("application/json")
+    assert not is_msgpack(None)
+
+    assert accepted_msgpack("application/json") is None
+    assert accepted_msgpack("application/msgpack;q=0, application/json") is None
+    assert accepted_msgpack("application/json, application/msgpack") == {}
+    assert accepted_msgpack("application/msgpack; skill-ids=true") == {
+        "skill-ids": "true"
+    }
+
+
+def test_compact_skills_uses_taxonomy_ids():
+    ids = skill_ids()
+    content = {
+        "result": {
+            "hard_skills": [{"name": "Python", "score": 0.9}],
+            "soft_skills": [],
+            "tools": [{"name": "Unknown tool", "score": 0.1}],
+        },
+        "profile": {"total_ms": 1.0},
+    }
+
+    assert compact_skills(content, ids) == {
+        "result": {
+            "hard_skills": [[ids["Python"], 0.9]],
+            "soft_skills": [],
+            "tools": [["Unknown tool", 0.1]],
+        },
+        "profile": {"total_ms": 1.0},
+    }
+
+
+def test_response_encoding_is_timed_for_both_transports():
+    app = FastAPI()
+    router = APIRouter(route_class=MsgpackRoute)
+
+    @router.get("/items")
+    def items():
+        return {"hard_skills": [{"name": "Python", "score": 0.9}]}
+
+    app.include_router(router)
+    client = TestClient(app)
+    serialization = STAGE_DURATION.labels("api", "serialization")
+    before = sum(serialization.counts)
+
+    assert client.get("/items").json()["hard_skills"][0]["name"] == "Python"
+    response = client.get("/items", headers={"Accept": "application/msgpack"})
+
+    assert msgpack.unpackb(response.content)["hard_skills"][0]["score"] == 0.9
+    assert sum(serialization.counts) == before + 2
@@ -0,0 +1,29 @@
+import json
+from app.util.openapi import SPEC_ARTIFACT, build_spec, encode_spec, load_spec
+
+
+def test_artifact_is_up_to_date():
+    # Run `python resolve_yaml.py` after editing resources/api
+    with open(SPEC_ARTIFACT, "r", encoding="utf-8") as f:
+        assert json.load(f) == build_spec()
+
+
+def test_resolved_spec_has_no_file_refs():
+    assert '"$ref": "./' not in json.dumps(load_spec())
+    assert '"$ref": "../' not in json.dumps(load_spec())
+
+
+def test_load_spec_falls_back_to_yaml(tmp_path):
+    assert load_spec(tmp_path / "missing.json") == build_spec()
+
+
+def test_encoded_spec_etag_matching():
+    encoded = encode_spec({"openapi": "3.0.3"})
+
+    assert json.loads(encoded.body) == {"openapi": "3.0.3"}
+    assert encoded.matches(encoded.etag)
+    assert encoded.matches(f'"other", W/{encoded.etag}')
+    assert encoded.matches("*")
+    assert not encoded.matches('"other"')
+    assert not encoded.matches(None)
+    assert encode_spec({"openapi": "3.1.0"}).etag != encoded.etag
@@ -0,0 +1,47 @@
+import time
+from app.util.profiling import current_profile, profile_request, record
+from app.util.stages import stage
+
+
+def test_profile_disabled_yields_none():
+    with profile_request(False) as profile:
+        record("sentences_found", 1)
+        assert profile is None
+        assert current_profile() is None
+
+
+def test_profile_collects_stages_and_counters():
+    with profile_request(True) as profile:
+        with stage("text_analyzer", "encoding"):
+            record("sentences_encoded", 4)
+        with stage("text_analyzer", "encoding"):
+            record("sentences_encoded", 2)
+
+    data = profile.to_dict()
+    assert list(data["stages"]) == ["text_analyzer.encoding"]
+    assert data["counters"] == {"sentences_encoded": 6}
+    assert data["total_ms"] >= data["stages"]["text_analyzer.encoding"]
+    assert current_profile() is None
+
+
+def test_profile_is_scoped_to_the_block():
+    with profile_request(True) as profile:
+        pass
+    record("sentences_found", 1)
+
+    assert profile.counters == {}
+
+
+def _busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampler_reports_hot_frames():
+    with profile_request(True, sample=True, interval=0.001) as profile:
+        _busy_wait(0.1)
+
+    sampler = profile.to_dict()["sampler"]
+    assert sampler["samples"] > 0
+    assert any("_busy_wait" in frame["frame"] for frame in sampler["self"])
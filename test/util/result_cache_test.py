@@ -0,0 +1,172 @@
+import threading
+import pytest
+from app.util.deadlines import (
+    Deadline,
+    DeadlineExceeded,
+    RequestCancelled,
+    bind_deadline,
+)
+from app.util.result_cache import (
+    COALESCED,
+    HIT,
+    MISS,
+    ResultCache,
+    cache_key,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_key_ignores_dict_order():
+    assert cache_key({"a": 1, "b": [1, 2]}, 5) == cache_key({"b": [1, 2], "a": 1}, 5)
+    assert cache_key({"a": 1}, 5) != cache_key({"a": 1}, 6)
+
+
+def test_second_lookup_is_a_hit():
+    cache = ResultCache("test")
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "result"
+
+    assert cache.get_or_compute("k", compute) == ("result", MISS)
+    assert cache.get_or_compute("k", compute) == ("result", HIT)
+    assert len(calls) == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResultCache("test", ttl_seconds=10, clock=clock)
+    cache.get_or_compute("k", lambda: 1)
+
+    clock.now = 9.9
+    assert cache.get_or_compute("k", lambda: 2) == (1, HIT)
+    clock.now = 10.0
+    assert cache.get_or_compute("k", lambda: 2) == (2, MISS)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache("test", max_entries=2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("c", lambda: 3)
+
+    assert len(cache) == 2
+    assert cache.get_or_compute("a", lambda: 0)[1] == HIT
+    assert cache.get_or_compute("b", lambda: 0)[1] == MISS
+
+
+def test_errors_are_not_cached():
+    cache = ResultCache("test")
+
+    def broken():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", broken)
+    assert cache.get_or_compute("k", lambda: 1) == (1, MISS)
+
+
+def test_concurrent_identical_requests_share_one_computation():
+    cache = ResultCache("test")
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    outcomes = []
+    leader = threading.Thread(
+        target=lambda: outcomes.append(cache.get_or_compute("k", compute))
+    )
+    leader.start()
+    started.wait(5)
+    followers = [
+        threading.Thread(
+            target=lambda: outcomes.append(cache.get_or_compute("k", compute))
+        )
+        for _ in range(3)
+    ]
+    for follower in followers:
+        follower.start()
+    # Followers either joined the flight or, if late, hit the finished entry
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(outcome for _, outcome in outcomes).count(MISS) == 1
+    assert all(value == "result" for value, _ in outcomes)
+    assert {outcome for _, outcome in outcomes} <= {MISS, COALESCED, HIT}
+
+
+def test_clear_drops_entries():
+    cache = ResultCache("test")
+    cache.get_or_compute("k", lambda: 1)
+    cache.clear()
+
+    assert len(cache) == 0
+
+
+def test_waiter_computes_when_leader_is_aborted():
+    cache = ResultCache("test")
+    started, release = threading.Event(), threading.Event()
+
+    def aborted():
+        started.set()
+        release.wait(5)
+        raise RequestCancelled("Client disconnected")
+
+    errors, outcomes = [], []
+
+    def lead():
+        try:
+            cache.get_or_compute("k", aborted)
+        except RequestCancelled as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(
+        target=lambda: outcomes.append(cache.get_or_compute("k", lambda: "result"))
+    )
+    follower.start()
+    release.set()
+    for thread in (leader, follower):
+        thread.join(5)
+
+    assert len(errors) == 1
+    assert outcomes == [("result", MISS)]
+
+
+def test_waiter_stops_at_its_deadline():
+    cache = ResultCache("test")
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "result"
+
+    leader = threading.Thread(target=lambda: cache.get_or_compute("k", slow))
+    leader.start()
+    started.wait(5)
+    try:
+        with bind_deadline(Deadline(0.05)):
+            with pytest.raises(DeadlineExceeded):
+                cache.get_or_compute("k", slow)
+    finally:
+        release.set()
+        leader.join(5)
@@ -0,0 +1,133 @@
+import json
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.util.profiling import record
+from app.util.stages import stage
+from app.util.tracing import (
+    JsonlExporter,
+    Tracer,
+    TracingMiddleware,
+    current_span,
+    span,
+)
+
+
+class ListExporter:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, spans):
+        self.traces.append(spans)
+
+
+class FailingExporter:
+    def export(self, spans):
+        raise OSError("disk full")
+
+
+def by_name(spans):
+    return {span["name"]: span for span in spans}
+
+
+def test_stages_and_counters_become_nested_spans():
+    exporter = ListExporter()
+    tracer = Tracer(exporter, sample_rate=1.0)
+
+    with tracer.trace("request", route="/analyze") as root:
+        with stage("text_analyzer", "encoding"):
+            record("sentences_encoded", 3)
+            with span("encoder.batch", sentences=3):
+                pass
+            record("sentences_encoded", 2)
+        record("sentences_found", 5)
+
+    [spans] = exporter.traces
+    spans = by_name(spans)
+    assert spans["request"]["parent_id"] is None
+    assert spans["request"]["attributes"] == {"route": "/analyze", "sentences_found": 5}
+    encoding = spans["text_analyzer.encoding"]
+    assert encoding["parent_id"] == root.span_id
+    assert encoding["attributes"] == {"sentences_encoded": 5}
+    assert spans["encoder.batch"]["parent_id"] == encoding["span_id"]
+    assert {span["trace_id"] for span in spans.values()} == {root.trace_id}
+    assert current_span() is None
+
+
+def test_unsampled_requests_record_nothing():
+    exporter = ListExporter()
+    tracer = Tracer(exporter, sample_rate=0.0)
+
+    with tracer.trace("request") as root:
+        with stage("text_analyzer", "encoding"):
+            record("sentences_encoded", 3)
+            assert current_span() is None
+
+    assert root is None
+    assert exporter.traces == []
+
+
+def test_failed_span_records_error_and_trace_is_exported():
+    exporter = ListExporter()
+    tracer = Tracer(exporter)
+
+    with pytest.raises(ValueError):
+        with tracer.trace("request"):
+            with stage("cv_service", "ollama_request"):
+                raise ValueError("Empty response")
+
+    spans = by_name(exporter.traces[0])
+    assert spans["cv_service.ollama_request"]["error"] == "ValueError: Empty response"
+    assert spans["request"]["error"] == "ValueError: Empty response"
+
+
+def test_jsonl_exporter_rotates(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = JsonlExporter(str(path), max_bytes=200, backups=2)
+
+    for i in range(10):
+        exporter.export([{"name": f"span-{i}", "padding": "x" * 50}])
+    exporter.close()
+
+    assert json.loads(path.read_text().splitlines()[-1])["name"] == "span-9"
+    assert (tmp_path / "spans.jsonl.1").exists()
+    assert not (tmp_path / "spans.jsonl.3").exists()
+
+
+def make_app(exporter):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: str):
+        with stage("test", "lookup"):
+            record("items", 1)
+        return {"item_id": item_id}
+
+    app.add_middleware(TracingMiddleware, tracer=Tracer(exporter))
+    return TestClient(app)
+
+
+def test_middleware_traces_requests_through_threaded_handlers():
+    exporter = ListExporter()
+
+    response = make_app(exporter).get("/items/42")
+
+    assert response.status_code == 200
+    spans = by_name(exporter.traces[0])
+    root = spans["http.request"]
+    assert response.headers["X-Trace-Id"] == root["trace_id"]
+    assert root["attributes"] == {
+        "method": "GET",
+        "path": "/items/42",
+        "status": 200,
+        "route": "/items/{item_id}",
+        "handler": "get_item",
+    }
+    assert spans["test.lookup"]["parent_id"] == root["span_id"]
+    assert spans["test.lookup"]["attributes"] == {"items": 1}
+
+
+def test_export_failure_does_not_fail_the_request():
+    response = make_app(FailingExporter()).get("/items/42")
+
+    assert response.status_code == 200